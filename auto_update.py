@@ -2,89 +2,184 @@
 """
 WhatsApp Blur Auto-Updater
 Updates the installed version with the latest fixes
+
+Only targets whose content hash differs are rewritten, each through a temp file in the
+target directory and an atomic rename, so a running or starting app never sees a partial
+file. Targets are updated concurrently; afterwards the running instance is asked to
+restart through a request file in its data directory.
+
+Usage:
+    python auto_update.py [--source FILE] [--target FILE ...] [--data-dir DIR] [--no-restart]
 """
 
-import shutil
+import argparse
+import hashlib
+import json
 import os
-import sys
+import shutil
 import subprocess
+import sys
+import tempfile
 import time
+from concurrent.futures import ThreadPoolExecutor
 
-def main():
-    print("🔄 WhatsApp Blur Auto-Updater")
-    print("=" * 50)
-    
-    # Get the current script directory
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    
-    # Source file (latest version) - use the final version as the authoritative source
-    source_file = os.path.join(script_dir, "whatsapp_blur_final.py")
-    
-    # Target locations to update
-    target_locations = [
-        os.path.join(script_dir, "whatsapp_blur_final.py"),  # Local copy
+# Must match the running app: it watches this file in its data directory
+RESTART_REQUEST_FILE = 'restart.request'
+
+def default_data_dir():
+    """The app's per-user data directory (same rule as app_data_dir() in the app)"""
+    base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    return os.path.join(base, 'WhatsApp Blur')
+
+def default_targets(script_dir):
+    return [
+        os.path.join(script_dir, "whatsapp_blur_final.py"),  # Local copy (skipped when it is the source)
         "C:\\Program Files\\WhatsApp Blur\\whatsapp_blur.py",  # System installation
         "C:\\Users\\Public\\WhatsApp Blur\\whatsapp_blur.py",  # Alternative location
     ]
-    
-    if not os.path.exists(source_file):
-        print(f"❌ Source file not found: {source_file}")
+
+def file_hash(path, chunk_size=1024 * 1024):
+    """SHA-256 of a file, or None if it doesn't exist"""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+def same_file(a, b):
+    try:
+        return os.path.samefile(a, b)
+    except OSError:
+        return os.path.normcase(os.path.abspath(a)) == os.path.normcase(os.path.abspath(b))
+
+def atomic_copy(source, target, expected_hash):
+    """Copy source over target via a temp file in the target directory and os.replace"""
+    target_dir = os.path.dirname(os.path.abspath(target))
+    os.makedirs(target_dir, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix='.update-', suffix='.tmp', dir=target_dir)
+    try:
+        with os.fdopen(fd, 'wb') as out, open(source, 'rb') as src:
+            shutil.copyfileobj(src, out)
+            out.flush()
+            os.fsync(out.fileno())
+        shutil.copystat(source, temp_path)
+        if file_hash(temp_path) != expected_hash:
+            raise IOError("copied file does not match the source hash")
+        os.replace(temp_path, target)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+def update_target(source, source_hash, target):
+    """Returns (status, target, detail); status is updated, unchanged, skipped or failed"""
+    try:
+        if same_file(source, target):
+            return 'skipped', target, "is the source"
+        if file_hash(target) == source_hash:
+            return 'unchanged', target, "already up to date"
+        atomic_copy(source, target, source_hash)
+        return 'updated', target, source_hash[:12]
+    except PermissionError:
+        return 'failed', target, "permission denied (run as administrator)"
+    except Exception as e:
+        return 'failed', target, str(e)
+
+def update_targets(source, targets, jobs=4):
+    """Update all targets concurrently; results are in target order"""
+    source_hash = file_hash(source)
+    if source_hash is None:
+        raise FileNotFoundError(source)
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        return list(pool.map(lambda target: update_target(source, source_hash, target), targets))
+
+def request_restart(data_dir, updated):
+    """Ask the running instance to restart; it watches its data directory for this file"""
+    if not os.path.isdir(data_dir):
+        return False  # App never ran for this user
+    request = {'requested_at': time.time(), 'reason': 'update', 'updated': updated}
+    path = os.path.join(data_dir, RESTART_REQUEST_FILE)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(request, f)
+    os.replace(temp_path, path)
+    return True
+
+def refresh_shortcut(script_dir):
+    shortcut_script = os.path.join(script_dir, "create_shortcut.py")
+    if not os.path.exists(shortcut_script):
+        print(f"⚠️ Shortcut creator not found: {shortcut_script}")
         return
-    
-    print(f"✅ Source file found: {source_file}")
-    
-    # Update all target locations
-    updated_count = 0
-    for target in target_locations:
+    print("🚀 Creating desktop shortcut...")
+    result = subprocess.run([sys.executable, shortcut_script],
+                            capture_output=True, text=True)
+    if result.returncode == 0:
+        print("✅ Desktop shortcut process completed")
+        if result.stdout:
+            print(result.stdout.strip())
+    else:
+        print(f"⚠️ Shortcut creation had issues:")
+        if result.stdout:
+            print(result.stdout.strip())
+        if result.stderr:
+            print(f"Error details: {result.stderr.strip()}")
+
+def main(argv=None):
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Update installed copies of WhatsApp Blur")
+    parser.add_argument('--source', default=os.path.join(script_dir, "whatsapp_blur_final.py"),
+                        help="Latest version (default: whatsapp_blur_final.py next to this script)")
+    parser.add_argument('--target', action='append', dest='targets',
+                        help="File to update (repeatable; default: the known install locations)")
+    parser.add_argument('--data-dir', default=default_data_dir(),
+                        help="Running app's data directory, for the restart request")
+    parser.add_argument('--jobs', type=int, default=4, help="Targets updated in parallel")
+    parser.add_argument('--no-restart', action='store_true', help="Don't ask the running app to restart")
+    parser.add_argument('--no-shortcut', action='store_true', help="Don't refresh the desktop shortcut")
+    parser.add_argument('--no-pause', action='store_true', help="Don't wait for Enter before exiting")
+    args = parser.parse_args(argv)
+
+    print("🔄 WhatsApp Blur Auto-Updater")
+    print("=" * 50)
+
+    if not os.path.exists(args.source):
+        print(f"❌ Source file not found: {args.source}")
+        return 1
+    print(f"✅ Source file found: {args.source}")
+
+    results = update_targets(args.source, args.targets or default_targets(script_dir), args.jobs)
+    icons = {'updated': '✅', 'unchanged': '⏭️', 'skipped': '⏭️', 'failed': '❌'}
+    for status, target, detail in results:
+        print(f"{icons[status]} {status.capitalize()}: {target} ({detail})")
+
+    updated = [target for status, target, _ in results if status == 'updated']
+    failed = [target for status, target, _ in results if status == 'failed']
+    print(f"\n🎉 Updated {len(updated)} location(s), {len(results) - len(updated) - len(failed)} already current")
+
+    if updated and not args.no_shortcut:
         try:
-            target_dir = os.path.dirname(target)
-            
-            # Create directory if it doesn't exist
-            if target_dir and not os.path.exists(target_dir):
-                print(f"📁 Creating directory: {target_dir}")
-                os.makedirs(target_dir, exist_ok=True)
-            
-            # Copy the file
-            print(f"📄 Updating: {target}")
-            shutil.copy2(source_file, target)  # Main file
-            print(f"✅ Updated: {target}")
-            updated_count += 1
-            
-        except PermissionError:
-            print(f"⚠️ Permission denied: {target} (run as administrator)")
+            refresh_shortcut(script_dir)
         except Exception as e:
-            print(f"❌ Failed to update {target}: {e}")
-    
-    print(f"\n🎉 Updated {updated_count} locations")
-    
-    # Also update the launcher/shortcut
-    try:
-        # Import the shortcut creator
-        import subprocess
-        shortcut_script = os.path.join(script_dir, "create_shortcut.py")
-        
-        if os.path.exists(shortcut_script):
-            print("🚀 Creating desktop shortcut...")
-            result = subprocess.run([sys.executable, shortcut_script], 
-                                  capture_output=True, text=True)
-            if result.returncode == 0:
-                print("✅ Desktop shortcut process completed")
-                if result.stdout:
-                    print(result.stdout.strip())
+            print(f"⚠️ Shortcut update failed: {e}")
+
+    if updated and not args.no_restart:
+        try:
+            if request_restart(args.data_dir, updated):
+                print("🔄 Asked the running WhatsApp Blur to restart with the new version")
             else:
-                print(f"⚠️ Shortcut creation had issues:")
-                if result.stdout:
-                    print(result.stdout.strip())
-                if result.stderr:
-                    print(f"Error details: {result.stderr.strip()}")
-        else:
-            print(f"⚠️ Shortcut creator not found: {shortcut_script}")
-    except Exception as e:
-        print(f"⚠️ Shortcut update failed: {e}")
-    
+                print("ℹ️ No WhatsApp Blur data directory found; start the app to use the new version")
+        except Exception as e:
+            print(f"⚠️ Could not signal the running app ({e}); restart it to use the latest version")
+
     print("\n✅ Auto-update completed!")
-    print("🔄 Restart the WhatsApp Blur app to use the latest version")
+    if not args.no_pause and sys.stdin and sys.stdin.isatty():
+        input("\nPress Enter to exit...")
+    return 1 if failed else 0
 
 if __name__ == "__main__":
-    main()
-    input("\nPress Enter to exit...")
+    sys.exit(main())
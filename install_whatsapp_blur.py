@@ -2,18 +2,32 @@
 """
 WhatsApp Blur - Professional Installer
 Creates proper Windows installation with icon, auto-start, and privacy permissions
+
+The app is installed as a bytecode-compiled zipapp (whatsapp_blur.pyz) with a pinned import
+path, launched with pythonw. The source copy stays next to it for the updater and as fallback.
+
+Usage:
+    python install_whatsapp_blur.py                  Full installation (administrator)
+    python install_whatsapp_blur.py --bundle-only DIR  Only build the bundle into DIR
 """
 
+import ast
+import hashlib
+import json
 import os
 import sys
 import shutil
+import socket
+import statistics
 import subprocess
+import tempfile
+import time
 import winreg
 import ctypes
+import zipapp
 from pathlib import Path
 import tkinter as tk
 from tkinter import messagebox
-import requests
 from PIL import Image, ImageDraw
 
 def is_admin():
@@ -111,6 +125,186 @@ def create_app_icon():
         draw.text((100, 120), "WB", fill=(255, 255, 255))
         return image
 
+BUNDLE_NAME = "whatsapp_blur.pyz"
+BUNDLE_MODULE = "whatsapp_blur_app"
+
+# Probe run with the target interpreter: import the app's dependencies and report which
+# sys.path entries actually provided modules, in sys.path order
+IMPORT_PATH_PROBE = r'''
+import importlib, json, os, sys
+for name in json.loads(sys.argv[1]):
+    try:
+        importlib.import_module(name)
+    except Exception:
+        pass
+entries = {os.path.normcase(os.path.abspath(p)): p for p in sys.path if p}
+used = set()
+for module in list(sys.modules.values()):
+    path = getattr(module, '__file__', None)
+    if not path:
+        continue
+    path = os.path.normcase(os.path.abspath(path))
+    owners = [entry for entry in entries if path.startswith(entry + os.sep)]
+    if owners:
+        used.add(max(owners, key=len))
+print(json.dumps([p for p in sys.path if p and os.path.normcase(os.path.abspath(p)) in used]))
+'''
+
+BUNDLE_MAIN_TEMPLATE = '''# Generated by install_whatsapp_blur.py - rebuilt on every install
+import os
+import runpy
+import sys
+
+BUNDLE = {bundle!r}
+
+def _updated_source():
+    """The sibling source if the updater replaced it after this bundle was built"""
+    source = os.path.join(os.path.dirname(os.path.abspath(sys.argv[0])), BUNDLE['source_name'])
+    try:
+        stat = os.stat(source)
+    except OSError:
+        return None
+    if [stat.st_size, int(stat.st_mtime)] == BUNDLE['source_stat']:
+        return None
+    import hashlib
+    with open(source, 'rb') as f:
+        return source if hashlib.sha256(f.read()).hexdigest() != BUNDLE['source_sha256'] else None
+
+def main():
+    source = _updated_source()
+    if source is None and list(sys.version_info[:2]) != BUNDLE['python']:
+        # Bytecode is tied to the Python version it was compiled for
+        source = os.path.join(os.path.dirname(os.path.abspath(sys.argv[0])), BUNDLE['source_name'])
+    if source:
+        runpy.run_path(source, run_name='__main__')
+        return
+    # Pinned import path: the bundle, then only the entries the app's imports came from
+    sys.path[:] = [sys.path[0]] + [p for p in BUNDLE['path'] if os.path.exists(p)]
+    # Without alter_sys, sys.argv[0] stays this bundle rather than the .pyc inside it, so the
+    # app's restart (relaunch_command) starts the bundle again
+    runpy.run_module(BUNDLE['module'], run_name='__main__')
+
+main()
+'''
+
+def pythonw_path(python=None):
+    """pythonw.exe next to the interpreter (no console window), else the interpreter itself"""
+    python = Path(python or sys.executable)
+    windowed = python.with_name("pythonw.exe")
+    return windowed if windowed.exists() else python
+
+def collect_imports(source_file):
+    """Top-level names of every module the app imports, including lazy imports"""
+    tree = ast.parse(Path(source_file).read_text(encoding='utf-8'))
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module)
+    return sorted(names)
+
+def probe_import_path(python, modules):
+    result = subprocess.run([str(python), "-c", IMPORT_PATH_PROBE, json.dumps(modules)],
+                            check=True, capture_output=True, text=True, timeout=120)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def build_bundle(source_file, output_dir, python=None):
+    """Compile the app to bytecode and pack it with a pinned import path into a zipapp.
+
+    The bytecode is compiled by the interpreter that will run it, since .pyc files are tied to
+    the Python version. Returns the path of the bundle.
+    """
+    python = Path(python or sys.executable)
+    source_file = Path(source_file)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    with tempfile.TemporaryDirectory() as staging:
+        staging = Path(staging)
+        compiled = staging / f"{BUNDLE_MODULE}.pyc"
+        subprocess.run([str(python), "-c",
+                        "import py_compile, sys; py_compile.compile(sys.argv[1], cfile=sys.argv[2], doraise=True)",
+                        str(source_file), str(compiled)], check=True, capture_output=True, text=True)
+        version = subprocess.run([str(python), "-c", "import sys; print(*sys.version_info[:2])"],
+                                 check=True, capture_output=True, text=True).stdout.split()
+
+        stat = source_file.stat()
+        bundle = {
+            'module': BUNDLE_MODULE,
+            'python': [int(part) for part in version],
+            'path': probe_import_path(python, collect_imports(source_file)),
+            'source_name': source_file.name,
+            'source_stat': [stat.st_size, int(stat.st_mtime)],
+            'source_sha256': hashlib.sha256(source_file.read_bytes()).hexdigest(),
+        }
+        (staging / "__main__.py").write_text(BUNDLE_MAIN_TEMPLATE.format(bundle=bundle), encoding='utf-8')
+
+        # Build next to the target and swap in, so a running instance keeps a consistent file
+        bundle_path = output_dir / BUNDLE_NAME
+        temp_bundle = output_dir / f"{BUNDLE_NAME}.tmp"
+        zipapp.create_archive(staging, target=temp_bundle)  # Stored, not compressed: faster to load
+        os.replace(temp_bundle, bundle_path)
+    print(f"✅ Bundle built: {bundle_path} (Python {'.'.join(version)}, {len(bundle['path'])} import path entries)")
+    return bundle_path
+
+def send_instance_command(command, timeout=1.0):
+    """Send a control command to the running app (see the app's control channel)"""
+    base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    try:
+        with open(os.path.join(base, 'WhatsApp Blur', 'instance.json'), encoding='utf-8') as f:
+            info = json.load(f)
+        with socket.create_connection(('127.0.0.1', info['port']), timeout=timeout) as connection:
+            connection.sendall((json.dumps({'token': info['token'], 'command': command}) + '\n').encode('utf-8'))
+            return json.loads(connection.makefile('r', encoding='utf-8').readline())
+    except (OSError, ValueError, KeyError):
+        return None
+
+def measure_cold_start(command, runs=3, timeout=60.0):
+    """Seconds from process launch until the app answers on its control channel.
+
+    The app answers only after __init__ (hotkey registered, tray and monitoring started),
+    so this is time to hotkey-ready. Returns the median, or None if it never got ready.
+    """
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        process = subprocess.Popen(command, cwd=str(Path(command[-1]).parent))
+        ready = None
+        while time.perf_counter() - started < timeout and process.poll() is None:
+            response = send_instance_command('status', timeout=0.5)
+            if response and response.get('ok'):
+                ready = time.perf_counter() - started
+                break
+            time.sleep(0.02)
+        send_instance_command('quit')
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        if ready is None:
+            return None
+        timings.append(ready)
+    return statistics.median(timings)
+
+def measure_launch_speedup(install_dir, source_target, bundle_path, runs=3):
+    """Compare cold start of the raw source (no writable __pycache__) with the bundle"""
+    if send_instance_command('status'):
+        print("⚠️ WhatsApp Blur is running - skipping the cold-start measurement")
+        return None
+    python = pythonw_path()
+    print("⏱️ Measuring cold start to hotkey-ready...")
+    before = measure_cold_start([str(python), "-B", str(source_target)], runs)
+    after = measure_cold_start([str(python), str(bundle_path)], runs)
+    result = {'source_seconds': before, 'bundle_seconds': after, 'runs': runs, 'measured_at': time.time()}
+    with open(install_dir / "cold_start.json", 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2)
+    if before and after:
+        print(f"✅ Cold start: source {before:.2f}s → bundle {after:.2f}s ({before / after:.1f}x)")
+    else:
+        print(f"⚠️ Cold start measurement incomplete: source {before}, bundle {after}")
+    return result
+
 def install_application():
     """Install the application properly"""
     try:
@@ -131,8 +325,8 @@ def install_application():
         icon_image.save(str(icon_path), format='ICO', sizes=[(256, 256), (128, 128), (64, 64), (32, 32), (16, 16)])
         print(f"✅ Icon created: {icon_path}")
         
-    # Copy main application (use the current final version)
-    source_file = Path(__file__).parent / "whatsapp_blur_final.py"
+        # Copy main application (use the current final version)
+        source_file = Path(__file__).parent / "whatsapp_blur_final.py"
         target_file = install_dir / "whatsapp_blur.py"
         
         if source_file.exists():
@@ -159,10 +353,20 @@ def install_application():
             print(f"⚠️ Warning: Dependency installation failed: {e}")
             print("You may need to install dependencies manually")
         
+        # Precompiled bundle; the launcher runs it without a console window
+        print("📦 Building precompiled bundle...")
+        try:
+            bundle_path = build_bundle(target_file, install_dir)
+            launch_target = bundle_path
+            measure_launch_speedup(install_dir, target_file, bundle_path)
+        except Exception as e:
+            print(f"⚠️ Bundle build failed, launching the source instead: {e}")
+            launch_target = target_file
+        
         # Create launcher script
         launcher_content = f'''@echo off
 cd /d "{install_dir}"
-python whatsapp_blur.py
+start "" "{pythonw_path()}" "{launch_target}" %*
 '''
         launcher_path = install_dir / "WhatsApp Blur.bat"
         with open(launcher_path, 'w') as f:
@@ -242,6 +446,7 @@ def setup_windows_autostart(launcher_path):
         shell = win32com.client.Dispatch("WScript.Shell")
         shortcut = shell.CreateShortCut(str(startup_shortcut))
         shortcut.Targetpath = str(launcher_path)
+        shortcut.Arguments = "--boot"  # Hotkey first, the rest once the system is idle
         shortcut.Description = "WhatsApp Privacy Blur Tool - Auto Start"
         shortcut.save()
         
@@ -250,7 +455,7 @@ def setup_windows_autostart(launcher_path):
         # Method 2: Registry Run key
         run_key = "SOFTWARE\\Microsoft\\Windows\\CurrentVersion\\Run"
         with winreg.CreateKey(winreg.HKEY_LOCAL_MACHINE, run_key) as key:
-            winreg.SetValueEx(key, "WhatsApp Blur", 0, winreg.REG_SZ, f'"{launcher_path}"')
+            winreg.SetValueEx(key, "WhatsApp Blur", 0, winreg.REG_SZ, f'"{launcher_path}" --boot')
         
         print("✅ Auto-start registry entry created")
         
@@ -287,6 +492,10 @@ def main():
     print("🔧 WhatsApp Blur Professional Installer")
     print("=" * 50)
     
+    if len(sys.argv) == 3 and sys.argv[1] == "--bundle-only":
+        build_bundle(Path(__file__).parent / "whatsapp_blur_final.py", sys.argv[2])
+        return
+    
     # Check admin rights
     if not is_admin():
         print("❌ Administrator rights required for installation")
@@ -304,7 +513,7 @@ def main():
         
         setup_privacy_permissions()
         
-    success_message = """
+        success_message = """
 🎉 WhatsApp Blur installed successfully!
 
 ✅ Auto-start enabled - no need to manually open
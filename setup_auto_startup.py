@@ -2,6 +2,10 @@
 """
 WhatsApp Blur - Auto Startup Setup
 Configures the app to start automatically when Windows boots
+
+The startup entry launches the app with --boot: it registers the hotkey first and loads
+everything else once the system is idle after logon, recording phase times from logon in
+%LOCALAPPDATA%\WhatsApp Blur\boot_timings.json.
 """
 
 import os
@@ -10,6 +14,18 @@ import sys
 from pathlib import Path
 import subprocess
 
+INSTALL_DIR = Path(r"C:\Users\Public\WhatsApp Blur")
+
+def pythonw_path():
+    """pythonw.exe next to this interpreter (no console window), else the interpreter itself"""
+    windowed = Path(sys.executable).with_name("pythonw.exe")
+    return windowed if windowed.exists() else Path(sys.executable)
+
+def launch_target(install_dir=INSTALL_DIR):
+    """The precompiled bundle if the installer built one, else the installed source"""
+    bundle = install_dir / "whatsapp_blur.pyz"
+    return bundle if bundle.exists() else install_dir / "whatsapp_blur.py"
+
 def setup_auto_startup():
     """Configure WhatsApp Blur to start automatically on Windows boot"""
     
@@ -20,9 +36,9 @@ def setup_auto_startup():
         # Get the startup folder path
         startup_folder = os.path.expanduser(r"~\AppData\Roaming\Microsoft\Windows\Start Menu\Programs\Startup")
         
-        # Create silent VBS startup script (no window)
-        startup_script_content = '''Set WshShell = CreateObject("WScript.Shell")
-WshShell.Run """C:\\Users\\yonat\\AppData\\Local\\Programs\\Python\\Python313\\pythonw.exe"" ""C:\\Users\\Public\\WhatsApp Blur\\whatsapp_blur.py""", 0, False
+        # Create silent VBS startup script (no window); --boot defers the heavy start until idle
+        startup_script_content = f'''Set WshShell = CreateObject("WScript.Shell")
+WshShell.Run """{pythonw_path()}"" ""{launch_target()}"" --boot", 0, False
 '''
         
         startup_script_path = os.path.join(startup_folder, "WhatsApp_Blur_Silent.vbs")
@@ -34,10 +50,7 @@ WshShell.Run """C:\\Users\\yonat\\AppData\\Local\\Programs\\Python\\Python313\\p
         print(f"✅ Startup script created: {startup_script_path}")
         
         print("✅ Auto-startup configured via startup folder only (single method to prevent duplicates)")
-            
-        except Exception as e:
-            print(f"⚠️ Registry method failed: {e}")
-            print("✅ Startup folder method still active")
+        print("⏱️ Boot launch: hotkey first, the rest once the system is idle (see boot_timings.json)")
         
         print("\n🎉 AUTO-STARTUP CONFIGURED!")
         print("📱 WhatsApp Blur will now start automatically when you boot your laptop")
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+WhatsApp Blur - Accelerated Soak Test Harness
+Drives the app against a simulated desktop with a virtual clock through weeks of
+show/hide/hover/move/focus cycles in minutes, and checks that memory, threads,
+Tk widgets and after() callbacks stay flat.
+
+Usage:
+    python soak_harness.py --days 14 --output soak_timeseries.csv
+"""
+
+import argparse
+import csv
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import types
+
+import psutil
+
+WHATSAPP_HWND = 1001
+OTHER_HWND = 2002
+SIMULATED_PID = 999999  # No such process; the app falls back to matching the title
+
+class SimulatedClock:
+    """Virtual wall clock standing in for the `time` module.
+
+    time() and monotonic() follow virtual time; sleeps only yield so background threads
+    still get to run. Everything else (strftime, localtime, ...) is the real module's.
+    """
+
+    def __init__(self, start=1_700_000_000.0, speedup=1000.0):
+        self.now = start
+        self.speedup = speedup
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+    def time(self):
+        with self._lock:
+            return self.now
+
+    def monotonic(self):
+        # Virtual time never goes backwards, so it serves as the monotonic clock too
+        return self.time()
+
+    def advance(self, seconds):
+        with self._lock:
+            self.now += seconds
+
+    def perf_counter(self):
+        # Durations are measured in real time
+        return time.perf_counter()
+
+    def sleep(self, seconds):
+        time.sleep(min(seconds / self.speedup, 0.005))
+
+class SimulatedDesktop:
+    """One WhatsApp window, one other app, a cursor and the overlay windows' styles"""
+
+    def __init__(self, screen=(1920, 1080)):
+        self.screen = screen
+        self.rect = (200, 100, 1200, 800)
+        self.visible = True
+        self.minimized = False
+        self.foreground = WHATSAPP_HWND
+        self.cursor = (0, 0)
+        self.window_styles = {}
+
+    def move(self, dx, dy):
+        x, y, x2, y2 = self.rect
+        self.rect = (x + dx, y + dy, x2 + dx, y2 + dy)
+
+    def resize(self, width, height):
+        x, y, _, _ = self.rect
+        self.rect = (x, y, x + width, y + height)
+
+    def cursor_inside(self):
+        x, y, x2, y2 = self.rect
+        self.cursor = ((x + x2) // 2, (y + y2) // 2)
+
+    def cursor_outside(self):
+        self.cursor = (self.screen[0] - 1, self.screen[1] - 1)
+
+    def install_modules(self):
+        """Register fake win32gui/win32con/win32api/win32process/pystray modules"""
+        desktop = self
+
+        win32gui = types.ModuleType('win32gui')
+        win32gui.IsWindow = lambda hwnd: hwnd in (WHATSAPP_HWND, OTHER_HWND)
+        win32gui.IsWindowVisible = lambda hwnd: hwnd != WHATSAPP_HWND or desktop.visible
+        win32gui.IsIconic = lambda hwnd: hwnd == WHATSAPP_HWND and desktop.minimized
+        win32gui.GetWindowRect = lambda hwnd: desktop.rect if hwnd == WHATSAPP_HWND else (0, 0, 800, 600)
+        win32gui.GetForegroundWindow = lambda: desktop.foreground
+        win32gui.GetCursorPos = lambda: desktop.cursor
+        win32gui.GetWindowText = lambda hwnd: 'WhatsApp' if hwnd == WHATSAPP_HWND else 'Notepad'
+        win32gui.GetClassName = lambda hwnd: 'SimulatedWindow'
+        # Z-order: the foreground window is on top
+        win32gui.GetWindow = lambda hwnd, cmd: (OTHER_HWND if hwnd == WHATSAPP_HWND
+                                                and desktop.foreground == OTHER_HWND else 0)
+
+        def enum_windows(callback, extra):
+            for hwnd in (OTHER_HWND, WHATSAPP_HWND):
+                callback(hwnd, extra)
+        win32gui.EnumWindows = enum_windows
+        win32gui.GetWindowLong = lambda hwnd, index: desktop.window_styles.get(hwnd, 0)
+        win32gui.SetWindowLong = lambda hwnd, index, style: desktop.window_styles.__setitem__(hwnd, style)
+        win32gui.SetWindowPos = lambda *args: None
+        win32gui.PostMessage = lambda *args: None
+
+        win32con = types.ModuleType('win32con')
+        for name, value in {'GWL_EXSTYLE': -20, 'WS_EX_LAYERED': 0x80000, 'WS_EX_TRANSPARENT': 0x20,
+                            'HWND_TOPMOST': -1, 'SWP_SHOWWINDOW': 0x40, 'SWP_NOACTIVATE': 0x10,
+                            'WM_CLOSE': 0x10, 'WM_DESTROY': 0x2}.items():
+            setattr(win32con, name, value)
+
+        win32api = types.ModuleType('win32api')
+        win32api.GetSystemMetrics = lambda index: desktop.screen[index] if index in (0, 1) else 0
+        win32api.GetModuleHandle = lambda name: 0
+        screen_rect = (0, 0) + tuple(desktop.screen)
+        win32api.EnumDisplayMonitors = lambda hdc, clip: [(1, None, screen_rect)]
+        win32api.GetMonitorInfo = lambda hmonitor: {'Monitor': screen_rect, 'Work': screen_rect, 'Flags': 1}
+
+        win32process = types.ModuleType('win32process')
+        win32process.GetWindowThreadProcessId = lambda hwnd: (1, SIMULATED_PID)
+
+        pystray = types.ModuleType('pystray')
+        pystray.Menu = lambda *items: items
+        pystray.MenuItem = lambda *args, **kwargs: args
+        pystray.Icon = lambda *args, **kwargs: types.SimpleNamespace(run=lambda: None, stop=lambda: None, menu=None)
+
+        for module in (win32gui, win32con, win32api, win32process, pystray):
+            sys.modules[module.__name__] = module
+
+def load_app_module(clock):
+    """Import the app with the simulated desktop in place and the virtual clock injected"""
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import whatsapp_blur_final
+    whatsapp_blur_final.time = clock
+    return whatsapp_blur_final
+
+def pump(app, timeout=5.0):
+    """Run UI work until nothing is queued or rendering"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        app.process_ui_queue()
+        app.root.update()
+        future = app._render_future or app._refresh_future
+        if future and not future.done():
+            future.result(timeout=max(0.1, deadline - time.monotonic()))
+            continue
+        if app.ui_queue.empty() and not app.arbiter.busy and app.arbiter.desired is None:
+            return
+
+def take_sample(app, clock, started):
+    process = psutil.Process()
+    return {
+        'virtual_hours': round((clock.time() - started) / 3600, 3),
+        'rss_mb': round(process.memory_info().rss / 1024 / 1024, 2),
+        'threads': threading.active_count(),
+        'os_threads': process.num_threads(),
+        'active_callbacks': len(app.active_callbacks),
+        'tk_after_pending': len(app.root.tk.splitlist(app.root.tk.call('after', 'info'))),
+        'tk_children': len(app.root.winfo_children()),
+        'blurred': int(app.is_blurred),
+    }
+
+def run_soak(days, mean_gap, seed, sample_every, output):
+    clock = SimulatedClock()
+    desktop = SimulatedDesktop()
+    desktop.install_modules()
+    app_module = load_app_module(clock)
+
+    app = app_module.WhatsAppBlurFinal(start_background=False)
+    app.capture_backend_name = 'fake'
+    app.process_name_cache[SIMULATED_PID] = 'whatsapp.exe'
+    app.arbiter.min_render_interval = 0  # Virtual time jumps; don't hold requests back
+
+    rng = random.Random(seed)
+    actions = ['focus_away', 'focus_back', 'move', 'resize', 'hotkey', 'hover',
+               'minimize', 'restore', 'idle']
+    started = clock.time()
+    end = started + days * 86400
+    samples = []
+    step = 0
+
+    print(f"🧪 Soak: {days} simulated days, mean gap {mean_gap}s, seed {seed}")
+    while clock.time() < end:
+        clock.advance(rng.expovariate(1.0 / mean_gap))
+        action = rng.choice(actions)
+
+        if action == 'focus_away':
+            desktop.foreground = OTHER_HWND
+        elif action == 'focus_back':
+            desktop.foreground = WHATSAPP_HWND
+        elif action == 'move':
+            desktop.move(rng.randint(-50, 50), rng.randint(-50, 50))
+        elif action == 'resize':
+            desktop.resize(rng.randint(600, 1400), rng.randint(500, 900))
+        elif action == 'hotkey':
+            app.toggle_blur()
+        elif action == 'hover' and app.is_blurred:
+            desktop.cursor_inside()
+            app.on_hover_enter(None)
+            clock.advance(rng.uniform(1, 30))
+            desktop.cursor_outside()
+            app._hover_tick()
+        elif action == 'minimize':
+            desktop.minimized = True
+        elif action == 'restore':
+            desktop.minimized = False
+
+        # Window cache TTL is in virtual time, so every tick sees the current desktop
+        app._monitor_tick()
+        pump(app)
+
+        if step % sample_every == 0:
+            samples.append(take_sample(app, clock, started))
+        step += 1
+
+    samples.append(take_sample(app, clock, started))
+    with open(output, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(samples[0]))
+        writer.writeheader()
+        writer.writerows(samples)
+    print(f"📈 {step} steps, {len(samples)} samples written to {output}")
+    return samples
+
+def check_bounds(samples, max_rss_growth_mb, max_extra_threads, max_callbacks, max_tk_children):
+    """Return a list of violated bounds (empty if everything stayed flat)"""
+    failures = []
+    quarter = max(1, len(samples) // 4)
+    # Compare steady-state medians, skipping the first quarter's warm-up
+    early = statistics.median(s['rss_mb'] for s in samples[quarter:2 * quarter] or samples[:quarter])
+    late = statistics.median(s['rss_mb'] for s in samples[-quarter:])
+    if late - early > max_rss_growth_mb:
+        failures.append(f"RSS grew {late - early:.1f} MB (limit {max_rss_growth_mb} MB)")
+
+    baseline_threads = samples[0]['threads']
+    peak_threads = max(s['threads'] for s in samples)
+    if peak_threads - baseline_threads > max_extra_threads:
+        failures.append(f"Threads grew {baseline_threads} → {peak_threads} (limit +{max_extra_threads})")
+
+    peak_callbacks = max(s['active_callbacks'] for s in samples)
+    if peak_callbacks > max_callbacks:
+        failures.append(f"active_callbacks reached {peak_callbacks} (limit {max_callbacks})")
+
+    peak_after = max(s['tk_after_pending'] for s in samples)
+    if peak_after > max_callbacks:
+        failures.append(f"Pending Tk after() events reached {peak_after} (limit {max_callbacks})")
+
+    peak_children = max(s['tk_children'] for s in samples)
+    if peak_children > max_tk_children:
+        failures.append(f"Tk widgets reached {peak_children} (limit {max_tk_children})")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Accelerated soak test for WhatsApp Blur")
+    parser.add_argument('--days', type=float, default=14, help="Simulated days to run")
+    parser.add_argument('--mean-gap', type=float, default=60, help="Mean simulated seconds between events")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--sample-every', type=int, default=100, help="Steps between samples")
+    parser.add_argument('--output', default='soak_timeseries.csv')
+    parser.add_argument('--max-rss-growth-mb', type=float, default=20)
+    parser.add_argument('--max-extra-threads', type=int, default=3)
+    parser.add_argument('--max-callbacks', type=int, default=5)
+    parser.add_argument('--max-tk-children', type=int, default=2)
+    args = parser.parse_args()
+
+    wall_start = time.monotonic()
+    samples = run_soak(args.days, args.mean_gap, args.seed, args.sample_every, args.output)
+    failures = check_bounds(samples, args.max_rss_growth_mb, args.max_extra_threads,
+                            args.max_callbacks, args.max_tk_children)
+    print(f"⏱️ Finished in {time.monotonic() - wall_start:.0f}s wall time")
+
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ Memory, threads, widgets and callbacks stayed within bounds")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""Test setup: the simulated Windows modules from the soak harness, then the app module"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from soak_harness import SimulatedDesktop
+
+SimulatedDesktop().install_modules()
+
+@pytest.fixture(scope='session')
+def app_module():
+    import whatsapp_blur_final
+    return whatsapp_blur_final
@@ -0,0 +1,56 @@
+def test_burst_of_toggles_merges_into_one_action(app_module):
+    arbiter = app_module.BlurRequestArbiter()
+    for _ in range(5):
+        arbiter.toggle(is_blurred=False)
+    assert arbiter.desired is True and arbiter.merged == 4
+    kind, token = arbiter.next_action(False, now=10.0)
+    assert kind == 'show' and token == arbiter.sequence
+    assert arbiter.next_action(False, now=10.0) is None  # One at a time
+
+def test_even_burst_cancels_out(app_module):
+    arbiter = app_module.BlurRequestArbiter()
+    for _ in range(4):
+        arbiter.toggle(is_blurred=False)
+    assert arbiter.next_action(False, now=10.0) is None
+    assert arbiter.desired is None and not arbiter.busy
+
+def test_hide_supersedes_in_flight_show(app_module):
+    arbiter = app_module.BlurRequestArbiter()
+    arbiter.request(True)
+    show = arbiter.next_action(False, now=10.0)
+    # The user sees the blur coming, so a toggle now means "off"
+    assert arbiter.toggle(is_blurred=False) is False
+    hide = arbiter.next_action(False, now=10.1)
+    assert hide[0] == 'hide'
+    arbiter.complete(show[1])  # The show's render finishing late doesn't clear the hide
+    assert arbiter.in_flight == hide
+    arbiter.complete(hide[1])
+    assert not arbiter.busy and arbiter.desired is None
+
+def test_request_during_in_flight_action_runs_afterwards(app_module):
+    arbiter = app_module.BlurRequestArbiter()
+    arbiter.request(False)
+    hide = arbiter.next_action(True, now=10.0)
+    arbiter.request(True)
+    assert arbiter.next_action(True, now=10.0) is None
+    arbiter.complete(hide[1])
+    assert arbiter.desired is True
+    assert arbiter.next_action(False, now=10.0)[0] == 'show'
+
+def test_start_limit_keeps_the_request(app_module):
+    arbiter = app_module.BlurRequestArbiter(min_render_interval=0.5)
+    arbiter.request(True)
+    _, token = arbiter.next_action(False, now=10.0)
+    arbiter.complete(token)
+    arbiter.request(True)  # e.g. the first show found no window
+    assert arbiter.next_action(False, now=10.2) is None
+    assert arbiter.desired is True
+    assert arbiter.next_action(False, now=10.6)[0] == 'show'
+
+def test_hides_are_never_rate_limited(app_module):
+    arbiter = app_module.BlurRequestArbiter(min_render_interval=0.5)
+    arbiter.request(True)
+    _, token = arbiter.next_action(False, now=10.0)
+    arbiter.complete(token)
+    arbiter.request(False)
+    assert arbiter.next_action(True, now=10.1)[0] == 'hide'
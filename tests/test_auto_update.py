@@ -0,0 +1,85 @@
+import json
+import os
+
+import pytest
+
+import auto_update
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'whatsapp_blur_final.py'
+    path.write_text("print('new version')\n", encoding='utf-8')
+    return path
+
+def test_target_with_matching_hash_is_skipped(tmp_path, source):
+    target = tmp_path / 'install' / 'whatsapp_blur.py'
+    target.parent.mkdir()
+    target.write_bytes(source.read_bytes())
+    mtime = target.stat().st_mtime_ns
+    [(status, _, _)] = auto_update.update_targets(str(source), [str(target)])
+    assert status == 'unchanged'
+    assert target.stat().st_mtime_ns == mtime
+
+def test_outdated_target_is_replaced_atomically(tmp_path, source):
+    target = tmp_path / 'install' / 'whatsapp_blur.py'
+    target.parent.mkdir()
+    target.write_text("print('old version')\n", encoding='utf-8')
+    [(status, _, detail)] = auto_update.update_targets(str(source), [str(target)])
+    assert status == 'updated'
+    assert auto_update.file_hash(str(target)) == auto_update.file_hash(str(source))
+    assert detail == auto_update.file_hash(str(source))[:12]
+    # No temp files left next to the target
+    assert os.listdir(target.parent) == ['whatsapp_blur.py']
+
+def test_missing_target_directory_is_created(tmp_path, source):
+    target = tmp_path / 'new' / 'dir' / 'whatsapp_blur.py'
+    [(status, _, _)] = auto_update.update_targets(str(source), [str(target)])
+    assert status == 'updated'
+    assert target.read_bytes() == source.read_bytes()
+
+def test_source_itself_is_skipped(source):
+    [(status, _, _)] = auto_update.update_targets(str(source), [str(source)])
+    assert status == 'skipped'
+
+def test_hash_mismatch_keeps_old_file(tmp_path, source):
+    target = tmp_path / 'whatsapp_blur.py'
+    target.write_text("print('old version')\n", encoding='utf-8')
+    with pytest.raises(IOError):
+        auto_update.atomic_copy(str(source), str(target), expected_hash='0' * 64)
+    assert target.read_text(encoding='utf-8') == "print('old version')\n"
+    assert set(os.listdir(tmp_path)) == {'whatsapp_blur_final.py', 'whatsapp_blur.py'}
+
+def test_failures_are_reported_per_target(tmp_path, source):
+    blocker = tmp_path / 'not_a_dir'
+    blocker.write_text('', encoding='utf-8')
+    good = tmp_path / 'good' / 'whatsapp_blur.py'
+    results = auto_update.update_targets(str(source), [str(blocker / 'whatsapp_blur.py'), str(good)])
+    assert [status for status, _, _ in results] == ['failed', 'updated']
+
+def test_missing_source_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        auto_update.update_targets(str(tmp_path / 'missing.py'), [str(tmp_path / 'target.py')])
+
+def test_restart_request_written_into_data_dir(tmp_path):
+    assert auto_update.request_restart(str(tmp_path), ['C:/target.py'])
+    with open(tmp_path / auto_update.RESTART_REQUEST_FILE, encoding='utf-8') as f:
+        request = json.load(f)
+    assert request['reason'] == 'update'
+    assert request['updated'] == ['C:/target.py']
+    assert os.listdir(tmp_path) == [auto_update.RESTART_REQUEST_FILE]
+
+def test_no_restart_request_without_data_dir(tmp_path):
+    assert not auto_update.request_restart(str(tmp_path / 'never_ran'), ['x'])
+
+def test_restart_file_name_matches_app(app_module):
+    assert auto_update.RESTART_REQUEST_FILE == app_module.RESTART_REQUEST_FILE
+
+def test_main_updates_and_requests_restart(tmp_path, source):
+    target = tmp_path / 'install' / 'whatsapp_blur.py'
+    data_dir = tmp_path / 'data'
+    data_dir.mkdir()
+    code = auto_update.main(['--source', str(source), '--target', str(target), '--data-dir', str(data_dir),
+                             '--no-shortcut', '--no-pause'])
+    assert code == 0
+    assert target.read_bytes() == source.read_bytes()
+    assert (data_dir / auto_update.RESTART_REQUEST_FILE).exists()
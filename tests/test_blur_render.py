@@ -0,0 +1,64 @@
+import pytest
+from PIL import Image
+
+class RecordingGovernor:
+    budget_ms = 120.0
+
+    def __init__(self):
+        self.renders = []
+
+    def record_render(self, elapsed_ms):
+        self.renders.append(elapsed_ms)
+
+def make_app(app_module, screenshot, rect):
+    """An app with just the state the blur render path uses; no Tk window"""
+    app = app_module.WhatsAppBlurFinal.__new__(app_module.WhatsAppBlurFinal)
+    app.overlay_styles = {name: style() for name, style in app_module.OVERLAY_STYLES.items()}
+    app.style_costs = app_module.StyleCostModel(app.overlay_styles)
+    app.governor = RecordingGovernor()
+    app.blur_style = 'glass'
+    app.blur_radius_scale = 1.0
+    app.texture_style = None
+    app.stage_metrics = {}
+    app.whatsapp_rect = None
+    app.capture_engine = None
+    app.capture_whatsapp_screenshot = lambda hwnd, rect: (screenshot, rect)
+    app._is_stale = lambda generation: False
+    return app
+
+def test_worker_returns_rect_and_timings_instead_of_storing_them(app_module):
+    rect = (10, 20, 310, 420)
+    app = make_app(app_module, Image.new('RGB', (300, 400)), rect)
+    result = app._render_blur_texture(1, 1001, rect, app_module.QUALITY_TIERS[2], None, None, None)
+    assert result.rect == rect and result.style == 'glass' and result.tier == 'low'
+    assert result.texture.size == (300, 400)
+    assert set(result.stages) == {'capture', 'render'} and len(result.render_ms) == 1
+    # Nothing shared was touched on the worker
+    assert app.whatsapp_rect is None and app.stage_metrics == {} and app.governor.renders == []
+
+def test_reused_texture_records_no_render(app_module):
+    previous = Image.new('RGB', (300, 400))
+    app = make_app(app_module, Image.new('RGB', (300, 400)), (0, 0, 300, 400))
+    result = app._render_blur_texture(1, 1001, (0, 0, 300, 400), app_module.QUALITY_TIERS[0],
+                                      previous, 'high', 'glass')
+    assert result.texture is previous and result.render_ms == []
+
+def test_render_stats_are_applied_on_the_tk_thread(app_module):
+    app = make_app(app_module, None, None)
+    app._apply_render_stats({'capture': 4.0, 'render': 9.0}, [9.0])
+    assert app.stage_metrics == {'capture': 4.0, 'render': 9.0}
+    assert app.governor.renders == [9.0]
+
+def test_overlay_style_base_is_abstract(app_module):
+    with pytest.raises(TypeError):
+        app_module.OverlayStyle()
+
+def test_capture_uses_the_snapshot_not_live_state(app_module, monkeypatch):
+    app = app_module.WhatsAppBlurFinal.__new__(app_module.WhatsAppBlurFinal)
+    app.whatsapp_hwnd = None  # Cleared by the Tk thread after the request was made
+    app.capturing_screenshot = False
+    app.capture_engine = app_module.CaptureEngine(app_module.FakeCaptureBackend())
+    monkeypatch.setattr(app_module.time, 'sleep', lambda seconds: pytest.fail("capture slept"))
+    rect = (200, 100, 1200, 800)
+    screenshot, captured_rect = app.capture_whatsapp_screenshot(1001, rect)
+    assert captured_rect == rect and screenshot.size == (1000, 700)
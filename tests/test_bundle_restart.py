@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+import types
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Stand-in app: the first run restarts itself with the real app's relaunch_command, the
+# replacement records what it was started as
+STANDIN_APP = '''
+import os, subprocess, sys
+sys.path[:0] = {path!r}
+from soak_harness import SimulatedDesktop
+SimulatedDesktop().install_modules()
+import whatsapp_blur_final
+if '--replace' in sys.argv:
+    with open({marker!r}, 'w') as f:
+        f.write(sys.argv[0])
+else:
+    subprocess.run(whatsapp_blur_final.relaunch_command('--replace'), check=True, timeout=60)
+'''
+
+@pytest.fixture
+def installer(monkeypatch):
+    # The installer imports winreg at the top; bundling doesn't use it
+    monkeypatch.setitem(sys.modules, 'winreg', types.ModuleType('winreg'))
+    sys.modules.pop('install_whatsapp_blur', None)
+    import install_whatsapp_blur
+    return install_whatsapp_blur
+
+def test_restart_from_bundle_relaunches_the_bundle(installer, tmp_path):
+    marker = tmp_path / 'replaced_by.txt'
+    source = tmp_path / 'whatsapp_blur.py'
+    source.write_text(STANDIN_APP.format(path=[ROOT] + [p for p in sys.path if p], marker=str(marker)),
+                      encoding='utf-8')
+    bundle = installer.build_bundle(source, tmp_path / 'install')
+
+    subprocess.run([sys.executable, str(bundle)], check=True, timeout=120, cwd=str(tmp_path))
+    assert os.path.abspath(marker.read_text()) == os.path.abspath(str(bundle))
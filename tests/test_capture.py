@@ -0,0 +1,80 @@
+import pytest
+import numpy as np
+
+def make_engine(app_module):
+    return app_module.CaptureEngine(app_module.FakeCaptureBackend())
+
+def test_buffer_reused_while_size_is_unchanged(app_module):
+    engine = make_engine(app_module)
+    first = engine.capture((0, 0, 320, 240))
+    second = engine.capture((50, 50, 370, 290))  # Moved, same size
+    assert engine.allocations == 1
+    assert second is first
+    assert first.shape == (240, 320, 4)
+    assert engine.captures == 2
+
+def test_buffer_reallocated_on_resize(app_module):
+    engine = make_engine(app_module)
+    engine.capture((0, 0, 320, 240))
+    resized = engine.capture((0, 0, 641, 479))
+    assert engine.allocations == 2
+    assert resized.shape == (479, 641, 4)
+    # Contents come from the latest grab, at the new size
+    assert np.array_equal(resized, app_module.synthetic_frame(641, 479, 1))
+
+def test_empty_rect_is_rejected(app_module):
+    engine = make_engine(app_module)
+    assert engine.capture((10, 10, 10, 50)) is None
+    assert engine.allocations == 0
+
+def test_capture_image_does_not_alias_buffer(app_module):
+    engine = make_engine(app_module)
+    image = engine.capture_image((0, 0, 64, 32))
+    before = image.tobytes()
+    engine.capture((0, 0, 64, 32))  # Overwrites the reusable buffer
+    assert image.size == (64, 32)
+    assert image.tobytes() == before
+
+def test_set_backend_forces_reallocation(app_module):
+    engine = make_engine(app_module)
+    engine.capture((0, 0, 100, 100))
+    engine.set_backend(app_module.FakeCaptureBackend())
+    engine.capture((0, 0, 100, 100))
+    assert engine.allocations == 2
+
+class FakeDll:
+    """ctypes.WinDLL stand-in: every function returns 1 and accepts prototypes"""
+
+    def __init__(self, name, use_last_error=False):
+        self.name = name
+        self.use_last_error = use_last_error
+
+    def __getattr__(self, function):
+        def call(*args):
+            return 1
+        setattr(self, function, call)
+        return call
+
+def test_gdi_backend_uses_private_dll_instances(app_module, monkeypatch):
+    loaded = []
+    def load(name, use_last_error=False):
+        loaded.append(FakeDll(name, use_last_error))
+        return loaded[-1]
+    monkeypatch.setattr(app_module.ctypes, 'WinDLL', load, raising=False)
+    backend = app_module.PrintWindowCaptureBackend()
+    assert [(dll.name, dll.use_last_error) for dll in loaded] == [('user32', True), ('gdi32', True)]
+    assert backend._user32.PrintWindow.argtypes is not None
+
+def test_screenshot_test_goes_through_the_capture_engine(app_module):
+    app = app_module.WhatsAppBlurFinal.__new__(app_module.WhatsAppBlurFinal)
+    app.capture_engine = make_engine(app_module)
+    image = app.capture_test_image((0, 0, 400, 300))
+    assert image.size == (400, 300)
+    assert app.capture_engine.captures == 1
+
+def test_screenshot_test_fails_without_a_backend(app_module):
+    app = app_module.WhatsAppBlurFinal.__new__(app_module.WhatsAppBlurFinal)
+    app.capture_engine = None
+    app.capture_backend_name = None
+    with pytest.raises(RuntimeError):
+        app.capture_test_image((0, 0, 400, 300))
@@ -0,0 +1,133 @@
+import ctypes
+import types
+
+import pytest
+
+WHATSAPP, ABOVE = 1001, 2002
+PRIMARY = (0, 0, 1920, 1080)
+# Secondary monitor left of and higher than the primary: negative origin
+SECONDARY = (-1280, -200, 0, 824)
+
+@pytest.fixture
+def win32(app_module, monkeypatch):
+    """Two monitors, WhatsApp's rect and the z-order, on top of the soak harness's fake modules"""
+    state = types.SimpleNamespace(rects={WHATSAPP: (200, 100, 1200, 800)}, above={}, reads=0)
+    monitors = {1: PRIMARY, 2: SECONDARY}
+    metrics = {0: 1920, 1: 1080, 76: -1280, 77: -200, 78: 3200, 79: 1280}
+
+    def get_window_rect(hwnd):
+        state.reads += 1
+        return state.rects[hwnd]
+    monkeypatch.setattr(app_module.win32api, 'EnumDisplayMonitors',
+                        lambda hdc, clip: [(handle, None, rect) for handle, rect in monitors.items()])
+    monkeypatch.setattr(app_module.win32api, 'GetMonitorInfo',
+                        lambda handle: {'Monitor': monitors[handle], 'Work': monitors[handle],
+                                        'Flags': 1 if handle == 1 else 0})
+    monkeypatch.setattr(app_module.win32api, 'GetSystemMetrics', lambda index: metrics.get(index, 0))
+    monkeypatch.setattr(app_module.win32gui, 'GetWindowRect', get_window_rect)
+    monkeypatch.setattr(app_module.win32gui, 'GetWindow', lambda hwnd, cmd: state.above.get(hwnd, 0))
+    monkeypatch.setattr(app_module.win32gui, 'IsWindow', lambda hwnd: hwnd in state.rects)
+    return state
+
+@pytest.fixture
+def geometry(app_module, win32):
+    geometry = app_module.DesktopGeometry(window_ttl=0.5)
+    geometry.refresh_monitors()
+    return geometry
+
+def test_monitor_layout_with_negative_origin(geometry):
+    assert [m['rect'] for m in geometry.monitors] == [PRIMARY, SECONDARY]
+    assert geometry.virtual_screen == (-1280, -200, 1920, 1080)
+    assert [m['primary'] for m in geometry.monitors] == [True, False]
+
+@pytest.mark.parametrize('rect, expected', [
+    ((-1000, 100, -200, 700), SECONDARY),   # Entirely on the secondary monitor
+    ((-900, 100, 300, 700), SECONDARY),     # Straddling, mostly on the secondary
+    ((-300, 100, 900, 700), PRIMARY),       # Straddling, mostly on the primary
+    ((100, -190, 900, -10), None),          # Inside the virtual screen, above the primary: no monitor
+    ((-3000, 100, -2000, 700), None),       # Left of everything
+])
+def test_monitor_for_with_negative_origin(geometry, rect, expected):
+    monitor = geometry.monitor_for(rect)
+    assert (monitor['rect'] if monitor else None) == expected
+
+def test_visible_area_spans_both_monitors(geometry):
+    # 400 px wide on each side of x = 0; the top 100 px are only on the secondary
+    assert geometry.visible_area((-400, -100, 400, 300)) == 400 * 400 + 400 * 300
+    assert geometry.visible_area((100, -190, 900, -10)) == 0
+
+def make_oracle(app_module, geometry, win32):
+    oracle = app_module.VisibilityOracle(geometry)
+    # No DWM or virtual desktop COM here: treat every window as uncloaked on this desktop
+    oracle.is_cloaked = lambda hwnd: False
+    oracle.is_on_current_desktop = lambda hwnd: None
+    oracle._frame_rect = lambda hwnd: win32.rects[hwnd]
+    return oracle
+
+def test_window_on_the_secondary_monitor_is_visible(app_module, geometry, win32):
+    win32.rects[WHATSAPP] = (-1100, -150, -100, 650)
+    report = make_oracle(app_module, geometry, win32).check(WHATSAPP)
+    assert report.visible and report.exposed_fraction == pytest.approx(1.0)
+
+def test_window_off_every_monitor_is_off_screen(app_module, geometry, win32):
+    win32.rects[WHATSAPP] = (-3000, 100, -2000, 700)
+    report = make_oracle(app_module, geometry, win32).check(WHATSAPP)
+    assert not report.visible and report.reason == 'off screen'
+
+def test_window_in_the_gap_between_monitors_is_off_screen(app_module, geometry, win32):
+    win32.rects[WHATSAPP] = (100, -190, 900, -10)
+    report = make_oracle(app_module, geometry, win32).check(WHATSAPP)
+    assert not report.visible and report.reason == 'off screen'
+
+def test_window_covered_on_the_secondary_monitor_is_occluded(app_module, geometry, win32):
+    win32.rects[WHATSAPP] = (-1100, -150, -100, 650)
+    win32.rects[ABOVE] = (-1280, -200, 0, 824)
+    win32.above[WHATSAPP] = ABOVE
+    report = make_oracle(app_module, geometry, win32).check(WHATSAPP)
+    assert not report.visible and report.reason == 'occluded'
+
+def test_partly_covered_straddling_window_counts_both_monitors(app_module, geometry, win32):
+    win32.rects[WHATSAPP] = (-500, 100, 500, 600)
+    win32.rects[ABOVE] = (-1280, -200, 0, 824)  # Covers the secondary half
+    win32.above[WHATSAPP] = ABOVE
+    report = make_oracle(app_module, geometry, win32).check(WHATSAPP)
+    assert report.visible and report.exposed_fraction == pytest.approx(0.5)
+
+def test_rects_are_re_read_after_ttl_without_a_move_hook(geometry, win32):
+    assert not geometry.window_events_live
+    assert geometry.window_rect(WHATSAPP) == (200, 100, 1200, 800)
+    read_at = geometry.windows[WHATSAPP][1]
+    win32.rects[WHATSAPP] = (300, 100, 1300, 800)
+    assert geometry.window_rect(WHATSAPP, now=read_at + 0.2) == (200, 100, 1200, 800)
+    assert win32.reads == 1
+    assert geometry.window_rect(WHATSAPP, now=read_at + 0.6) == (300, 100, 1300, 800)
+    assert win32.reads == 2
+
+def test_rects_are_kept_while_the_move_hook_is_live(geometry, win32):
+    geometry.window_events_live = True
+    geometry.window_rect(WHATSAPP)
+    read_at = geometry.windows[WHATSAPP][1]
+    win32.rects[WHATSAPP] = (300, 100, 1300, 800)
+    assert geometry.window_rect(WHATSAPP, now=read_at + 60) == (200, 100, 1200, 800)
+    geometry.on_window_moved(WHATSAPP)
+    assert geometry.window_rect(WHATSAPP) == (300, 100, 1300, 800)
+
+def test_refused_hook_falls_back_to_ttl(app_module, geometry):
+    source = app_module.Win32SessionEventSource(None, geometry)
+    source._set_win_event_hook = lambda first, last, pid: 0
+    geometry.window_events_live = True
+    source._hook_moves(4242)
+    assert not geometry.window_events_live and source._watched_pid is None
+
+def test_removed_hook_falls_back_to_ttl_and_drops_rects(app_module, geometry, monkeypatch):
+    unhooked = []
+    monkeypatch.setattr(ctypes, 'windll', types.SimpleNamespace(
+        user32=types.SimpleNamespace(UnhookWinEvent=unhooked.append)), raising=False)
+    source = app_module.Win32SessionEventSource(None, geometry)
+    source._set_win_event_hook = lambda first, last, pid: 77
+    source._hook_moves(4242)
+    geometry.window_rect(WHATSAPP)
+    assert geometry.window_events_live and WHATSAPP in geometry.windows
+    source._unhook_moves()
+    assert unhooked == [77]
+    assert not geometry.window_events_live and geometry.windows == {}
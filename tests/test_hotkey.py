@@ -0,0 +1,50 @@
+import pytest
+
+class FailingBackend:
+    """Backend whose registration raises, e.g. a missing optional package"""
+    name = 'broken'
+
+    def register(self, chord, callback):
+        raise RuntimeError("backend unavailable")
+
+def test_first_accepting_backend_wins(app_module):
+    first = app_module.StubHotkeyBackend()
+    second = app_module.StubHotkeyBackend()
+    presses = []
+    chosen = app_module.register_hotkey('ctrl+alt+q', lambda: presses.append(1), [first, second])
+    assert chosen is first
+    assert 'ctrl+alt+q' in first.callbacks and not second.callbacks
+    first.fire('ctrl+alt+q')
+    assert presses == [1]
+
+def test_falls_back_when_chord_is_taken(app_module):
+    taken = app_module.StubHotkeyBackend(accept=False)
+    fallback = app_module.StubHotkeyBackend()
+    chosen = app_module.register_hotkey('ctrl+alt+q', lambda: None, [taken, fallback])
+    assert chosen is fallback
+
+def test_falls_back_when_backend_raises(app_module):
+    fallback = app_module.StubHotkeyBackend()
+    chosen = app_module.register_hotkey('ctrl+alt+q', lambda: None, [FailingBackend(), fallback])
+    assert chosen is fallback
+
+def test_none_when_every_backend_refuses(app_module):
+    backends = [app_module.StubHotkeyBackend(accept=False), app_module.StubHotkeyBackend(accept=False)]
+    assert app_module.register_hotkey('ctrl+alt+q', lambda: None, backends) is None
+
+def test_invalid_chord_is_not_registered(app_module):
+    backend = app_module.StubHotkeyBackend()
+    assert app_module.register_hotkey('ctrl+alt+nosuchkey', lambda: None, [backend]) is None
+    assert not backend.callbacks
+
+@pytest.mark.parametrize('chord, expected', [
+    ('ctrl+alt+q', (0x0002 | 0x0001, ord('Q'))),
+    ('Shift + F12', (0x0004, 0x7B)),
+    ('win+space', (0x0008, 0x20)),
+])
+def test_parse_hotkey(app_module, chord, expected):
+    assert app_module.parse_hotkey(chord) == expected
+
+def test_backend_interface_is_abstract(app_module):
+    with pytest.raises(TypeError):
+        app_module.HotkeyBackend()
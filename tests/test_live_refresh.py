@@ -0,0 +1,91 @@
+import time
+
+import numpy as np
+import pytest
+from PIL import Image
+
+@pytest.mark.parametrize('height, width', [
+    (700, 1000),   # 29 px cells: odd
+    (768, 1024),   # 32 px cells: even
+    (701, 1001),   # Leftover rows and columns
+    (24, 16),      # 1 px cells
+    (47, 31),      # 1 px cells with leftovers
+])
+def test_fingerprint_handles_odd_and_even_cell_sizes(app_module, height, width):
+    frame = np.zeros((height, width, 4), dtype=np.uint8)
+    fingerprint = app_module.compute_fingerprint(frame, grid=(24, 16))
+    assert fingerprint.shape == (24, 16)
+
+def test_fingerprint_too_small_for_grid(app_module):
+    assert app_module.compute_fingerprint(np.zeros((10, 10, 4), dtype=np.uint8), grid=(24, 16)) is None
+
+def test_changed_band_detected_at_odd_size(app_module):
+    height, width = 700, 1000
+    old = np.zeros((height, width, 4), dtype=np.uint8)
+    new = old.copy()
+    new[300:320, :, :3] = 255
+    bands = app_module.changed_bands(app_module.compute_fingerprint(old),
+                                     app_module.compute_fingerprint(new), 6.0, height)
+    assert bands and all(y0 <= 300 < y1 or y0 < 320 <= y1 for y0, y1 in bands)
+
+def test_detect_changes_leaves_the_baseline_to_the_caller(app_module):
+    controller = app_module.LiveRefreshController()
+    old = np.zeros((700, 1000, 4), dtype=np.uint8)
+    new = old.copy()
+    new[300:320, :, :3] = 255
+    baseline, bands = controller.detect_changes(None, old)
+    assert bands == [] and controller.fingerprint is None
+    fingerprint, bands = controller.detect_changes(baseline, new)
+    assert bands and controller.fingerprint is None and controller.last_sample == 0
+    assert not np.array_equal(fingerprint, baseline)
+
+class FakeFuture:
+    def __init__(self, result):
+        self._result = result
+
+    def cancelled(self):
+        return False
+
+    def result(self):
+        return self._result
+
+class FakePhotoCache:
+    def get(self, image, width, height):
+        return object(), False
+
+def make_app(app_module):
+    """An app showing a 'low'/'frost' texture, with no Tk window"""
+    app = app_module.WhatsAppBlurFinal.__new__(app_module.WhatsAppBlurFinal)
+    app.live_refresh = app_module.LiveRefreshController()
+    app.stage_metrics = {}
+    app._apply_render_stats = lambda stages, render_ms: app.stage_metrics.update(stages)
+    app._render_generation = 3
+    app.is_blurred = True
+    app.blur_cache = Image.new('RGB', (300, 400))
+    app.texture_tier, app.texture_style = 'low', 'frost'
+    app.photo_cache = FakePhotoCache()
+    app.blur_canvas = app.blur_canvas_item = None
+    return app
+
+def test_full_refresh_updates_texture_tier_style_and_baseline(app_module):
+    app = make_app(app_module)
+    texture = Image.new('RGB', (320, 400))
+    fingerprint = np.ones((24, 16))
+    refresh = app_module.ContentRefresh(('full', texture), fingerprint, 'high', 'glass',
+                                        {'live_refresh': 12.0}, [10.0])
+    app.apply_content_bands((3, FakeFuture(refresh)))
+    assert app.blur_cache is texture
+    assert (app.texture_tier, app.texture_style) == ('high', 'glass')
+    assert app.live_refresh.fingerprint is fingerprint
+    assert app.live_refresh.spent_ms(time.time()) == 12.0
+
+def test_stale_refresh_keeps_the_new_baseline(app_module):
+    app = make_app(app_module)
+    previous = app.blur_cache
+    app.live_refresh.reset(np.zeros((24, 16)))
+    baseline = app.live_refresh.fingerprint
+    refresh = app_module.ContentRefresh(('full', Image.new('RGB', (320, 400))), np.ones((24, 16)),
+                                        'high', 'glass', {'live_refresh': 5.0}, [])
+    app.apply_content_bands((2, FakeFuture(refresh)))
+    assert app.blur_cache is previous and app.texture_tier == 'low'
+    assert app.live_refresh.fingerprint is baseline
@@ -0,0 +1,75 @@
+import types
+
+class FakeProcess:
+    """psutil.Process stand-in whose RSS the test sets"""
+
+    def __init__(self, rss_mb):
+        self.rss_mb = rss_mb
+
+    def memory_info(self):
+        return types.SimpleNamespace(rss=int(self.rss_mb * 1024 * 1024))
+
+def make_manager(app_module, rss_mb):
+    manager = app_module.MemoryManager(soft_limit_mb=150.0, hard_limit_mb=250.0, sample_interval=30.0,
+                                       max_hard_backoff=120.0)
+    manager._process = FakeProcess(rss_mb)
+    cleanups = []
+    manager.add_evictor(1, 'cache', lambda: cleanups.append('cache'))
+    manager.hard_cleanup = lambda: cleanups.append('gc')
+    return manager, cleanups
+
+def test_ineffective_hard_cleanup_backs_off(app_module):
+    manager, cleanups = make_manager(app_module, 300.0)
+    assert manager.check(0) == 'hard'
+    assert cleanups == ['cache', 'gc']
+    # Still over the limit: no cleanup again until the back-off has passed
+    assert manager.check(10) == 'hard'
+    assert cleanups == ['cache', 'gc']
+    manager.check(30)
+    assert len(cleanups) == 4
+    # The wait doubles while cleanups keep not helping, up to the cap
+    assert manager.hard_backoff == 60.0
+    manager.check(90)
+    manager.check(210)
+    assert manager.hard_backoff == 120.0 and len(cleanups) == 8
+
+def test_backoff_resets_once_memory_recovers(app_module):
+    manager, cleanups = make_manager(app_module, 300.0)
+    manager.check(0)
+    manager._process.rss_mb = 100.0
+    assert manager.check(10) == 'ok'
+    manager._process.rss_mb = 300.0
+    manager.check(20)
+    assert cleanups == ['cache', 'gc', 'cache', 'gc']
+    assert manager.hard_backoff == 30.0
+
+def test_effective_hard_cleanup_does_not_back_off(app_module):
+    manager, cleanups = make_manager(app_module, 300.0)
+    manager.hard_cleanup = lambda: setattr(manager._process, 'rss_mb', 200.0)
+    manager.check(0)
+    assert manager.hard_backoff == 0.0 and manager.next_hard_cleanup == 0
+
+def test_gc_collect_logs_at_debug_level(app_module, capsys, caplog):
+    policy = app_module.GcPolicy()
+    policy.install()
+    try:
+        with caplog.at_level('DEBUG', logger=app_module.logger.name):
+            policy.collect(1, 'overlay teardown')
+    finally:
+        policy.uninstall()
+    assert capsys.readouterr().out == ''
+    assert any('overlay teardown' in record.getMessage() and record.levelname == 'DEBUG'
+               for record in caplog.records)
+
+def test_soft_limit_eviction_logs_at_debug_level(app_module, capsys, caplog):
+    manager, cleanups = make_manager(app_module, 200.0)
+    with caplog.at_level('DEBUG', logger=app_module.logger.name):
+        assert manager.check(0) == 'soft'
+    assert cleanups == ['cache'] and capsys.readouterr().out == ''
+    assert any('evicting cache' in record.getMessage() and record.levelname == 'DEBUG'
+               for record in caplog.records)
+
+def test_hard_limit_cleanup_is_still_reported(app_module, capsys):
+    manager, _ = make_manager(app_module, 300.0)
+    manager.check(0)
+    assert 'over hard limit' in capsys.readouterr().out
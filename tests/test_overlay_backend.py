@@ -0,0 +1,125 @@
+import pytest
+
+def make_backends(app_module, **system):
+    dwm = app_module.StubDwmApi(**system)
+    compositor = app_module.CompositorBlurOverlayBackend(dwm)
+    return dwm, compositor, [compositor, app_module.TextureOverlayBackend()]
+
+def test_auto_prefers_the_compositor(app_module):
+    _, compositor, backends = make_backends(app_module)
+    backend, reasons = app_module.select_overlay_backend('auto', backends)
+    assert backend is compositor
+    assert reasons['compositor'].startswith('acrylic')
+
+def test_windows_10_gets_plain_blur_behind(app_module):
+    _, compositor, backends = make_backends(app_module, build=19045)
+    assert app_module.select_overlay_backend('auto', backends)[0] is compositor
+    assert compositor.accent_state() == app_module.DwmApi.ACCENT_ENABLE_BLURBEHIND
+
+@pytest.mark.parametrize('system, reason', [
+    ({'build': 9600}, 'needs Windows 10'),
+    ({'composition': False}, 'desktop composition off'),
+    ({'transparency': False}, 'transparency effects off'),
+    ({'accent_policy': False}, 'SetWindowCompositionAttribute missing'),
+])
+def test_unusable_compositor_falls_back_to_texture(app_module, system, reason):
+    _, _, backends = make_backends(app_module, **system)
+    backend, reasons = app_module.select_overlay_backend('auto', backends)
+    assert backend.name == 'texture'
+    assert reason in reasons['compositor']
+
+def test_refused_apply_disables_the_compositor_until_reset(app_module):
+    dwm, compositor, backends = make_backends(app_module, accept=False)
+    assert not compositor.apply(1234)
+    assert dwm.accents == {}
+    backend, reasons = app_module.select_overlay_backend('auto', backends)
+    assert backend.name == 'texture'
+    assert reasons['compositor'].startswith('compositor refused the accent policy')
+
+    dwm.accept = True
+    compositor.reset()
+    assert app_module.select_overlay_backend('auto', backends)[0] is compositor
+    assert compositor.apply(1234)
+    assert dwm.accents[1234][0] == app_module.DwmApi.ACCENT_ENABLE_ACRYLICBLURBEHIND
+
+def test_forced_texture_skips_a_usable_compositor(app_module):
+    _, _, backends = make_backends(app_module)
+    assert app_module.select_overlay_backend('texture', backends)[0].name == 'texture'
+
+def test_forced_compositor_still_falls_back_when_unusable(app_module):
+    _, compositor, backends = make_backends(app_module, composition=False)
+    backend, _ = app_module.select_overlay_backend('compositor', list(reversed(backends)))
+    assert backend.name == 'texture'
+
+class FakeOverlayWindow:
+    """Tk Toplevel stand-in: -alpha attribute and the wrapper frame's HWND"""
+
+    def __init__(self, frame_hwnd):
+        self.frame_hwnd = frame_hwnd
+        self.alpha = 1.0
+        self.alpha_sets = []
+
+    def wm_frame(self):
+        return hex(self.frame_hwnd)
+
+    def winfo_id(self):
+        return self.frame_hwnd + 1  # The client child: must not be used for styles
+
+    def attributes(self, name, value=None):
+        if value is None:
+            return self.alpha
+        self.alpha = value
+        self.alpha_sets.append(value)
+
+def make_overlay(app_module, native):
+    app = app_module.WhatsAppBlurFinal.__new__(app_module.WhatsAppBlurFinal)
+    app.blur_window = FakeOverlayWindow(5005)
+    app.blur_window_native = native
+    return app
+
+def layered(app_module, hwnd):
+    return bool(app_module.win32gui.GetWindowLong(hwnd, app_module.win32con.GWL_EXSTYLE)
+                & app_module.win32con.WS_EX_LAYERED)
+
+def test_native_overlay_stays_unlayered_and_alpha_free(app_module):
+    app = make_overlay(app_module, native=True)
+    app._set_blur_window_visibility(alpha=1.0, clickthrough=False)
+    assert app.blur_window.alpha_sets == []
+    assert not layered(app_module, 5005)
+
+def test_native_overlay_hover_fade_is_undone(app_module):
+    app = make_overlay(app_module, native=True)
+    app._set_blur_window_visibility(alpha=0.0, clickthrough=True)
+    assert layered(app_module, 5005)
+    app._set_blur_window_visibility(alpha=1.0, clickthrough=False)
+    assert app.blur_window.alpha_sets == [0.0, 1.0]
+    assert not layered(app_module, 5005)
+
+def test_texture_overlay_is_layered_on_the_frame(app_module):
+    app = make_overlay(app_module, native=False)
+    app._set_blur_window_visibility(alpha=1.0, clickthrough=False)
+    assert layered(app_module, 5005)
+    assert not layered(app_module, 5006)
+
+def test_refused_compositor_is_retried_after_a_while(app_module, monkeypatch):
+    dwm, compositor, backends = make_backends(app_module, accept=False)
+    compositor.apply(1234)
+    now = compositor.failed_at
+    monkeypatch.setattr(app_module.time, 'time', lambda: now + compositor.retry_after - 1)
+    usable, reason = compositor.availability()
+    assert not usable and 'retry in' in reason
+    monkeypatch.setattr(app_module.time, 'time', lambda: now + compositor.retry_after + 1)
+    assert app_module.select_overlay_backend('auto', backends)[0] is compositor
+
+@pytest.mark.parametrize('message', ['WM_SETTINGCHANGE', 'WM_DISPLAYCHANGE'])
+def test_system_changes_give_a_refused_compositor_another_try(app_module, message):
+    dwm, compositor, backends = make_backends(app_module, accept=False)
+    compositor.apply(1234)
+    source = app_module.Win32SessionEventSource(app_module.SuspensionController())
+    source.system_listeners.append(compositor.reset)
+    source._wnd_proc(0, getattr(source, message), 0, 0)
+    assert app_module.select_overlay_backend('auto', backends)[0] is compositor
+
+def test_overlay_backend_base_is_abstract(app_module):
+    with pytest.raises(TypeError):
+        app_module.OverlayBackend()
@@ -0,0 +1,80 @@
+import json
+import os
+
+def write_settings(path, data):
+    path.write_text(json.dumps(data), encoding='utf-8')
+
+def test_missing_file_is_created_with_defaults(app_module, tmp_path):
+    path = tmp_path / 'settings.json'
+    config = app_module.PerformanceConfig(str(path))
+    assert config.load()
+    data = json.loads(path.read_text(encoding='utf-8'))
+    assert data['profile'] == 'balanced' and data['profiles'] == {}
+
+def test_file_values_merge_over_builtin_profile(app_module, tmp_path):
+    path = tmp_path / 'settings.json'
+    write_settings(path, {'profile': 'low-latency', 'profiles': {'low-latency': {'monitor_interval': 0.75}}})
+    config = app_module.PerformanceConfig(str(path))
+    assert config.load()
+    builtin = app_module.PERFORMANCE_PROFILES['low-latency']
+    assert config.values['monitor_interval'] == 0.75
+    assert config.values['render_budget_ms'] == builtin['render_budget_ms']
+    assert builtin['monitor_interval'] == 0.5  # The built-in table is untouched
+
+def test_new_profile_inherits_from_balanced(app_module, tmp_path):
+    path = tmp_path / 'settings.json'
+    write_settings(path, {'profile': 'quiet', 'profiles': {'quiet': {'monitor_interval': 5}}})
+    config = app_module.PerformanceConfig(str(path))
+    config.load()
+    assert config.profile == 'quiet' and 'quiet' in config.profile_names
+    expected = dict(app_module.PERFORMANCE_PROFILES['balanced'], monitor_interval=5.0)
+    assert config.values == expected
+
+def test_invalid_values_are_ignored(app_module, tmp_path):
+    path = tmp_path / 'settings.json'
+    write_settings(path, {
+        'profile': 'missing', 'overlay_style': 'sparkles', 'overlay_backend': 'hologram',
+        'profiles': {'balanced': {'monitor_interval': -1, 'window_cache_ttl': 'soon',
+                                  'hover_poll_interval': True, 'no_such_key': 3}},
+    })
+    config = app_module.PerformanceConfig(str(path))
+    assert config.load()
+    assert config.values == app_module.PERFORMANCE_PROFILES['balanced']
+    assert (config.profile, config.overlay_style, config.overlay_backend) == ('balanced', 'auto', 'auto')
+
+def test_unreadable_file_keeps_last_good_settings(app_module, tmp_path):
+    path = tmp_path / 'settings.json'
+    write_settings(path, {'profile': 'battery-saver', 'profiles': {'battery-saver': {'blur_radius': 2}}})
+    config = app_module.PerformanceConfig(str(path))
+    config.load()
+    path.write_text('{"profile": "low-lat', encoding='utf-8')
+    assert config.is_stale()
+    assert not config.load()
+    assert config.profile == 'battery-saver' and config.values['blur_radius'] == 2.0
+    assert not config.is_stale()  # Not re-read on every poll until it changes again
+
+def test_save_replaces_the_file_atomically(app_module, tmp_path, monkeypatch):
+    path = tmp_path / 'settings.json'
+    config = app_module.PerformanceConfig(str(path))
+    config.load()
+    config.select('low-latency')
+    assert json.loads(path.read_text(encoding='utf-8'))['profile'] == 'low-latency'
+    assert os.listdir(tmp_path) == ['settings.json']
+
+    def broken_dump(data, f, **kwargs):
+        f.write('{"profile": ')
+        raise OSError("disk full")
+    monkeypatch.setattr(app_module.json, 'dump', broken_dump)
+    config.select('battery-saver')
+    # A failed write never leaves a half-written settings file behind
+    assert json.loads(path.read_text(encoding='utf-8'))['profile'] == 'low-latency'
+
+def test_saved_file_round_trips(app_module, tmp_path):
+    path = tmp_path / 'settings.json'
+    config = app_module.PerformanceConfig(str(path))
+    config.load()
+    config.profiles['balanced']['blur_radius'] = 2.5
+    config.select_overlay_style('glass')
+    reloaded = app_module.PerformanceConfig(str(path))
+    reloaded.load()
+    assert reloaded.overlay_style == 'glass' and reloaded.values['blur_radius'] == 2.5
@@ -0,0 +1,60 @@
+import pytest
+from PIL import Image
+
+class FakePhotoImage:
+    """ImageTk.PhotoImage stand-in: records the image it was made from, needs no Tk root"""
+    created = 0
+
+    def __init__(self, image):
+        FakePhotoImage.created += 1
+        self.size = image.size
+
+@pytest.fixture
+def cache(app_module, monkeypatch):
+    FakePhotoImage.created = 0
+    monkeypatch.setattr(app_module.ImageTk, 'PhotoImage', FakePhotoImage)
+    return app_module.PhotoImageCache(max_entries=2)
+
+def test_same_texture_and_size_reuses_the_tk_image(cache):
+    texture = Image.new('RGB', (300, 200))
+    photo, converted = cache.get(texture, 300, 200)
+    assert converted
+    assert cache.get(texture, 300, 200) == (photo, False)
+    assert (cache.hits, cache.misses, FakePhotoImage.created) == (1, 1, 1)
+
+def test_new_size_converts_again(cache):
+    texture = Image.new('RGB', (300, 200))
+    cache.get(texture, 300, 200)
+    photo, converted = cache.get(texture, 150, 100)
+    assert converted and photo.size == (150, 100)
+
+def test_recycled_id_is_not_mistaken_for_the_cached_texture(cache):
+    old = Image.new('RGB', (300, 200))
+    new = Image.new('RGB', (300, 200), 'white')
+    stale_photo, _ = cache.get(old, 300, 200)
+    # As if `old` had been freed and `new` allocated at the same address
+    cache._entries[(id(new), 300, 200)] = cache._entries.pop((id(old), 300, 200))
+    assert cache.lookup(new, 300, 200) is None
+    photo, converted = cache.get(new, 300, 200)
+    assert converted and photo is not stale_photo
+    assert cache._entries[(id(new), 300, 200)][0] is new
+
+def test_least_recently_used_entry_is_evicted(cache):
+    first, second, third = (Image.new('RGB', (10 + n, 10)) for n in range(3))
+    cache.get(first, 10, 10)
+    cache.get(second, 10, 10)
+    cache.get(first, 10, 10)  # Now the most recent
+    cache.get(third, 10, 10)
+    assert len(cache) == 2
+    assert cache.lookup(second, 10, 10) is None
+    assert cache.lookup(first, 10, 10) and cache.lookup(third, 10, 10)
+
+def test_lookup_never_converts(cache):
+    assert cache.lookup(Image.new('RGB', (10, 10)), 10, 10) is None
+    assert FakePhotoImage.created == 0 and cache.misses == 0
+
+def test_clear_drops_every_tk_image(cache):
+    texture = Image.new('RGB', (10, 10))
+    cache.get(texture, 10, 10)
+    cache.clear()
+    assert len(cache) == 0 and cache.get(texture, 10, 10)[1]
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from PIL import Image, ImageChops
+
+@pytest.fixture
+def mask_cache(app_module, monkeypatch):
+    cache = {}
+    monkeypatch.setattr(app_module, '_rounded_mask_cache', cache)
+    return cache
+
+def random_rgba(width, height, seed=0):
+    pixels = np.random.default_rng(seed).integers(0, 256, (height, width, 4), dtype=np.uint8)
+    return Image.fromarray(pixels, mode='RGBA')
+
+def test_corner_tile_is_opaque_inside_and_clear_outside(app_module):
+    tile = np.asarray(app_module.create_corner_tile(12))
+    assert tile.shape == (12, 12)
+    assert tile[0, 0] == 0 and tile[-1, -1] == 255
+    assert np.array_equal(tile, tile.T)  # The arc is symmetric about the diagonal
+
+def test_hard_edge_tile_has_no_partial_coverage(app_module):
+    tile = np.asarray(app_module.create_corner_tile(12, scale=1))
+    assert set(np.unique(tile)) <= {0, 255}
+
+def test_masks_are_cached_per_size_and_radius(app_module, mask_cache):
+    mask = app_module.create_rounded_rectangle_mask(300, 200, 12)
+    assert app_module.create_rounded_rectangle_mask(300, 200, 12) is mask
+    assert app_module.create_rounded_rectangle_mask(300, 200, 8) is not mask
+
+def test_mask_cache_keeps_at_most_eight_entries(app_module, mask_cache):
+    first = app_module.create_rounded_rectangle_mask(100, 100, 12)
+    for width in range(101, 111):
+        app_module.create_rounded_rectangle_mask(width, 100, 12)
+    assert len(mask_cache) == app_module._ROUNDED_MASK_CACHE_LIMIT == 8
+    assert (100, 100, 12, 4) not in mask_cache  # Oldest went first
+    assert app_module.create_rounded_rectangle_mask(100, 100, 12) is not first
+
+@pytest.mark.parametrize('size, radius, antialias', [
+    ((300, 200), 12, True),
+    ((300, 200), 12, False),
+    ((301, 199), 9, True),     # Odd sizes
+    ((40, 30), 50, True),      # Radius clamped to half the short side
+])
+def test_corner_patching_matches_the_full_mask(app_module, mask_cache, size, radius, antialias):
+    image = random_rgba(*size)
+    mask = app_module.create_rounded_rectangle_mask(*size, radius, 4 if antialias else 1)
+    expected = image.copy()
+    expected.putalpha(ImageChops.multiply(image.getchannel('A'), mask))
+
+    patched = app_module.apply_rounded_corners_to_image(image.copy(), radius, antialias)
+    difference = np.abs(np.asarray(patched, dtype=np.int16) - np.asarray(expected, dtype=np.int16))
+    assert difference.max() <= 1  # Only rounding of alpha * coverage / 255 may differ
+
+def test_rgba_images_are_patched_in_place(app_module):
+    image = random_rgba(100, 80)
+    centre = image.getpixel((50, 40))
+    assert app_module.apply_rounded_corners_to_image(image, 10) is image
+    assert image.getpixel((0, 0))[3] == 0 and image.getpixel((50, 40)) == centre
+
+def test_other_modes_are_converted(app_module):
+    image = Image.new('RGB', (100, 80), 'red')
+    rounded = app_module.apply_rounded_corners_to_image(image, 10)
+    assert rounded.mode == 'RGBA' and image.mode == 'RGB'
+    assert rounded.getpixel((0, 0))[3] == 0 and rounded.getpixel((50, 40)) == (255, 0, 0, 255)
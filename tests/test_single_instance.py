@@ -0,0 +1,119 @@
+import ctypes
+import json
+import socket
+import sys
+
+import pytest
+
+class FakeFunction:
+    def __init__(self, impl):
+        self.impl = impl
+        self.restype = None
+        self.argtypes = None
+
+    def __call__(self, *args):
+        return self.impl(*args)
+
+class FakeKernel32:
+    """WinDLL('kernel32', use_last_error=True) stand-in: one named mutex, last error per call"""
+
+    def __init__(self, existing):
+        self.existing = existing
+        self.last_error = 0
+        self.closed = []
+        self.CreateMutexW = FakeFunction(self._create_mutex)
+        self.CloseHandle = FakeFunction(self.closed.append)
+
+    def _create_mutex(self, attributes, initial_owner, name):
+        self.last_error = 183 if self.existing else 0
+        return 42
+
+@pytest.fixture
+def fake_windows(monkeypatch):
+    kernel32 = FakeKernel32(existing=False)
+    monkeypatch.setattr(sys, 'platform', 'win32')
+    monkeypatch.setattr(ctypes, 'WinDLL', lambda name, use_last_error=False: kernel32, raising=False)
+    monkeypatch.setattr(ctypes, 'get_last_error', lambda: kernel32.last_error, raising=False)
+    return kernel32
+
+def test_mutex_acquired_and_released(app_module, fake_windows, tmp_path):
+    lock = app_module.SingleInstanceLock(str(tmp_path))
+    assert lock.acquire()
+    lock.release()
+    assert fake_windows.closed == [42]
+
+def test_existing_mutex_means_another_instance(app_module, fake_windows, tmp_path):
+    fake_windows.existing = True
+    lock = app_module.SingleInstanceLock(str(tmp_path))
+    assert not lock.acquire()
+    assert fake_windows.closed == [42]
+
+@pytest.mark.skipif(sys.platform.startswith('win'), reason="file lock is the non-Windows path")
+def test_file_lock_excludes_a_second_instance(app_module, tmp_path):
+    first = app_module.SingleInstanceLock(str(tmp_path))
+    second = app_module.SingleInstanceLock(str(tmp_path))
+    assert first.acquire()
+    assert not second.acquire()
+    first.release()
+    assert second.acquire()
+    second.release()
+
+@pytest.fixture
+def server(app_module, tmp_path):
+    server = app_module.InstanceControlServer(str(tmp_path), handler_timeout=0.2)
+    server.start()
+    yield server
+    server.stop()
+
+def raw_request(tmp_path, request):
+    """Send one JSON line to the published port and return the decoded reply"""
+    with open(tmp_path / 'instance.json', encoding='utf-8') as f:
+        port = json.load(f)['port']
+    with socket.create_connection(('127.0.0.1', port), timeout=3.0) as connection:
+        connection.sendall((json.dumps(request) + '\n').encode('utf-8'))
+        return json.loads(connection.makefile('r', encoding='utf-8').readline())
+
+def test_control_server_rejects_a_wrong_token(app_module, server, tmp_path):
+    server.set_handler(lambda command: pytest.fail("handler called"))
+    assert raw_request(tmp_path, {'token': 'not-the-token', 'command': 'quit'}) == {
+        'ok': False, 'error': 'bad token'}
+    assert raw_request(tmp_path, {'command': 'quit'})['error'] == 'bad token'
+    assert server.commands_handled == 0
+
+def test_control_server_rejects_unknown_commands(app_module, server, tmp_path):
+    server.set_handler(lambda command: pytest.fail("handler called"))
+    response = raw_request(tmp_path, {'token': server.token, 'command': 'format-disk'})
+    assert not response['ok'] and 'format-disk' in response['error']
+
+def test_control_server_reports_still_starting_without_a_handler(app_module, server, tmp_path):
+    response = app_module.send_instance_command('status', str(tmp_path))
+    assert response == {'ok': False, 'error': 'instance still starting'}
+
+def test_control_server_dispatches_to_the_handler(app_module, server, tmp_path):
+    calls = []
+
+    def handler(command):
+        calls.append(command)
+        return {'blur_requested': command == 'toggle'}
+    server.set_handler(handler)
+    assert app_module.send_instance_command('status', str(tmp_path)) == {
+        'ok': True, 'result': {'blur_requested': False}}
+    assert app_module.send_instance_command('toggle', str(tmp_path)) == {
+        'ok': True, 'result': {'blur_requested': True}}
+    assert calls == ['status', 'toggle'] and server.commands_handled == 2
+
+def test_control_server_survives_a_malformed_request(app_module, server, tmp_path):
+    server.set_handler(lambda command: 'fine')
+    with open(tmp_path / 'instance.json', encoding='utf-8') as f:
+        port = json.load(f)['port']
+    with socket.create_connection(('127.0.0.1', port), timeout=3.0) as connection:
+        connection.sendall(b'not json\n')
+        assert not json.loads(connection.makefile('r', encoding='utf-8').readline())['ok']
+    assert app_module.send_instance_command('status', str(tmp_path))['result'] == 'fine'
+
+def test_control_server_removes_its_info_file(app_module, tmp_path):
+    server = app_module.InstanceControlServer(str(tmp_path))
+    server.start()
+    server.stop()
+    assert not (tmp_path / 'instance.json').exists()
+    assert app_module.send_instance_command('status', str(tmp_path)) is None
@@ -0,0 +1,15 @@
+import time
+
+from soak_harness import SimulatedClock
+
+def test_clock_follows_virtual_time():
+    clock = SimulatedClock(start=1000.0)
+    before = clock.monotonic()
+    clock.advance(3600)
+    assert clock.time() == 4600.0
+    assert clock.monotonic() - before == 3600
+
+def test_clock_proxies_the_rest_of_time():
+    clock = SimulatedClock()
+    assert clock.strftime('%Y', time.gmtime(0)) == '1970'
+    assert clock.localtime is time.localtime
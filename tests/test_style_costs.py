@@ -0,0 +1,102 @@
+import platform
+import sys
+
+import pytest
+from PIL import Image
+
+MEGAPIXEL = (1000, 1000)
+
+def make_model(app_module, path=None, **kwargs):
+    styles = {name: style() for name, style in app_module.OVERLAY_STYLES.items()}
+    return app_module.StyleCostModel(styles, path, **kwargs)
+
+def high(app_module):
+    return app_module.QUALITY_TIERS[0]
+
+def set_costs(model, tier_name, **ms_per_mp):
+    for name, cost in ms_per_mp.items():
+        model.coefficients[(name, tier_name)] = [0.0, cost]
+
+def test_choose_picks_best_looking_style_within_budget(app_module):
+    model = make_model(app_module)
+    set_costs(model, 'high', content=150.0, glass=60.0, mosaic=20.0, solid=2.0)
+    style, predicted_ms = model.choose(MEGAPIXEL, high(app_module), target_ms=100.0)
+    assert style.name == 'glass' and predicted_ms == pytest.approx(60.0)
+    assert model.choose(MEGAPIXEL, high(app_module), target_ms=200.0)[0].name == 'content'
+
+def test_choose_falls_back_to_cheapest_style(app_module):
+    model = make_model(app_module)
+    set_costs(model, 'high', content=150.0, glass=60.0, mosaic=40.0, solid=8.0)
+    style, predicted_ms = model.choose(MEGAPIXEL, high(app_module), target_ms=1.0)
+    assert style.name == 'solid' and predicted_ms == pytest.approx(8.0)
+
+def test_choose_scales_with_window_size(app_module):
+    model = make_model(app_module)
+    set_costs(model, 'high', content=150.0, glass=60.0, mosaic=20.0, solid=2.0)
+    assert model.choose((500, 500), high(app_module), target_ms=100.0)[0].name == 'content'
+
+def test_without_content_auto_keeps_to_content_independent_styles(app_module):
+    model = make_model(app_module)
+    set_costs(model, 'high', content=1.0, glass=60.0, mosaic=1.0, solid=2.0)
+    for target_ms in (1000.0, 30.0, 0.1):
+        style, _ = model.choose(MEGAPIXEL, high(app_module), target_ms, content=False)
+        assert not style.needs_content
+
+def test_observe_moves_per_megapixel_cost_toward_measurement(app_module):
+    model = make_model(app_module, smoothing=0.2)
+    prior = model.styles['glass'].prior_ms_per_mp
+    model.observe('glass', 'high', 1_000_000, prior + 100.0)
+    assert model.coefficients[('glass', 'high')] == [0.0, pytest.approx(prior + 20.0)]
+    model.observe('glass', 'high', 0, 500.0)  # Nothing to learn from an empty image
+    assert model.predict('glass', 'high', 1_000_000) == pytest.approx(prior + 20.0)
+    assert model.predict('glass', 'low', 1_000_000) == pytest.approx(prior)  # Per tier
+
+def test_calibration_is_saved_and_reloaded(app_module, tmp_path):
+    path = str(tmp_path / 'style_costs.json')
+    model = make_model(app_module, path, sizes=((64, 48), (128, 96)), repeats=1)
+    model.calibrate()
+    assert model.calibrated_at
+    assert set(model.coefficients) == {(name, tier['name']) for name in app_module.OVERLAY_STYLES
+                                       for tier in app_module.QUALITY_TIERS}
+    reloaded = make_model(app_module, path)
+    assert reloaded.load()
+    assert reloaded.calibrated_at == model.calibrated_at
+    for key, (fixed_ms, ms_per_mp) in model.coefficients.items():
+        assert reloaded.coefficients[key] == [pytest.approx(fixed_ms, abs=1e-3), pytest.approx(ms_per_mp, abs=1e-3)]
+
+@pytest.mark.parametrize('change', ['machine', 'python', 'style version'])
+def test_saved_costs_are_dropped_for_another_machine_or_version(app_module, tmp_path, monkeypatch, change):
+    path = str(tmp_path / 'style_costs.json')
+    model = make_model(app_module, path)
+    model.observe('glass', 'high', 1_000_000, 500.0)
+    model.calibrated_at = 1.0
+    model.save()
+    if change == 'machine':
+        monkeypatch.setattr(platform, 'node', lambda: 'another-pc')
+    elif change == 'python':
+        monkeypatch.setattr(sys, 'version_info', (sys.version_info[0], sys.version_info[1] + 1, 0))
+    else:
+        monkeypatch.setattr(app_module, 'STYLE_COST_VERSION', app_module.STYLE_COST_VERSION + 1)
+    reloaded = make_model(app_module, path)
+    assert not reloaded.load()
+    assert reloaded.coefficients == {} and reloaded.calibrated_at is None
+
+def test_unreadable_cache_is_ignored(app_module, tmp_path):
+    path = tmp_path / 'style_costs.json'
+    path.write_text('{"machine": ', encoding='utf-8')
+    assert not make_model(app_module, str(path)).load()
+
+def test_synthetic_capture_never_renders_content_styles(app_module):
+    app = app_module.WhatsAppBlurFinal.__new__(app_module.WhatsAppBlurFinal)
+    app.overlay_styles = {name: style() for name, style in app_module.OVERLAY_STYLES.items()}
+    app.style_costs = app_module.StyleCostModel(app.overlay_styles)
+    set_costs(app.style_costs, 'high', content=1.0, mosaic=1.0, glass=500.0, solid=400.0)
+    app.governor = type('Governor', (), {'budget_ms': 120.0})()
+    app.blur_style = 'auto'
+    app.blur_radius_scale = 1.0
+    app.texture_style = None
+    app.capture_engine = app_module.CaptureEngine(app_module.FakeCaptureBackend())
+    app.capture_whatsapp_screenshot = lambda hwnd, rect: (Image.new('RGB', (300, 400)), rect)
+    app._is_stale = lambda generation: False
+    result = app._render_blur_texture(1, 1001, (0, 0, 300, 400), high(app_module), None, None, None)
+    assert not app.overlay_styles[result.style].needs_content
@@ -0,0 +1,26 @@
+def test_fullscreen_app_only_slows_down(app_module):
+    controller = app_module.SuspensionController()
+    controller.on_fullscreen(True)
+    assert controller.mode == controller.SLOW
+    assert not controller.is_suspended
+    assert controller.interval_multiplier == controller.slow_multiplier
+
+def test_fullscreen_whatsapp_stays_active(app_module):
+    controller = app_module.SuspensionController()
+    controller.on_fullscreen(True, foreground_is_whatsapp=True)
+    assert controller.mode == controller.ACTIVE
+    assert controller.describe() == 'normal'
+
+def test_leaving_fullscreen_resumes_normal_mode(app_module):
+    controller = app_module.SuspensionController()
+    changes = []
+    controller.listeners.append(lambda old, new: changes.append((old, new)))
+    controller.on_fullscreen(True)
+    controller.on_fullscreen(False)
+    assert changes == [(controller.ACTIVE, controller.SLOW), (controller.SLOW, controller.ACTIVE)]
+
+def test_lock_still_suspends_over_fullscreen(app_module):
+    controller = app_module.SuspensionController()
+    controller.on_fullscreen(True)
+    controller.on_session_locked(True)
+    assert controller.is_suspended
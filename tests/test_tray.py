@@ -0,0 +1,47 @@
+import pytest
+
+class RecordingScheduler:
+    def __init__(self):
+        self.calls = []
+
+    def call_soon_threadsafe(self, name, callback, delay=0.0, keep_sooner=False):
+        self.calls.append((name, callback))
+
+@pytest.fixture
+def app(app_module):
+    app = app_module.WhatsAppBlurFinal.__new__(app_module.WhatsAppBlurFinal)
+    app.scheduler = RecordingScheduler()
+    app.profile_duration = 30.0
+    app.is_enabled = True
+    app.tray_icon = type('Icon', (), {'menu': None})()
+    for submenu in ('_performance_profile_menu', '_overlay_style_menu', '_overlay_backend_menu'):
+        setattr(app, submenu, lambda: ())
+    return app
+
+def test_tray_exit_is_handed_to_the_tk_thread(app):
+    quits = []
+    app.quit_application = lambda: quits.append(1)
+    # As pystray would, from its own thread
+    app.request_quit()
+    assert quits == []
+    assert app.scheduler.calls == [('quit', app.quit_application)]
+
+@pytest.mark.parametrize('label, task, method', [
+    ('Test Screenshot', 'test_screenshot', 'test_screenshot'),
+    ('Show System Info', 'show_system_info', 'show_system_info'),
+    ('Exit', 'quit', 'quit_application'),
+])
+def test_tray_items_touching_tk_go_through_the_scheduler(app, label, task, method):
+    ran = []
+    setattr(app, method, lambda: ran.append(method))
+    # The fake pystray menu is a tuple of (label, action) items
+    actions = dict(app._tray_menu('Toggle Blur'))
+    actions[label]()
+    assert ran == []
+    assert app.scheduler.calls == [(task, getattr(app, method))]
+
+def test_menu_rebuild_matches_the_initial_menu(app):
+    initial = [label for label, _ in app._tray_menu('Toggle Blur')]
+    app.update_tray_menu()
+    rebuilt = [label for label, _ in app.tray_icon.menu]
+    assert rebuilt == ['Blur: ON'] + initial[1:]
@@ -0,0 +1,70 @@
+import pytest
+
+WHATSAPP, ABOVE, BELOW = 1001, 2002, 3003
+
+class FakeRoot:
+    """Just enough of Tk for TkScheduler: after() calls are recorded, never run"""
+
+    def __init__(self):
+        self.pending = {}
+
+    def after(self, delay_ms, callback):
+        after_id = f"after#{len(self.pending)}"
+        self.pending[after_id] = (delay_ms, callback)
+        return after_id
+
+    def after_cancel(self, after_id):
+        self.pending.pop(after_id, None)
+
+@pytest.fixture
+def oracle(app_module, monkeypatch):
+    # Z-order, top to bottom: ABOVE, WHATSAPP, BELOW
+    previous = {WHATSAPP: ABOVE, BELOW: WHATSAPP}
+    monkeypatch.setattr(app_module.win32gui, 'GetWindow', lambda hwnd, cmd: previous.get(hwnd, 0))
+    monkeypatch.setattr(app_module.win32gui, 'IsWindow', lambda hwnd: hwnd in (WHATSAPP, ABOVE, BELOW))
+    oracle = app_module.VisibilityOracle(app_module.DesktopGeometry())
+    oracle.target = WHATSAPP
+    oracle.notified = []
+    oracle.listeners.append(lambda: oracle.notified.append(oracle.generation))
+    return oracle
+
+def test_events_below_the_target_only_drop_the_cache(oracle):
+    oracle.invalidate(BELOW)
+    assert oracle.notified == [] and oracle.generation == 1
+    assert oracle.ignored_events == 1
+
+@pytest.mark.parametrize('hwnd', [WHATSAPP, ABOVE, None])
+def test_target_windows_above_it_and_unknown_windows_notify(oracle, hwnd):
+    oracle.invalidate(hwnd)
+    assert oracle.notified == [1]
+
+def test_destroyed_window_notifies(oracle):
+    oracle.invalidate(4004)
+    assert oracle.notified == [1]
+
+def test_without_a_target_every_event_notifies(oracle):
+    oracle.target = None
+    oracle.invalidate(BELOW)
+    assert oracle.notified == [1]
+
+def test_event_burst_schedules_one_debounced_pass(app_module):
+    scheduler = app_module.TkScheduler(FakeRoot())
+    runs = []
+    scheduler.schedule('monitor', 30.0, lambda: runs.append(1))
+    for _ in range(50):
+        scheduler.call_soon_threadsafe('monitor', lambda: runs.append(1), 0.5, keep_sooner=True)
+    scheduler._drain_incoming()
+    deadline = scheduler.next_deadline()
+    assert len(scheduler._tasks) == 1
+    # Brought forward from 30 s to the debounce delay, and not pushed back by later events
+    scheduler.call_soon_threadsafe('monitor', lambda: runs.append(1), 0.5, keep_sooner=True)
+    scheduler._drain_incoming()
+    assert scheduler.next_deadline() == deadline
+    assert deadline - app_module.time.perf_counter() <= 0.5
+
+def test_keep_sooner_leaves_an_earlier_task(app_module):
+    scheduler = app_module.TkScheduler(FakeRoot())
+    scheduler.schedule('monitor', 0.1, lambda: None)
+    deadline = scheduler.next_deadline()
+    scheduler.schedule_by('monitor', 1.0, lambda: None)
+    assert scheduler.next_deadline() == deadline
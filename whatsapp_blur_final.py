@@ -2,65 +2,3146 @@
 """
 WhatsApp Blur - FINAL CLEAN VERSION
 Fixes all issues: prioritizes real WhatsApp, stops logging spam, runs silently
+
+Usage:
+    python whatsapp_blur_final.py [toggle | status | reload | quit] [--boot]
+A launch while another instance runs forwards its command (default: status) and exits.
+--boot (used by the startup entry) registers the hotkey first and loads the rest once the
+system is idle; phase times from logon go to boot_timings.json.
 """
 
-import tkinter as tk
-from tkinter import messagebox
-import win32gui
-import win32con
-import win32api
-import win32process
-import ctypes
-from ctypes import wintypes
-import psutil
-import threading
-import time
-import sys
-import os
-from PIL import Image, ImageTk, ImageFilter, ImageGrab, ImageDraw
-import pystray
-from pystray import MenuItem as item
-import keyboard
-import queue
-import logging
+# Light imports only: a second launch needs nothing more to hand its command over,
+# and a boot launch registers its hotkey with just these
+from abc import ABC, abstractmethod
+import collections
+import ctypes
+from ctypes import wintypes
+import json
+import logging
+import os
+import secrets
+import socket
+import sys
+import threading
+import time
+
+# Set up QUIET logging (only errors)
+logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Wakeups per thread name (event handled, task run, render started), for per-thread CPU attribution
+thread_wakeups = collections.Counter()
+
+def note_wakeup():
+    thread_wakeups[threading.current_thread().name] += 1
+
+# Written into app_data_dir() by auto_update.py after installing a new version
+RESTART_REQUEST_FILE = 'restart.request'
+CONTROL_COMMANDS = ('toggle', 'status', 'reload', 'quit')
+DEFAULT_TOGGLE_KEY = 'ctrl+alt+q'  # Single hand shortcut - easy to press with left hand
+
+def app_data_dir():
+    """Per-user data directory for diagnostics and settings (created on first use)"""
+    base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+    path = os.path.join(base, 'WhatsApp Blur')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def relaunch_command(*args):
+    """Command line that starts this app again: the script, or the installed .pyz bundle"""
+    return [sys.executable, os.path.abspath(sys.argv[0]), *args]
+
+class SingleInstanceLock:
+    """Per-user single-instance lock: a named mutex on Windows, an flock'ed file elsewhere"""
+
+    MUTEX_NAME = 'Local\\WhatsAppBlurSingleInstance'
+    ERROR_ALREADY_EXISTS = 183
+
+    def __init__(self, data_dir):
+        self.data_dir = data_dir
+        self._handle = None
+        self._kernel32 = None
+
+    @staticmethod
+    def _load_kernel32():
+        # Own instance: use_last_error saves the error right after the call, before ctypes or
+        # another thread can overwrite it, and these prototypes don't leak into ctypes.windll
+        kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+        kernel32.CreateMutexW.restype = wintypes.HANDLE
+        kernel32.CreateMutexW.argtypes = (ctypes.c_void_p, wintypes.BOOL, wintypes.LPCWSTR)
+        kernel32.CloseHandle.argtypes = (wintypes.HANDLE,)
+        return kernel32
+
+    def acquire(self):
+        if sys.platform.startswith('win'):
+            kernel32 = self._kernel32 = self._kernel32 or self._load_kernel32()
+            handle = kernel32.CreateMutexW(None, False, self.MUTEX_NAME)
+            if not handle:
+                return False
+            if ctypes.get_last_error() == self.ERROR_ALREADY_EXISTS:
+                kernel32.CloseHandle(handle)
+                return False
+            self._handle = handle
+            return True
+        import fcntl
+        lock_file = open(os.path.join(self.data_dir, 'instance.lock'), 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._handle = lock_file
+        return True
+
+    def release(self):
+        if self._handle is None:
+            return
+        if sys.platform.startswith('win'):
+            self._kernel32.CloseHandle(self._handle)
+        else:
+            self._handle.close()
+        self._handle = None
+
+class InstanceControlServer:
+    """Loopback control channel for the running instance.
+
+    Listens on 127.0.0.1 (ephemeral port) and publishes port and a random token in
+    instance.json in the data directory, so only the same user can send commands. One JSON line
+    in ({"token", "command"}), one JSON line out ({"ok", "result" | "error"}). Commands that
+    arrive before the app registers its handler wait for it.
+    """
+
+    def __init__(self, data_dir, handler_timeout=5.0):
+        self.data_dir = data_dir
+        self.handler_timeout = handler_timeout
+        self.token = secrets.token_hex(16)
+        self.handler = None
+        self.commands_handled = 0
+        self._handler_ready = threading.Event()
+        self._socket = None
+        self.thread = None
+
+    @property
+    def info_path(self):
+        return os.path.join(self.data_dir, 'instance.json')
+
+    def start(self):
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.bind(('127.0.0.1', 0))
+        self._socket.listen(4)
+        info = {'port': self._socket.getsockname()[1], 'token': self.token, 'pid': os.getpid()}
+        temp_path = f"{self.info_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(info, f)
+        os.replace(temp_path, self.info_path)
+        self.thread = threading.Thread(target=self._serve, name='ipc', daemon=True)
+        self.thread.start()
+
+    def set_handler(self, handler):
+        """handler(command) -> JSON-serializable result; called on the server thread"""
+        self.handler = handler
+        self._handler_ready.set()
+
+    def stop(self):
+        if self._socket:
+            try:
+                self._socket.close()
+            except OSError:
+                pass
+            self._socket = None
+        try:
+            with open(self.info_path, encoding='utf-8') as f:
+                if json.load(f).get('pid') == os.getpid():
+                    os.remove(self.info_path)
+        except (OSError, ValueError):
+            pass
+
+    def _serve(self):
+        # Blocks in accept(); no wakeups until a client connects
+        while self._socket:
+            try:
+                connection, _ = self._socket.accept()
+            except OSError:
+                break
+            with connection:
+                try:
+                    connection.settimeout(2.0)
+                    request = json.loads(connection.makefile('r', encoding='utf-8').readline())
+                    response = self._dispatch(request)
+                except Exception as e:
+                    response = {'ok': False, 'error': str(e)}
+                try:
+                    connection.sendall((json.dumps(response) + '\n').encode('utf-8'))
+                except OSError:
+                    pass
+
+    def _dispatch(self, request):
+        if not secrets.compare_digest(str(request.get('token', '')), self.token):
+            return {'ok': False, 'error': 'bad token'}
+        command = request.get('command')
+        if command not in CONTROL_COMMANDS:
+            return {'ok': False, 'error': f"unknown command {command!r}"}
+        if not self._handler_ready.wait(self.handler_timeout):
+            return {'ok': False, 'error': 'instance still starting'}
+        self.commands_handled += 1
+        return {'ok': True, 'result': self.handler(command)}
+
+def send_instance_command(command, data_dir, timeout=3.0):
+    """Send a command to the running instance; returns its response dict, or None if unreachable"""
+    try:
+        with open(os.path.join(data_dir, 'instance.json'), encoding='utf-8') as f:
+            info = json.load(f)
+        with socket.create_connection(('127.0.0.1', info['port']), timeout=timeout) as connection:
+            connection.sendall((json.dumps({'token': info['token'], 'command': command}) + '\n').encode('utf-8'))
+            return json.loads(connection.makefile('r', encoding='utf-8').readline())
+    except (OSError, ValueError, KeyError):
+        return None
+
+def claim_single_instance(argv, wait_for_lock=0.0, connect_retries=20):
+    """Become the single instance, or forward argv's command to the running one and exit.
+
+    Runs before the heavy imports, so a forwarded launch finishes in milliseconds. Returns
+    (lock, control server) for the instance that keeps running.
+    """
+    args = [arg for arg in argv if arg not in ('--replace', '--boot')]
+    command = args[0].lower() if args else 'status'
+    if command not in CONTROL_COMMANDS:
+        print(f"Unknown command '{command}'. Use one of: {', '.join(CONTROL_COMMANDS)}")
+        sys.exit(2)
+
+    data_dir = app_data_dir()
+    lock = SingleInstanceLock(data_dir)
+    # A replacement started by a restart waits for the old instance to let go
+    deadline = time.monotonic() + (10.0 if '--replace' in argv else wait_for_lock)
+    response = None
+    while not lock.acquire():
+        if time.monotonic() < deadline:
+            time.sleep(0.1)
+            continue
+        # Someone else owns the lock; its server may still be starting
+        for _ in range(connect_retries):
+            response = send_instance_command(command, data_dir)
+            if response is not None:
+                break
+            time.sleep(0.1)
+        if response is None:
+            print("WhatsApp Blur is already running but not responding")
+            sys.exit(1)
+        if not response.get('ok'):
+            print(f"WhatsApp Blur: {response.get('error')}")
+            sys.exit(1)
+        print(f"WhatsApp Blur ({command}): {json.dumps(response.get('result'))}")
+        sys.exit(0)
+
+    if args:
+        print(f"WhatsApp Blur is not running; starting it ('{command}' ignored)")
+    server = InstanceControlServer(data_dir)
+    try:
+        server.start()
+    except OSError as e:
+        print(f"Control channel unavailable: {e}")
+        server = None
+    return lock, server
+
+# Modifier flags and virtual-key codes for RegisterHotKey
+HOTKEY_MODIFIERS = {'alt': 0x0001, 'ctrl': 0x0002, 'control': 0x0002, 'shift': 0x0004,
+                    'win': 0x0008, 'windows': 0x0008}
+MOD_NOREPEAT = 0x4000
+HOTKEY_NAMED_KEYS = {'space': 0x20, 'enter': 0x0D, 'tab': 0x09, 'esc': 0x1B, 'escape': 0x1B,
+                     'backspace': 0x08, 'delete': 0x2E, 'insert': 0x2D, 'home': 0x24, 'end': 0x23,
+                     'pageup': 0x21, 'pagedown': 0x22, 'up': 0x26, 'down': 0x28,
+                     'left': 0x25, 'right': 0x27, 'pause': 0x13}
+
+def parse_hotkey(chord):
+    """Turn 'ctrl+alt+q' into (modifiers, virtual_key) for RegisterHotKey"""
+    modifiers = 0
+    virtual_key = None
+    for part in chord.lower().replace(' ', '').split('+'):
+        if part in HOTKEY_MODIFIERS:
+            modifiers |= HOTKEY_MODIFIERS[part]
+        elif len(part) == 1 and part.isalnum():
+            virtual_key = ord(part.upper())
+        elif part in HOTKEY_NAMED_KEYS:
+            virtual_key = HOTKEY_NAMED_KEYS[part]
+        elif part.startswith('f') and part[1:].isdigit() and 1 <= int(part[1:]) <= 24:
+            virtual_key = 0x70 + int(part[1:]) - 1
+        else:
+            raise ValueError(f"Unsupported key in hotkey '{chord}': {part}")
+    if virtual_key is None:
+        raise ValueError(f"Hotkey '{chord}' has no main key")
+    return modifiers, virtual_key
+
+class HotkeyBackend(ABC):
+    """Interface for global hotkey backends"""
+    name = 'base'
+
+    @abstractmethod
+    def register(self, chord, callback):
+        """Register chord; return True on success"""
+
+    def unregister_all(self):
+        """Remove every registered hotkey"""
+
+class Win32HotkeyBackend(HotkeyBackend):
+    """Registers chords with the OS (RegisterHotKey) and waits on a dedicated message thread.
+
+    Python only runs when a registered chord fires, unlike a low-level keyboard hook.
+    """
+    name = 'win32'
+
+    WM_HOTKEY = 0x0312
+    WM_QUIT = 0x0012
+    WM_APP_REGISTER = 0x8001  # WM_APP + 1: register the pending chord on the hotkey thread
+
+    def __init__(self):
+        self.thread = None
+        self.thread_id = None
+        self.callbacks = {}  # hotkey id -> callback
+        self._pending = None
+        self._ready = threading.Event()
+        self._registered = threading.Event()
+        self._register_result = False
+        self._register_lock = threading.Lock()
+        self._next_id = 1
+
+    def _ensure_thread(self):
+        if self.thread and self.thread.is_alive():
+            return
+        self._ready.clear()
+        self.thread = threading.Thread(target=self._run, name='hotkey', daemon=True)
+        self.thread.start()
+        self._ready.wait(2.0)
+
+    def register(self, chord, callback):
+        modifiers, virtual_key = parse_hotkey(chord)
+        with self._register_lock:
+            self._ensure_thread()
+            if not self.thread_id:
+                return False
+            # RegisterHotKey(NULL, ...) binds to the calling thread, so do it on the hotkey thread
+            self._pending = (self._next_id, modifiers | MOD_NOREPEAT, virtual_key, callback)
+            self._registered.clear()
+            ctypes.windll.user32.PostThreadMessageW(self.thread_id, self.WM_APP_REGISTER, 0, 0)
+            self._registered.wait(2.0)
+            if self._register_result:
+                self._next_id += 1
+            return self._register_result
+
+    def _run(self):
+        user32 = ctypes.windll.user32
+        msg = wintypes.MSG()
+        # Calling PeekMessage creates this thread's message queue before anyone posts to it
+        user32.PeekMessageW(ctypes.byref(msg), None, 0, 0, 0)
+        self.thread_id = ctypes.windll.kernel32.GetCurrentThreadId()
+        self._ready.set()
+        try:
+            while user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+                note_wakeup()
+                if msg.message == self.WM_HOTKEY:
+                    callback = self.callbacks.get(msg.wParam)
+                    if callback:
+                        try:
+                            callback()
+                        except Exception as e:
+                            logger.error(f"Hotkey callback failed: {e}")
+                elif msg.message == self.WM_APP_REGISTER and self._pending:
+                    hotkey_id, modifiers, virtual_key, callback = self._pending
+                    self._pending = None
+                    self._register_result = bool(user32.RegisterHotKey(None, hotkey_id, modifiers, virtual_key))
+                    if self._register_result:
+                        self.callbacks[hotkey_id] = callback
+                    self._registered.set()
+        finally:
+            for hotkey_id in list(self.callbacks):
+                user32.UnregisterHotKey(None, hotkey_id)
+            self.callbacks.clear()
+            self.thread_id = None
+
+    def unregister_all(self):
+        if self.thread_id:
+            ctypes.windll.user32.PostThreadMessageW(self.thread_id, self.WM_QUIT, 0, 0)
+
+class KeyboardHookBackend(HotkeyBackend):
+    """Fallback: the `keyboard` package's global low-level hook"""
+    name = 'keyboard'
+
+    def register(self, chord, callback):
+        import keyboard
+        keyboard.add_hotkey(chord, callback)
+        return True
+
+    def unregister_all(self):
+        try:
+            import keyboard
+            keyboard.unhook_all()
+        except Exception:
+            pass
+
+class StubHotkeyBackend(HotkeyBackend):
+    """In-memory backend for tests; fire(chord) simulates the chord being pressed"""
+    name = 'stub'
+
+    def __init__(self, accept=True):
+        self.accept = accept  # False simulates a chord already taken by another app
+        self.callbacks = {}
+
+    def register(self, chord, callback):
+        parse_hotkey(chord)
+        if not self.accept:
+            return False
+        self.callbacks[chord] = callback
+        return True
+
+    def fire(self, chord):
+        self.callbacks[chord]()
+
+    def unregister_all(self):
+        self.callbacks.clear()
+
+def register_hotkey(chord, callback, backends):
+    """Register chord with the first backend that accepts it; return that backend or None"""
+    for backend in backends:
+        try:
+            if backend.register(chord, callback):
+                return backend
+            print(f"⚠️ Hotkey backend '{backend.name}' could not register {chord}")
+        except Exception as e:
+            logger.error(f"Hotkey backend '{backend.name}' failed: {e}")
+    return None
+
+def _filetime_to_epoch(filetime):
+    """FILETIME (100 ns ticks since 1601) to Unix seconds"""
+    return (filetime - 116444736000000000) / 1e7
+
+def session_logon_time():
+    """(epoch seconds, source) of this session's logon; falls back to boot, then to now"""
+    if sys.platform.startswith('win'):
+        try:
+            class WTSINFOW(ctypes.Structure):
+                _fields_ = [('State', ctypes.c_int), ('SessionId', wintypes.DWORD),
+                            ('Counters', wintypes.DWORD * 6),
+                            ('WinStationName', wintypes.WCHAR * 32), ('Domain', wintypes.WCHAR * 17),
+                            ('UserName', wintypes.WCHAR * 21),
+                            ('ConnectTime', ctypes.c_longlong), ('DisconnectTime', ctypes.c_longlong),
+                            ('LastInputTime', ctypes.c_longlong), ('LogonTime', ctypes.c_longlong),
+                            ('CurrentTime', ctypes.c_longlong)]
+            wtsapi32 = ctypes.windll.wtsapi32
+            buffer = ctypes.POINTER(WTSINFOW)()
+            size = wintypes.DWORD()
+            # WTS_CURRENT_SERVER_HANDLE, WTS_CURRENT_SESSION, WTSSessionInfo
+            if wtsapi32.WTSQuerySessionInformationW(None, wintypes.DWORD(0xFFFFFFFF), 24,
+                                                    ctypes.byref(buffer), ctypes.byref(size)):
+                try:
+                    logon_time = buffer.contents.LogonTime
+                finally:
+                    wtsapi32.WTSFreeMemory(buffer)
+                if logon_time:
+                    return _filetime_to_epoch(logon_time), 'logon'
+        except Exception as e:
+            logger.error(f"Session logon time unavailable: {e}")
+        try:
+            ctypes.windll.kernel32.GetTickCount64.restype = ctypes.c_ulonglong
+            return time.time() - ctypes.windll.kernel32.GetTickCount64() / 1000.0, 'boot'
+        except Exception:
+            pass
+    return time.time(), 'process'
+
+def process_created_at():
+    """Epoch seconds at which this process was created (before the interpreter started)"""
+    if sys.platform.startswith('win'):
+        try:
+            times = [wintypes.FILETIME() for _ in range(4)]
+            kernel32 = ctypes.windll.kernel32
+            kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+            if kernel32.GetProcessTimes(kernel32.GetCurrentProcess(), *[ctypes.byref(t) for t in times]):
+                created = times[0]
+                return _filetime_to_epoch((created.dwHighDateTime << 32) | created.dwLowDateTime)
+        except Exception:
+            pass
+    return time.time()
+
+def system_cpu_times():
+    """(idle, total) 100 ns ticks across all CPUs, or None where unsupported"""
+    if not sys.platform.startswith('win'):
+        return None
+    idle, kernel, user = wintypes.FILETIME(), wintypes.FILETIME(), wintypes.FILETIME()
+    if not ctypes.windll.kernel32.GetSystemTimes(ctypes.byref(idle), ctypes.byref(kernel), ctypes.byref(user)):
+        return None
+    ticks = [(t.dwHighDateTime << 32) | t.dwLowDateTime for t in (idle, kernel, user)]
+    return ticks[0], ticks[1] + ticks[2]  # Kernel time includes idle time
+
+class BootStartup:
+    """Staggered start for the logon launch (--boot).
+
+    Only the hotkey is registered right away, with ctypes alone. Tk, PIL, pystray and the
+    rest are imported once system CPU has stayed below idle_cpu_percent for idle_samples
+    samples (after min_delay) or max_delay has passed; a hotkey press ends the wait early
+    and is replayed once the app is up. Until then the process runs in background mode
+    (low CPU, I/O and memory priority). Phase times are seconds from logon and are appended
+    to boot_timings.json.
+    """
+
+    PROCESS_MODE_BACKGROUND_BEGIN = 0x00100000
+    PROCESS_MODE_BACKGROUND_END = 0x00200000
+
+    def __init__(self, data_dir, min_delay=5.0, max_delay=60.0, idle_cpu_percent=30.0,
+                 idle_samples=3, sample_interval=1.0, tray_delay=3.0, history=20):
+        self.data_dir = data_dir
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.idle_cpu_percent = idle_cpu_percent
+        self.idle_samples = idle_samples
+        self.sample_interval = sample_interval
+        self.tray_delay = tray_delay  # The tray icon follows the hotkey and monitoring
+        self.history = history
+        self.logon_at, self.logon_source = session_logon_time()
+        self.phases = {}  # Phase name -> seconds since logon, in order reached
+        self.defer_reason = None
+        self.hotkey_backend = None
+        self.early_presses = 0
+        self._handler = None
+        self._wake = threading.Event()
+        self._background = False
+        self.phases['process_start'] = round(process_created_at() - self.logon_at, 3)
+
+    @property
+    def timings_path(self):
+        return os.path.join(self.data_dir, 'boot_timings.json')
+
+    def mark(self, phase):
+        self.phases[phase] = round(time.time() - self.logon_at, 3)
+
+    def register_hotkey(self, chord):
+        backend = Win32HotkeyBackend()
+        try:
+            if backend.register(chord, self._on_hotkey):
+                self.hotkey_backend = backend
+        except Exception as e:
+            logger.error(f"Boot hotkey registration failed: {e}")
+        self.mark('hotkey_registered')
+
+    def _on_hotkey(self):
+        """Hotkey thread: forward to the app once it adopted the hotkey, else cut the wait short"""
+        if self._handler:
+            self._handler()
+            return
+        self.early_presses += 1
+        self._wake.set()
+
+    def adopt_hotkey(self, callback):
+        """Route the already registered hotkey to callback; returns the backend or None"""
+        if not self.hotkey_backend:
+            return None
+        self._handler = callback
+        if self.early_presses % 2:
+            callback()  # Pressed while the app was loading: apply it now
+        return self.hotkey_backend
+
+    def _set_background(self, enabled):
+        if not sys.platform.startswith('win') or self._background == enabled:
+            return
+        try:
+            kernel32 = ctypes.windll.kernel32
+            kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+            mode = self.PROCESS_MODE_BACKGROUND_BEGIN if enabled else self.PROCESS_MODE_BACKGROUND_END
+            if kernel32.SetPriorityClass(kernel32.GetCurrentProcess(), mode):
+                self._background = enabled
+        except Exception as e:
+            logger.error(f"Background priority change failed: {e}")
+
+    def defer(self):
+        """Block until the system is idle, max_delay passed or the hotkey was pressed"""
+        self._set_background(True)
+        started = time.monotonic()
+        previous = system_cpu_times()
+        quiet_samples = 0
+        while True:
+            if self._wake.wait(self.sample_interval):
+                reason = 'hotkey'
+                break
+            elapsed = time.monotonic() - started
+            if elapsed >= self.max_delay:
+                reason = 'timeout'
+                break
+            current = system_cpu_times()
+            if previous is None or current is None:
+                quiet_samples += 1  # Can't measure load: only min_delay applies
+            else:
+                total = current[1] - previous[1]
+                busy = 100.0 * (1.0 - (current[0] - previous[0]) / total) if total > 0 else 0.0
+                quiet_samples = quiet_samples + 1 if busy < self.idle_cpu_percent else 0
+            previous = current
+            if quiet_samples >= self.idle_samples and elapsed >= self.min_delay:
+                reason = 'idle'
+                break
+        self.defer_reason = reason
+        self.mark('deferral_end')
+
+    def finish(self):
+        """The app is fully up: back to normal priority, and record this boot"""
+        self._set_background(False)
+        self.mark('ready')
+        try:
+            self.save()
+        except Exception as e:
+            logger.error(f"Could not save boot timings: {e}")
+
+    def summary(self):
+        return {'logon_source': self.logon_source, 'defer_reason': self.defer_reason,
+                'early_presses': self.early_presses, 'phases': dict(self.phases)}
+
+    def save(self):
+        try:
+            with open(self.timings_path, encoding='utf-8') as f:
+                records = json.load(f)
+        except (OSError, ValueError):
+            records = []
+        records.append(dict(self.summary(), logon_at=self.logon_at))
+        temp_path = f"{self.timings_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(records[-self.history:], f, indent=2)
+        os.replace(temp_path, self.timings_path)
+
+def early_launch(argv):
+    """Script fast path: claim the instance (or forward argv's command and exit) and, for a
+    boot launch, register the hotkey and wait for the system to settle.
+
+    Returns (single instance result, BootStartup or None) for main().
+    """
+    single_instance = claim_single_instance(argv)
+    boot = None
+    if '--boot' in argv:
+        # Logon launch: hotkey now, the heavy imports below once the system has settled
+        boot = BootStartup(app_data_dir())
+        boot.mark('instance_claimed')
+        boot.register_hotkey(DEFAULT_TOGGLE_KEY)
+        boot.defer()
+    return single_instance, boot
+
+# Set by the fast path when run as a script; defaults when imported (e.g. by a harness).
+# This has to run here, in the middle of the module, rather than in main(): everything below
+# (tkinter, pywin32, PIL, pystray, psutil) takes most of a launch's time, and the fast path
+# exists to skip it - a second launch forwards its command and exits before loading any of
+# it, and a boot launch has its hotkey working while the system is still busy with logon.
+_single_instance = (None, None)
+_boot = None
+if __name__ == "__main__":
+    _single_instance, _boot = early_launch(sys.argv[1:])
+
+import tkinter as tk
+from tkinter import messagebox
+import win32gui
+import win32con
+import win32api
+import win32process
+import psutil
+from PIL import Image, ImageTk, ImageFilter, ImageGrab, ImageDraw
+import pystray
+from pystray import MenuItem as item
+import queue
+import gc
+import subprocess
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+
+if _boot:
+    _boot.mark('imports_done')
+
+# Rounded-corner caches: corner tiles by (radius, scale), full masks by (width, height, radius, scale)
+_corner_tile_cache = {}
+_rounded_mask_cache = {}
+_ROUNDED_MASK_CACHE_LIMIT = 8
+
+def create_corner_tile(radius, scale=4):
+    """Create the top-left corner alpha tile (radius x radius, mode 'L').
+
+    scale > 1 supersamples the arc for anti-aliasing; scale=1 gives a hard edge.
+    Cost is O(radius^2 * scale^2) and the result is cached.
+    """
+    key = (radius, scale)
+    tile = _corner_tile_cache.get(key)
+    if tile is not None:
+        return tile
+
+    size = radius * scale
+    try:
+        import numpy as np
+
+        # Sample pixel centres against a circle centred on the tile's inner corner
+        coords = (np.arange(size, dtype=np.float32) + 0.5) / scale
+        dx = (radius - coords)[np.newaxis, :]
+        dy = (radius - coords)[:, np.newaxis]
+        inside = (dx * dx + dy * dy) <= radius * radius
+        coverage = inside.reshape(radius, scale, radius, scale).mean(axis=(1, 3))
+        tile = Image.fromarray((coverage * 255 + 0.5).astype(np.uint8), mode='L')
+    except ImportError:
+        # Fallback without numpy: draw the quarter circle large and box-filter it down
+        big = Image.new('L', (size * 2, size * 2), 0)
+        ImageDraw.Draw(big).ellipse([(0, 0), (size * 2 - 1, size * 2 - 1)], fill=255)
+        tile = big.crop((0, 0, size, size))
+        if scale > 1:
+            tile = tile.resize((radius, radius), Image.Resampling.BOX)
+
+    _corner_tile_cache[key] = tile
+    return tile
+
+def _corner_boxes(width, height, radius):
+    """Yield (box, transpose) for the four corners, clockwise from top-left"""
+    yield (0, 0, radius, radius), None
+    yield (width - radius, 0, width, radius), Image.Transpose.FLIP_LEFT_RIGHT
+    yield (width - radius, height - radius, width, height), Image.Transpose.ROTATE_180
+    yield (0, height - radius, radius, height), Image.Transpose.FLIP_TOP_BOTTOM
+
+def create_rounded_rectangle_mask(width, height, radius, scale=4):
+    """Create a rounded rectangle mask for applying rounded corners (cached, treat as read-only)"""
+    radius = max(0, min(radius, width // 2, height // 2))
+    key = (width, height, radius, scale)
+    mask = _rounded_mask_cache.get(key)
+    if mask is not None:
+        return mask
+
+    mask = Image.new('L', (width, height), 255)
+    if radius:
+        tile = create_corner_tile(radius, scale)
+        for box, transpose in _corner_boxes(width, height, radius):
+            mask.paste(tile.transpose(transpose) if transpose is not None else tile, box[:2])
+
+    if len(_rounded_mask_cache) >= _ROUNDED_MASK_CACHE_LIMIT:
+        _rounded_mask_cache.pop(next(iter(_rounded_mask_cache)))
+    _rounded_mask_cache[key] = mask
+    return mask
+
+def apply_rounded_corners_to_image(image, radius, antialias=True):
+    """Apply rounded corners to an image, touching only the four corner patches.
+
+    RGBA images are modified in place; other modes are converted to a new RGBA image first.
+    """
+    if image.mode != 'RGBA':
+        image = image.convert('RGBA')
+    
+    width, height = image.size
+    radius = max(0, min(radius, width // 2, height // 2))
+    if not radius:
+        return image
+    tile = create_corner_tile(radius, 4 if antialias else 1)
+
+    try:
+        import numpy as np
+
+        tile_array = np.asarray(tile, dtype=np.uint16)
+        for box, transpose in _corner_boxes(width, height, radius):
+            corner_alpha = tile_array
+            if transpose is Image.Transpose.FLIP_LEFT_RIGHT:
+                corner_alpha = tile_array[:, ::-1]
+            elif transpose is Image.Transpose.ROTATE_180:
+                corner_alpha = tile_array[::-1, ::-1]
+            elif transpose is Image.Transpose.FLIP_TOP_BOTTOM:
+                corner_alpha = tile_array[::-1, :]
+
+            # Scale the patch's existing alpha by the corner coverage
+            patch = np.array(image.crop(box))
+            patch[:, :, 3] = (patch[:, :, 3] * corner_alpha + 127) // 255
+            image.paste(Image.fromarray(patch, mode='RGBA'), box[:2])
+    except ImportError:
+        # Fallback without numpy: same corner-only work using PIL channel ops
+        from PIL import ImageChops
+        for box, transpose in _corner_boxes(width, height, radius):
+            patch = image.crop(box)
+            corner_alpha = tile.transpose(transpose) if transpose is not None else tile
+            patch.putalpha(ImageChops.multiply(patch.getchannel('A'), corner_alpha))
+            image.paste(patch, box[:2])
+    
+    return image
+
+class PhotoImageCache:
+    """Small keyed cache of Tk images so re-showing the overlay skips the PIL->Tk copy"""
+
+    def __init__(self, max_entries=4):
+        self.max_entries = max_entries
+        self._entries = {}  # (id(texture), width, height) -> (texture, photo)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, texture, width, height):
+        """Return a PhotoImage for texture at (width, height), converting only on a miss"""
+        key = (id(texture), width, height)
+        entry = self._entries.get(key)
+        # Keep the texture itself in the entry so its id() can't be reused by another image
+        if entry and entry[0] is texture:
+            self.hits += 1
+            # Move to the end so the oldest entry is evicted first
+            self._entries[key] = self._entries.pop(key)
+            return entry[1], False
+
+        self.misses += 1
+        if texture.size != (width, height):
+            resized = texture.resize((width, height), Image.Resampling.LANCZOS)
+        else:
+            resized = texture
+        photo = ImageTk.PhotoImage(resized)
+
+        while len(self._entries) >= self.max_entries:
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[key] = (texture, photo)
+        return photo, True
+
+    def lookup(self, texture, width, height):
+        """Return the cached PhotoImage for texture at (width, height) without converting"""
+        entry = self._entries.get((id(texture), width, height))
+        if entry and entry[0] is texture:
+            return entry[1]
+        return None
+
+    def clear(self):
+        """Drop every cached Tk image"""
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+class BITMAPINFOHEADER(ctypes.Structure):
+    _fields_ = [
+        ('biSize', wintypes.DWORD),
+        ('biWidth', wintypes.LONG),
+        ('biHeight', wintypes.LONG),
+        ('biPlanes', wintypes.WORD),
+        ('biBitCount', wintypes.WORD),
+        ('biCompression', wintypes.DWORD),
+        ('biSizeImage', wintypes.DWORD),
+        ('biXPelsPerMeter', wintypes.LONG),
+        ('biYPelsPerMeter', wintypes.LONG),
+        ('biClrUsed', wintypes.DWORD),
+        ('biClrImportant', wintypes.DWORD),
+    ]
+
+class BITMAPINFO(ctypes.Structure):
+    _fields_ = [('bmiHeader', BITMAPINFOHEADER), ('bmiColors', wintypes.DWORD * 3)]
+
+class CaptureBackend(ABC):
+    """Interface for capture backends: fill a reusable (height, width, 4) BGRA buffer"""
+    name = 'base'
+    real_content = True  # Frames show the window; False for synthetic ones
+
+    @abstractmethod
+    def allocate(self, width, height):
+        """Allocate pixel storage for a new size and return it as a NumPy view"""
+
+    @abstractmethod
+    def grab(self, hwnd, rect):
+        """Copy the pixels of rect (or hwnd) into the allocated buffer; return True on success"""
+
+    def release(self):
+        """Free everything the backend holds"""
+
+class GdiDibCaptureBackend(CaptureBackend):
+    """Keeps a memory DC and a top-down 32-bit DIB section alive between captures"""
+    name = 'gdi'
+
+    SRCCOPY = 0x00CC0020
+    CAPTUREBLT = 0x40000000
+
+    def __init__(self):
+        # Own instances, so these prototypes don't leak into ctypes.windll's shared ones
+        self._user32 = ctypes.WinDLL('user32', use_last_error=True)
+        self._gdi32 = ctypes.WinDLL('gdi32', use_last_error=True)
+        # Handles are pointer-sized; declare them so they aren't truncated on 64-bit
+        self._user32.GetDC.restype = ctypes.c_void_p
+        self._user32.GetDC.argtypes = [ctypes.c_void_p]
+        self._user32.ReleaseDC.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+        self._gdi32.CreateCompatibleDC.restype = ctypes.c_void_p
+        self._gdi32.CreateCompatibleDC.argtypes = [ctypes.c_void_p]
+        self._gdi32.CreateDIBSection.restype = ctypes.c_void_p
+        self._gdi32.CreateDIBSection.argtypes = [
+            ctypes.c_void_p, ctypes.POINTER(BITMAPINFO), wintypes.UINT,
+            ctypes.POINTER(ctypes.c_void_p), ctypes.c_void_p, wintypes.DWORD]
+        self._gdi32.SelectObject.restype = ctypes.c_void_p
+        self._gdi32.SelectObject.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+        self._gdi32.DeleteObject.argtypes = [ctypes.c_void_p]
+        self._gdi32.DeleteDC.argtypes = [ctypes.c_void_p]
+        self._gdi32.BitBlt.argtypes = [
+            ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+            ctypes.c_void_p, ctypes.c_int, ctypes.c_int, wintypes.DWORD]
+
+        self.screen_dc = self._user32.GetDC(None)
+        self.mem_dc = self._gdi32.CreateCompatibleDC(self.screen_dc)
+        self.dib = None
+        self.old_bitmap = None
+        self.buffer = None
+        self.size = None
+
+    def allocate(self, width, height):
+        import numpy as np
+
+        self._free_dib()
+        info = BITMAPINFO()
+        info.bmiHeader.biSize = ctypes.sizeof(BITMAPINFOHEADER)
+        info.bmiHeader.biWidth = width
+        info.bmiHeader.biHeight = -height  # Negative height = top-down rows
+        info.bmiHeader.biPlanes = 1
+        info.bmiHeader.biBitCount = 32
+        info.bmiHeader.biCompression = 0  # BI_RGB
+
+        bits = ctypes.c_void_p()
+        self.dib = self._gdi32.CreateDIBSection(self.mem_dc, ctypes.byref(info), 0,
+                                                ctypes.byref(bits), None, 0)
+        if not self.dib or not bits.value:
+            self.dib = None
+            raise OSError("CreateDIBSection failed")
+        self.old_bitmap = self._gdi32.SelectObject(self.mem_dc, self.dib)
+
+        # Zero-copy view over the DIB's pixel memory
+        raw = (ctypes.c_uint8 * (width * height * 4)).from_address(bits.value)
+        self.buffer = np.ctypeslib.as_array(raw).reshape(height, width, 4)
+        self.size = (width, height)
+        return self.buffer
+
+    def grab(self, hwnd, rect):
+        x, y, x2, y2 = rect
+        return bool(self._gdi32.BitBlt(self.mem_dc, 0, 0, x2 - x, y2 - y, self.screen_dc,
+                                       x, y, self.SRCCOPY | self.CAPTUREBLT))
+
+    def _free_dib(self):
+        # Drop the NumPy view before the memory behind it goes away
+        self.buffer = None
+        if self.dib:
+            if self.old_bitmap:
+                self._gdi32.SelectObject(self.mem_dc, self.old_bitmap)
+                self.old_bitmap = None
+            self._gdi32.DeleteObject(self.dib)
+            self.dib = None
+        self.size = None
+
+    def release(self):
+        self._free_dib()
+        if self.mem_dc:
+            self._gdi32.DeleteDC(self.mem_dc)
+            self.mem_dc = None
+        if self.screen_dc:
+            self._user32.ReleaseDC(None, self.screen_dc)
+            self.screen_dc = None
+
+class ScreenBitBltCaptureBackend(GdiDibCaptureBackend):
+    """Copies what is on screen inside the window rect (includes anything on top of it)"""
+    name = 'bitblt'
+
+class PrintWindowCaptureBackend(GdiDibCaptureBackend):
+    """Asks the window to render itself, so overlapping windows don't leak into the capture"""
+    name = 'printwindow'
+
+    PW_RENDERFULLCONTENT = 0x00000002
+
+    def __init__(self):
+        super().__init__()
+        self._user32.PrintWindow.argtypes = [ctypes.c_void_p, ctypes.c_void_p, wintypes.UINT]
+
+    def grab(self, hwnd, rect):
+        if not hwnd:
+            return False
+        return bool(self._user32.PrintWindow(hwnd, self.mem_dc, self.PW_RENDERFULLCONTENT))
+
+def synthetic_frame(width, height, index):
+    """Deterministic BGRA test frame: a gradient that shifts with the frame index"""
+    import numpy as np
+
+    frame = np.empty((height, width, 4), dtype=np.uint8)
+    frame[:, :, 0] = ((np.arange(width) + index * 8) % 256).astype(np.uint8)[np.newaxis, :]
+    frame[:, :, 1] = ((np.arange(height) + index * 4) % 256).astype(np.uint8)[:, np.newaxis]
+    frame[:, :, 2] = (index * 16) % 256
+    frame[:, :, 3] = 255
+    return frame
+
+class FakeCaptureBackend(CaptureBackend):
+    """Backend that serves synthetic frames, for tests and machines without GDI"""
+    name = 'fake'
+    real_content = False
+
+    def __init__(self, frame_source=None):
+        self.frame_source = frame_source or synthetic_frame
+        self.buffer = None
+        self.frames_grabbed = 0
+
+    def allocate(self, width, height):
+        import numpy as np
+
+        self.buffer = np.zeros((height, width, 4), dtype=np.uint8)
+        return self.buffer
+
+    def grab(self, hwnd, rect):
+        height, width = self.buffer.shape[:2]
+        self.buffer[...] = self.frame_source(width, height, self.frames_grabbed)
+        self.frames_grabbed += 1
+        return True
+
+    def release(self):
+        self.buffer = None
+
+CAPTURE_BACKENDS = {
+    'bitblt': ScreenBitBltCaptureBackend,
+    'printwindow': PrintWindowCaptureBackend,
+    'fake': FakeCaptureBackend,
+}
+
+class CaptureEngine:
+    """Captures window pixels into a buffer that is reallocated only when the size changes"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.frame = None
+        self.size = None
+        self.allocations = 0
+        self.captures = 0
+        self._lock = threading.Lock()
+
+    def capture(self, rect, hwnd=None):
+        """Capture rect and return a (height, width, 4) BGRA view, or None on failure.
+
+        The view is reused by the next capture; copy it if it has to outlive that.
+        """
+        x, y, x2, y2 = rect
+        size = (x2 - x, y2 - y)
+        if size[0] <= 0 or size[1] <= 0:
+            return None
+
+        with self._lock:
+            if self.frame is None or self.size != size:
+                self.frame = self.backend.allocate(*size)
+                self.size = size
+                self.allocations += 1
+            if not self.backend.grab(hwnd, rect):
+                return None
+            self.captures += 1
+            return self.frame
+
+    def capture_image(self, rect, hwnd=None):
+        """Capture rect as an independent PIL RGB image"""
+        frame = self.capture(rect, hwnd)
+        if frame is None:
+            return None
+        height, width = frame.shape[:2]
+        # Decoding from BGRX copies, so the image doesn't alias the reusable buffer
+        return Image.frombuffer('RGB', (width, height), frame, 'raw', 'BGRX', 0, 1)
+
+    def set_backend(self, backend):
+        """Swap backends; the next capture reallocates on the new one"""
+        with self._lock:
+            self.frame = None
+            self.size = None
+            self.backend.release()
+            self.backend = backend
+
+    def release(self):
+        with self._lock:
+            self.frame = None
+            self.size = None
+            self.backend.release()
+
+def compute_fingerprint(frame, grid=(24, 16)):
+    """Heavily downsampled fingerprint of a BGRA frame: mean level per grid cell (rows x cols)"""
+    import numpy as np
+
+    rows, cols = grid
+    height, width = frame.shape[:2]
+    cell_h, cell_w = height // rows, width // cols
+    if cell_h == 0 or cell_w == 0:
+        return None
+    # Split into whole cells first, then sample every other pixel inside each cell;
+    # precise enough to notice a new message, whatever the cell size
+    cells = frame[:cell_h * rows, :cell_w * cols, :3].reshape(rows, cell_h, cols, cell_w, 3)[:, ::2, :, ::2]
+    return cells.mean(axis=(1, 3, 4), dtype=np.float32)
+
+def changed_bands(old, new, threshold, height):
+    """Return merged (y0, y1) pixel bands whose fingerprint rows changed by more than threshold"""
+    import numpy as np
+
+    rows = new.shape[0]
+    row_height = height // rows
+    changed = np.abs(new - old).max(axis=1) > threshold
+    bands = []
+    for row in np.flatnonzero(changed):
+        y0 = int(row) * row_height
+        y1 = height if row == rows - 1 else y0 + row_height
+        if bands and bands[-1][1] == y0:
+            bands[-1] = (bands[-1][0], y1)
+        else:
+            bands.append((y0, y1))
+    return bands
+
+class LiveRefreshController:
+    """Decides when to sample the window and which bands changed, within a time budget"""
+
+    def __init__(self, interval=3.0, threshold=6.0, budget_ms=500.0, budget_window=60.0, grid=(24, 16)):
+        self.interval = interval  # Seconds between fingerprint samples
+        self.threshold = threshold  # Mean level change (0-255) that counts as new content
+        self.budget_ms = budget_ms  # Max refresh time allowed per budget_window seconds
+        self.budget_window = budget_window
+        self.grid = grid
+        self.fingerprint = None
+        self.last_sample = 0
+        self._costs = collections.deque()  # (timestamp, ms)
+
+    def spent_ms(self, now):
+        """Refresh time spent inside the current budget window"""
+        while self._costs and now - self._costs[0][0] > self.budget_window:
+            self._costs.popleft()
+        return sum(ms for _, ms in self._costs)
+
+    def is_due(self, now):
+        return now - self.last_sample >= self.interval and self.spent_ms(now) < self.budget_ms
+
+    def record_cost(self, elapsed_ms, now):
+        self._costs.append((now, elapsed_ms))
+
+    def detect_changes(self, baseline, frame):
+        """Fingerprint frame against baseline; returns (fingerprint, changed bands).
+
+        Changes nothing, so it can run on a worker: the caller hands the fingerprint back to
+        the Tk thread, which makes it the new baseline with reset(fingerprint).
+        """
+        fingerprint = compute_fingerprint(frame, self.grid)
+        if baseline is None or fingerprint is None or baseline.shape != fingerprint.shape:
+            return fingerprint, []
+        return fingerprint, changed_bands(baseline, fingerprint, self.threshold, frame.shape[0])
+
+    def reset(self, fingerprint=None):
+        """Forget the baseline (e.g. after a full render), optionally seeding a new one"""
+        self.fingerprint = fingerprint
+
+# Render quality tiers, best first. The governor steps down under load and back up when idle.
+QUALITY_TIERS = [
+    {'name': 'high', 'render_scale': 1.0, 'blur_radius': 1.5,
+     'resample': Image.Resampling.LANCZOS, 'refresh_interval': 3.0},
+    {'name': 'medium', 'render_scale': 0.5, 'blur_radius': 1.0,
+     'resample': Image.Resampling.BILINEAR, 'refresh_interval': 6.0},
+    {'name': 'low', 'render_scale': 0.25, 'blur_radius': 0,
+     'resample': Image.Resampling.BILINEAR, 'refresh_interval': 12.0},
+]
+
+class CpuBudgetGovernor:
+    """Picks a render quality tier from system/process CPU load and recent render times"""
+
+    def __init__(self, budget_ms=120.0, high_system_cpu=75.0, low_system_cpu=40.0,
+                 high_process_cpu=50.0, window=5):
+        self.budget_ms = budget_ms  # Target time for one render operation
+        self.high_system_cpu = high_system_cpu
+        self.low_system_cpu = low_system_cpu
+        self.high_process_cpu = high_process_cpu  # Percent of one core
+        self.tier_index = 0
+        self.render_times = collections.deque(maxlen=window)
+        self.history = collections.deque(maxlen=20)  # (timestamp, tier name, reason)
+        self.time_spent_ms = 0.0
+        self.renders = 0
+        self.system_cpu = 0.0
+        self.process_cpu = 0.0
+        self._process = psutil.Process()
+        # First cpu_percent(None) calls only set the baseline
+        psutil.cpu_percent(None)
+        self._process.cpu_percent(None)
+
+    @property
+    def tier(self):
+        return QUALITY_TIERS[self.tier_index]
+
+    def sample(self):
+        """Sample CPU usage since the last call (non-blocking)"""
+        try:
+            self.system_cpu = psutil.cpu_percent(None)
+            self.process_cpu = self._process.cpu_percent(None)
+        except Exception:
+            pass
+
+    def record_render(self, elapsed_ms):
+        self.render_times.append(elapsed_ms)
+        self.time_spent_ms += elapsed_ms
+        self.renders += 1
+
+    def average_render_ms(self):
+        if not self.render_times:
+            return None
+        return sum(self.render_times) / len(self.render_times)
+
+    def choose_tier(self):
+        """Step the tier down when over budget or loaded, up when there's headroom"""
+        average_ms = self.average_render_ms()
+        over_budget = average_ms is not None and average_ms > self.budget_ms
+        loaded = self.system_cpu > self.high_system_cpu or self.process_cpu > self.high_process_cpu
+        relaxed = (self.system_cpu < self.low_system_cpu and
+                   (average_ms is None or average_ms < self.budget_ms / 2))
+
+        new_index = self.tier_index
+        if over_budget or loaded:
+            new_index = min(self.tier_index + 1, len(QUALITY_TIERS) - 1)
+        elif relaxed:
+            new_index = max(self.tier_index - 1, 0)
+
+        if new_index != self.tier_index:
+            render_text = f"{average_ms:.0f} ms" if average_ms is not None else "n/a"
+            reason = (f"system CPU {self.system_cpu:.0f}%, process CPU {self.process_cpu:.0f}%, "
+                      f"render {render_text} (budget {self.budget_ms:.0f} ms)")
+            print(f"⚙️ Quality tier: {self.tier['name']} → {QUALITY_TIERS[new_index]['name']} ({reason})")
+            self.tier_index = new_index
+            self.history.append((time.time(), self.tier['name'], reason))
+            # Timings from the previous tier don't describe the new one
+            self.render_times.clear()
+        return self.tier
+
+    def summary(self):
+        average_ms = self.average_render_ms()
+        render_text = f"{average_ms:.1f} ms" if average_ms is not None else "n/a"
+        return (f"Tier: {self.tier['name']} | System CPU: {self.system_cpu:.0f}% | "
+                f"Process CPU: {self.process_cpu:.0f}%\n"
+                f"Avg render: {render_text} (budget {self.budget_ms:.0f} ms) | "
+                f"Total render time: {self.time_spent_ms:.0f} ms over {self.renders} renders")
+
+# What a blur render worker hands back to the Tk thread, which applies the rect and timings
+BlurRender = collections.namedtuple('BlurRender', 'texture tier style rect stages render_ms')
+
+# What a live refresh worker hands back: result is None, ('full', texture) or ('bands', [(y0, image)]);
+# the Tk thread makes fingerprint the new baseline and applies the timings
+ContentRefresh = collections.namedtuple('ContentRefresh', 'result fingerprint tier style stages render_ms')
+
+# Light blue-white tint shared by the overlay styles
+OVERLAY_TINT = (245, 248, 255)
+
+class OverlayStyle(ABC):
+    """Interface for overlay textures. quality ranks how good a style looks (higher is better)"""
+    name = 'base'
+    quality = 0
+    needs_content = False  # Depends on what WhatsApp shows, not just its size
+    band_safe = False  # Horizontal bands can be re-rendered on their own (live refresh)
+    prior_ms_per_mp = 50.0  # Cost guess per megapixel until measured on this machine
+
+    @abstractmethod
+    def render(self, image, tier, radius_scale=1.0):
+        """Return an RGB texture the size of image"""
+
+class SolidTintStyle(OverlayStyle):
+    """Flat tint; the last resort on any hardware"""
+    name = 'solid'
+    quality = 10
+    prior_ms_per_mp = 2.0
+
+    def render(self, image, tier, radius_scale=1.0):
+        return Image.new('RGB', image.size, OVERLAY_TINT)
+
+class GlassGrainStyle(OverlayStyle):
+    """Content-independent frosted glass: fixed-seed grain over the tint, softened"""
+    name = 'glass'
+    quality = 30
+    prior_ms_per_mp = 60.0
+
+    def render(self, image, tier, radius_scale=1.0):
+        width, height = image.size
+        # Lower tiers render the texture smaller and scale it up
+        render_width = max(1, int(width * tier['render_scale']))
+        render_height = max(1, int(height * tier['render_scale']))
+        try:
+            import numpy as np
+            noise = np.random.default_rng(42).normal(0, 2, (render_height, render_width, 1))  # Consistent pattern
+            glass = Image.fromarray(
+                np.clip(np.array(OVERLAY_TINT, dtype=np.float64) + noise, 0, 255).astype(np.uint8), mode='RGB')
+            del noise
+        except ImportError:
+            glass = Image.new('RGB', (render_width, render_height), OVERLAY_TINT)
+        if tier['blur_radius']:
+            glass = glass.filter(ImageFilter.GaussianBlur(radius=tier['blur_radius'] * radius_scale))
+        if glass.size != (width, height):
+            glass = glass.resize((width, height), tier['resample'])
+        return glass
+
+class MosaicStyle(OverlayStyle):
+    """Pixelated window content: block means via a NumPy reshape, lightly tinted"""
+    name = 'mosaic'
+    quality = 20
+    needs_content = True
+    prior_ms_per_mp = 20.0
+    block = 24  # Block edge in pixels at full render scale
+
+    def render(self, image, tier, radius_scale=1.0):
+        import numpy as np
+        width, height = image.size
+        scale = tier['render_scale']
+        source = image.convert('RGB')
+        if scale < 1.0:
+            source = source.resize((max(1, int(width * scale)), max(1, int(height * scale))), Image.Resampling.BOX)
+        block = max(2, int(round(self.block * scale * radius_scale)))
+        pixels = np.asarray(source)
+        rows, columns = pixels.shape[0] // block, pixels.shape[1] // block
+        if not rows or not columns:
+            return Image.new('RGB', (width, height), OVERLAY_TINT)
+        cells = pixels[:rows * block, :columns * block].reshape(rows, block, columns, block, 3)
+        means = cells.mean(axis=(1, 3), dtype=np.float32).astype(np.uint8)
+        mosaic = Image.fromarray(means, mode='RGB').resize((width, height), Image.Resampling.NEAREST)
+        return Image.blend(mosaic, Image.new('RGB', (width, height), OVERLAY_TINT), 0.3)
+
+class ContentBlurStyle(OverlayStyle):
+    """The window content itself: downsample, blur, upscale and tint like glass"""
+    name = 'content'
+    quality = 40
+    needs_content = True
+    band_safe = True
+    prior_ms_per_mp = 30.0
+
+    def render(self, image, tier, radius_scale=1.0):
+        # Lower tiers sample coarser and use a smaller kernel
+        downscale = max(8, int(8 / tier['render_scale']))
+        radius = max(1.0, tier['blur_radius'] * radius_scale * 2)
+        width, height = image.size
+        small = image.convert('RGB').resize(
+            (max(1, width // downscale), max(1, height // downscale)), Image.Resampling.BOX)
+        small = small.filter(ImageFilter.GaussianBlur(radius=radius))
+        blurred = small.resize((width, height), Image.Resampling.BILINEAR)
+        return Image.blend(blurred, Image.new('RGB', (width, height), OVERLAY_TINT), 0.45)
+
+OVERLAY_STYLES = {
+    'solid': SolidTintStyle,
+    'glass': GlassGrainStyle,
+    'mosaic': MosaicStyle,
+    'content': ContentBlurStyle,
+}
+# Bump when a style's rendering changes, so saved cost models are measured again
+STYLE_COST_VERSION = 1
+
+class StyleCostModel:
+    """Predicted render time per style and quality tier: fixed_ms + ms_per_mp * megapixels.
+
+    calibrate() measures each pair on synthetic frames at two sizes; the result is saved per
+    machine, so it runs once. observe() moves the per-megapixel term toward real render times,
+    so slow hardware or sustained load shifts later choices to cheaper styles.
+    """
+
+    def __init__(self, styles, path=None, sizes=((320, 240), (960, 720)), repeats=2, smoothing=0.2):
+        self.styles = styles  # name -> OverlayStyle
+        self.path = path  # None: priors and observations only, nothing read or written
+        self.sizes = sizes
+        self.repeats = repeats
+        self.smoothing = smoothing
+        self.coefficients = {}  # (style, tier) -> [fixed_ms, ms_per_mp]
+        self.calibrated_at = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def machine_key():
+        import platform
+        return (f"{platform.node()}|{platform.machine()}|{os.cpu_count()}|"
+                f"py{sys.version_info[0]}.{sys.version_info[1]}|v{STYLE_COST_VERSION}")
+
+    def predict(self, style_name, tier_name, pixels):
+        with self._lock:
+            fixed_ms, ms_per_mp = self.coefficients.get(
+                (style_name, tier_name), (0.0, self.styles[style_name].prior_ms_per_mp))
+        return fixed_ms + ms_per_mp * pixels / 1e6
+
+    def observe(self, style_name, tier_name, pixels, elapsed_ms):
+        if pixels <= 0:
+            return
+        with self._lock:
+            fixed_ms, ms_per_mp = self.coefficients.get(
+                (style_name, tier_name), (0.0, self.styles[style_name].prior_ms_per_mp))
+            observed = max(0.0, (elapsed_ms - fixed_ms) / (pixels / 1e6))
+            self.coefficients[(style_name, tier_name)] = [
+                fixed_ms, ms_per_mp + self.smoothing * (observed - ms_per_mp)]
+
+    def choose(self, size, tier, target_ms, content=True):
+        """Best-looking style predicted to render within target_ms, else the cheapest.
+
+        Without real window content only content-independent styles are considered.
+        Returns (style, predicted ms).
+        """
+        pixels = size[0] * size[1]
+        candidates = [style for style in self.styles.values() if content or not style.needs_content]
+        ranked = sorted(candidates, key=lambda style: style.quality, reverse=True)
+        predictions = {style.name: self.predict(style.name, tier['name'], pixels) for style in ranked}
+        for style in ranked:
+            if predictions[style.name] <= target_ms:
+                return style, predictions[style.name]
+        cheapest = min(ranked, key=lambda style: predictions[style.name])
+        return cheapest, predictions[cheapest.name]
+
+    def calibrate(self, radius_scale=1.0):
+        """Time every style at every tier (worker thread; takes about a second)"""
+        frames = []
+        for index, (width, height) in enumerate(self.sizes):
+            frame = synthetic_frame(width, height, index)
+            frames.append(Image.frombuffer('RGB', (width, height), frame, 'raw', 'BGRX', 0, 1))
+        coefficients = {}
+        for style in self.styles.values():
+            for tier in QUALITY_TIERS:
+                points = []
+                for image in frames:
+                    timings = []
+                    for _ in range(self.repeats):
+                        started = time.perf_counter()
+                        style.render(image, tier, radius_scale)
+                        timings.append((time.perf_counter() - started) * 1000)
+                    points.append((image.size[0] * image.size[1] / 1e6, min(timings)))
+                (mp_small, ms_small), (mp_large, ms_large) = points[0], points[-1]
+                ms_per_mp = max(0.0, (ms_large - ms_small) / (mp_large - mp_small)) if mp_large > mp_small else 0.0
+                coefficients[(style.name, tier['name'])] = [max(0.0, ms_small - ms_per_mp * mp_small), ms_per_mp]
+        with self._lock:
+            self.coefficients = coefficients
+            self.calibrated_at = time.time()
+        self.save()
+
+    def load(self):
+        """Read the saved model; False if missing, unreadable or from another machine/version"""
+        if not self.path:
+            return False
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get('machine') != self.machine_key():
+            return False
+        coefficients = {}
+        for key, value in (data.get('coefficients') or {}).items():
+            style_name, _, tier_name = key.partition('/')
+            if style_name in self.styles:
+                coefficients[(style_name, tier_name)] = [float(value[0]), float(value[1])]
+        with self._lock:
+            self.coefficients = coefficients
+            self.calibrated_at = data.get('calibrated_at')
+        return True
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            data = {'machine': self.machine_key(), 'calibrated_at': self.calibrated_at,
+                    'coefficients': {f"{style}/{tier}": [round(fixed, 3), round(per_mp, 3)]
+                                     for (style, tier), (fixed, per_mp) in self.coefficients.items()}}
+        try:
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            logger.error(f"Could not save style costs: {e}")
+
+    def summary(self, size=(1000, 700), tier_name='high'):
+        """Predicted ms per style at a typical window size"""
+        source = 'measured' if self.calibrated_at else 'estimated'
+        predictions = ', '.join(f"{name} {self.predict(name, tier_name, size[0] * size[1]):.0f}"
+                                for name in self.styles)
+        return f"Style costs ({source}, {size[0]}x{size[1]} {tier_name}, ms): {predictions}"
+
+class DwmApi:
+    """The compositor calls the native blur backend needs (user32/dwmapi through ctypes)"""
+
+    WCA_ACCENT_POLICY = 19
+    ACCENT_DISABLED = 0
+    ACCENT_ENABLE_BLURBEHIND = 3
+    ACCENT_ENABLE_ACRYLICBLURBEHIND = 4
+    ACCENT_FLAG_DRAW_ALL_BORDERS = 0x1E0
+
+    def windows_build(self):
+        try:
+            return sys.getwindowsversion().build
+        except AttributeError:
+            return 0
+
+    def composition_enabled(self):
+        try:
+            enabled = ctypes.c_int(0)
+            return ctypes.windll.dwmapi.DwmIsCompositionEnabled(ctypes.byref(enabled)) == 0 and bool(enabled.value)
+        except Exception:
+            return False
+
+    def transparency_enabled(self):
+        """The user's 'Transparency effects' setting (also turned off by battery saver)"""
+        try:
+            import winreg
+            with winreg.OpenKey(winreg.HKEY_CURRENT_USER,
+                                r"Software\Microsoft\Windows\CurrentVersion\Themes\Personalize") as key:
+                return bool(winreg.QueryValueEx(key, 'EnableTransparency')[0])
+        except OSError:
+            return True  # Not set: Windows default is on
+        except Exception:
+            return False
+
+    def has_accent_policy(self):
+        try:
+            return hasattr(ctypes.windll.user32, 'SetWindowCompositionAttribute')
+        except Exception:
+            return False
+
+    def set_accent(self, hwnd, accent_state, tint_abgr=0):
+        """Ask the compositor to draw accent_state behind the window; True on success"""
+        class ACCENT_POLICY(ctypes.Structure):
+            _fields_ = [('AccentState', ctypes.c_int), ('AccentFlags', ctypes.c_int),
+                        ('GradientColor', ctypes.c_uint), ('AnimationId', ctypes.c_int)]
+
+        class WINDOWCOMPOSITIONATTRIBDATA(ctypes.Structure):
+            _fields_ = [('Attribute', ctypes.c_int), ('Data', ctypes.c_void_p), ('SizeOfData', ctypes.c_size_t)]
+
+        accent = ACCENT_POLICY(accent_state, self.ACCENT_FLAG_DRAW_ALL_BORDERS, tint_abgr, 0)
+        data = WINDOWCOMPOSITIONATTRIBDATA(self.WCA_ACCENT_POLICY, ctypes.cast(ctypes.byref(accent), ctypes.c_void_p),
+                                           ctypes.sizeof(accent))
+        return bool(ctypes.windll.user32.SetWindowCompositionAttribute(wintypes.HWND(hwnd), ctypes.byref(data)))
+
+class StubDwmApi(DwmApi):
+    """In-memory compositor for tests: set build/flags to model a system, inspect accents"""
+
+    def __init__(self, build=22631, composition=True, transparency=True, accent_policy=True, accept=True):
+        self.build = build
+        self.composition = composition
+        self.transparency = transparency
+        self.accent_policy = accent_policy
+        self.accept = accept  # False simulates SetWindowCompositionAttribute failing
+        self.accents = {}  # hwnd -> (accent state, tint)
+
+    def windows_build(self):
+        return self.build
+
+    def composition_enabled(self):
+        return self.composition
+
+    def transparency_enabled(self):
+        return self.transparency
+
+    def has_accent_policy(self):
+        return self.accent_policy
+
+    def set_accent(self, hwnd, accent_state, tint_abgr=0):
+        if not self.accept:
+            return False
+        self.accents[hwnd] = (accent_state, tint_abgr)
+        return True
+
+class OverlayBackend(ABC):
+    """Interface for how the overlay window gets its look"""
+    name = 'base'
+    native = False  # True: the compositor draws it, no capture or Python pixel work
+
+    @abstractmethod
+    def availability(self):
+        """(usable, reason) for the system as it is right now"""
+
+    @abstractmethod
+    def apply(self, hwnd):
+        """Prepare a freshly created overlay top-level window; True on success"""
+
+class TextureOverlayBackend(OverlayBackend):
+    """Python-rendered texture (OVERLAY_STYLES) on a Tk canvas; works everywhere"""
+    name = 'texture'
+
+    def availability(self):
+        return True, 'always available'
+
+    def apply(self, hwnd):
+        return True  # The texture is drawn on the canvas
+
+class CompositorBlurOverlayBackend(OverlayBackend):
+    """Native blur-behind drawn by DWM through the window's accent policy.
+
+    Acrylic on Windows 11; plain blur-behind on Windows 10, where acrylic makes moving the
+    window lag. Unavailable without composition, with transparency effects off, or for
+    retry_after seconds after the compositor refused an apply (sooner if reset(), e.g. on a
+    display or system setting change).
+    """
+    name = 'compositor'
+    native = True
+
+    WINDOWS_10_BUILD = 10240
+    WINDOWS_11_BUILD = 22000
+
+    def __init__(self, dwm=None, tint=OVERLAY_TINT, tint_alpha=0x99, retry_after=300.0):
+        self.dwm = dwm or DwmApi()
+        r, g, b = tint
+        self.tint_abgr = (tint_alpha << 24) | (b << 16) | (g << 8) | r
+        self.retry_after = retry_after
+        self.failed = None  # Reason the last apply failed
+        self.failed_at = 0
+
+    def accent_state(self):
+        if self.dwm.windows_build() >= self.WINDOWS_11_BUILD:
+            return DwmApi.ACCENT_ENABLE_ACRYLICBLURBEHIND
+        return DwmApi.ACCENT_ENABLE_BLURBEHIND
+
+    def availability(self):
+        build = self.dwm.windows_build()
+        if build < self.WINDOWS_10_BUILD:
+            return False, f"needs Windows 10 or later (build {build})"
+        if not self.dwm.has_accent_policy():
+            return False, 'SetWindowCompositionAttribute missing'
+        if not self.dwm.composition_enabled():
+            return False, 'desktop composition off'
+        if not self.dwm.transparency_enabled():
+            return False, 'transparency effects off'
+        if self.failed:
+            wait = self.failed_at + self.retry_after - time.time()
+            if wait > 0:
+                return False, f"{self.failed} (retry in {wait:.0f}s)"
+            self.failed = None  # A refusal during a display change or setting toggle may not last
+        kind = 'acrylic' if self.accent_state() == DwmApi.ACCENT_ENABLE_ACRYLICBLURBEHIND else 'blur-behind'
+        return True, f"{kind} (build {build})"
+
+    def apply(self, hwnd):
+        try:
+            if self.dwm.set_accent(hwnd, self.accent_state(), self.tint_abgr):
+                return True
+            self.failed = 'compositor refused the accent policy'
+        except Exception as e:
+            self.failed = f"accent policy failed: {e}"
+        self.failed_at = time.time()
+        return False
+
+    def reset(self):
+        self.failed = None
+
+# In 'auto' preference order
+OVERLAY_BACKENDS = {
+    'compositor': CompositorBlurOverlayBackend,
+    'texture': TextureOverlayBackend,
+}
+
+def select_overlay_backend(preference, backends):
+    """First usable backend, trying `preference` ('auto' or a name) first.
+
+    Returns (backend, {name: reason}); the texture backend is always the last resort.
+    """
+    ordered = list(backends)
+    if preference != 'auto':
+        ordered.sort(key=lambda backend: backend.name != preference)
+    reasons = {}
+    for backend in ordered:
+        usable, reason = backend.availability()
+        reasons[backend.name] = reason
+        if usable:
+            return backend, reasons
+    return next(backend for backend in backends if not backend.native), reasons
+
+class DesktopGeometry:
+    """Snapshot of monitors, work areas, virtual-screen bounds and tracked window rects.
+
+    Consumers read the snapshot instead of calling Win32 per check. Monitors are refreshed on
+    display/work-area changes; window rects on move notifications. Without a move feed
+    (window_events_live False), rects older than window_ttl are re-read on access.
+    """
+
+    # GetSystemMetrics: SM_XVIRTUALSCREEN, SM_YVIRTUALSCREEN, SM_CXVIRTUALSCREEN, SM_CYVIRTUALSCREEN
+    SM_VIRTUAL_SCREEN = (76, 77, 78, 79)
+
+    def __init__(self, window_ttl=0.5):
+        self.window_ttl = window_ttl
+        self.monitors = []  # {'rect', 'work_area', 'primary'}
+        self.virtual_screen = None  # (left, top, right, bottom)
+        self.windows = {}  # hwnd -> (rect, read_at)
+        self.window_events_live = False
+        self.generation = 0  # Bumped on every change, so dependants can cache per generation
+        self.win32_calls = 0
+        self.listeners = []  # Called with no arguments after a monitor or window-rect change
+        self._lock = threading.Lock()
+
+    def refresh_monitors(self):
+        """Re-read monitor layout (display change / work area change)"""
+        monitors = []
+        try:
+            for hmonitor, _, _ in win32api.EnumDisplayMonitors(None, None):
+                info = win32api.GetMonitorInfo(hmonitor)
+                monitors.append({'rect': tuple(info['Monitor']), 'work_area': tuple(info['Work']),
+                                 'primary': bool(info['Flags'] & 1)})
+            x, y, cx, cy = (win32api.GetSystemMetrics(index) for index in self.SM_VIRTUAL_SCREEN)
+            virtual_screen = (x, y, x + cx, y + cy)
+            self.win32_calls += 2 + len(monitors)
+        except Exception as e:
+            logger.error(f"Error reading monitor layout: {e}")
+            width, height = win32api.GetSystemMetrics(0), win32api.GetSystemMetrics(1)
+            monitors = [{'rect': (0, 0, width, height), 'work_area': (0, 0, width, height), 'primary': True}]
+            virtual_screen = (0, 0, width, height)
+        with self._lock:
+            self.monitors = monitors
+            self.virtual_screen = virtual_screen
+            self.generation += 1
+        self._notify()
+
+    def window_rect(self, hwnd, now=None):
+        """Tracked rect of hwnd from the snapshot (read once, then on move notifications)"""
+        if not hwnd:
+            return None
+        if not self.monitors:
+            self.refresh_monitors()
+        entry = self.windows.get(hwnd)
+        if entry:
+            rect, read_at = entry
+            if self.window_events_live:
+                return rect
+            now = now if now is not None else time.time()
+            if now - read_at < self.window_ttl:
+                return rect
+        return self.on_window_moved(hwnd)
+
+    def on_window_moved(self, hwnd):
+        """Re-read one window's rect (location-change notification or stale entry)"""
+        try:
+            rect = tuple(win32gui.GetWindowRect(hwnd))
+            self.win32_calls += 1
+        except Exception:
+            self.forget(hwnd)
+            return None
+        with self._lock:
+            previous = self.windows.get(hwnd)
+            self.windows[hwnd] = (rect, time.time())
+            changed = not previous or previous[0] != rect
+            if changed:
+                self.generation += 1
+        if changed and previous:
+            self._notify()
+        return rect
+
+    def _notify(self):
+        for listener in list(self.listeners):
+            try:
+                listener()
+            except Exception as e:
+                logger.error(f"Geometry listener failed: {e}")
+
+    def record_window(self, hwnd, rect):
+        """Store a rect the caller already read (e.g. during window enumeration)"""
+        with self._lock:
+            previous = self.windows.get(hwnd)
+            self.windows[hwnd] = (tuple(rect), time.time())
+            if not previous or previous[0] != tuple(rect):
+                self.generation += 1
+
+    def forget(self, hwnd):
+        with self._lock:
+            if self.windows.pop(hwnd, None):
+                self.generation += 1
+
+    def invalidate(self):
+        """Drop all window rects (e.g. after the move feed stopped)"""
+        with self._lock:
+            self.windows.clear()
+            self.generation += 1
+
+    @staticmethod
+    def _intersection_area(a, b):
+        width = min(a[2], b[2]) - max(a[0], b[0])
+        height = min(a[3], b[3]) - max(a[1], b[1])
+        return width * height if width > 0 and height > 0 else 0
+
+    def visible_area(self, rect):
+        """Area of rect that lies on any monitor (monitors don't overlap)"""
+        if not self.monitors:
+            self.refresh_monitors()
+        return sum(self._intersection_area(rect, monitor['rect']) for monitor in self.monitors)
+
+    def monitor_for(self, rect):
+        """Monitor showing the largest part of rect, or None if it's off every monitor"""
+        if not self.monitors:
+            self.refresh_monitors()
+        best = max(self.monitors, key=lambda m: self._intersection_area(rect, m['rect']), default=None)
+        if best and self._intersection_area(rect, best['rect']):
+            return best
+        return None
+
+    def summary(self):
+        primary = next((m for m in self.monitors if m['primary']), None)
+        return (f"Monitors: {len(self.monitors)} (primary {primary['rect'] if primary else 'n/a'}), "
+                f"virtual screen {self.virtual_screen}\n"
+                f"Tracked windows: {len(self.windows)} "
+                f"({'move events' if self.window_events_live else 'TTL refresh'}), "
+                f"{self.win32_calls} Win32 geometry calls")
+
+VisibilityReport = collections.namedtuple('VisibilityReport', 'visible reason exposed_fraction rect')
+
+class VisibilityOracle:
+    """Decides whether a window can actually be seen: shown, not minimized, not cloaked, on the
+    current virtual desktop, on a monitor and not covered by the windows above it.
+
+    Answers are cached per event generation (DesktopGeometry.generation plus this oracle's own
+    counter, bumped on foreground/minimize/show/hide/cloak/move-end events), so nothing is re-read
+    between changes. Without an event feed (events_live False) answers expire after ttl.
+    """
+
+    DWMWA_EXTENDED_FRAME_BOUNDS = 9
+    DWMWA_CLOAKED = 14
+    GW_HWNDPREV = 3
+    CLSID_VIRTUAL_DESKTOP_MANAGER = '{AA509086-5CA9-4C25-8F95-589D3C07B48A}'
+    IID_IVIRTUAL_DESKTOP_MANAGER = '{A5CD92FF-29BE-454C-8D04-D82879FB3F1B}'
+
+    def __init__(self, geometry, min_exposed_fraction=0.05, ttl=0.5, max_occluders=64):
+        self.geometry = geometry
+        self.min_exposed_fraction = min_exposed_fraction
+        self.ttl = ttl
+        self.max_occluders = max_occluders  # Bound the z-order walk on busy desktops
+        self.generation = 0
+        self.events_live = False
+        self.own_pid = os.getpid()
+        self.hits = 0
+        self.misses = 0
+        self.last_report = None
+        self.target = None  # Window of the last check(); events that can't affect it don't notify
+        self.ignored_events = 0
+        self.listeners = []  # Called with no arguments after an invalidate() that can affect target
+        self._cache = {}  # (hwnd, require_foreground) -> (generation key, read_at, report)
+        self._local = threading.local()  # Per-thread COM virtual desktop manager
+
+    def invalidate(self, hwnd=None):
+        """A foreground, z-order, show/hide or cloak change happened (to hwnd, if known).
+
+        Cached answers are dropped either way; listeners only hear about changes to the
+        target window or a window above it, since nothing else can change what it shows.
+        """
+        self.generation += 1
+        if hwnd and not self.affects_target(hwnd):
+            self.ignored_events += 1
+            return
+        for listener in list(self.listeners):
+            try:
+                listener()
+            except Exception as e:
+                logger.error(f"Visibility listener failed: {e}")
+
+    def affects_target(self, hwnd):
+        """Whether hwnd is the target or above it in z-order (True when that can't be told)"""
+        target = self.target
+        if not target or hwnd == target:
+            return True
+        try:
+            if not win32gui.IsWindow(hwnd):
+                return True  # Destroyed: it may have been covering the target
+            above = win32gui.GetWindow(target, self.GW_HWNDPREV)
+            for _ in range(self.max_occluders):
+                if not above:
+                    return False
+                if above == hwnd:
+                    return True
+                above = win32gui.GetWindow(above, self.GW_HWNDPREV)
+        except Exception:
+            pass
+        return True
+
+    def _generation_key(self):
+        return (self.geometry.generation, self.generation)
+
+    def check(self, hwnd, require_foreground=False, now=None):
+        """Return a cached or fresh VisibilityReport for hwnd"""
+        key = (hwnd, require_foreground)
+        self.target = hwnd
+        generation = self._generation_key()
+        now = now if now is not None else time.time()
+        cached = self._cache.get(key)
+        if cached and cached[0] == generation and (self.events_live or now - cached[1] < self.ttl):
+            self.hits += 1
+            return cached[2]
+        self.misses += 1
+        report = self.last_report = self._evaluate(hwnd, require_foreground)
+        if len(self._cache) > 16:
+            self._cache.clear()
+        # Key on the generation after evaluating: reading the rect may itself bump it
+        self._cache[key] = (self._generation_key(), now, report)
+        return report
+
+    def _evaluate(self, hwnd, require_foreground):
+        try:
+            if not hwnd or not win32gui.IsWindow(hwnd) or not win32gui.IsWindowVisible(hwnd):
+                return VisibilityReport(False, 'hidden', 0.0, None)
+            if win32gui.IsIconic(hwnd):
+                return VisibilityReport(False, 'minimized', 0.0, None)
+            if self.is_cloaked(hwnd):
+                return VisibilityReport(False, 'cloaked', 0.0, None)
+            if self.is_on_current_desktop(hwnd) is False:
+                return VisibilityReport(False, 'other virtual desktop', 0.0, None)
+
+            rect = self.geometry.window_rect(hwnd)
+            if not rect or rect[2] - rect[0] < 100 or rect[3] - rect[1] < 100:
+                return VisibilityReport(False, 'too small', 0.0, rect)
+            if require_foreground and win32gui.GetForegroundWindow() != hwnd:
+                return VisibilityReport(False, 'not foreground', 0.0, rect)
+
+            fraction = self.exposed_fraction(hwnd, rect)
+            if fraction < self.min_exposed_fraction:
+                return VisibilityReport(False, 'occluded' if self.geometry.monitor_for(rect) else 'off screen',
+                                        fraction, rect)
+            return VisibilityReport(True, 'visible', fraction, rect)
+        except Exception as e:
+            return VisibilityReport(False, f'error: {e}', 0.0, None)
+
+    def _dwm_attribute(self, hwnd, attribute, value):
+        """DwmGetWindowAttribute into value; False if DWM isn't available"""
+        try:
+            result = ctypes.windll.dwmapi.DwmGetWindowAttribute(
+                wintypes.HWND(hwnd), attribute, ctypes.byref(value), ctypes.sizeof(value))
+            return result == 0
+        except Exception:
+            return False
+
+    def is_cloaked(self, hwnd):
+        """Cloaked by the shell (other virtual desktop), the app (UWP frames) or inherited"""
+        cloaked = wintypes.DWORD(0)
+        return self._dwm_attribute(hwnd, self.DWMWA_CLOAKED, cloaked) and cloaked.value != 0
+
+    def is_on_current_desktop(self, hwnd):
+        """IVirtualDesktopManager::IsWindowOnCurrentVirtualDesktop; None if unavailable"""
+        manager = getattr(self._local, 'desktop_manager', False)
+        if manager is False:
+            manager = self._local.desktop_manager = self._create_desktop_manager()
+        if not manager:
+            return None
+        try:
+            on_current = wintypes.BOOL(0)
+            manager['is_on_current'](manager['pointer'], hwnd, ctypes.byref(on_current))
+            return bool(on_current.value)
+        except Exception:
+            return None
+
+    def _create_desktop_manager(self):
+        try:
+            ole32 = ctypes.oledll.ole32
+            try:
+                ole32.CoInitializeEx(None, 0x2)  # COINIT_APARTMENTTHREADED
+            except OSError:
+                pass  # Already initialized in another mode
+            clsid = (ctypes.c_byte * 16)()
+            iid = (ctypes.c_byte * 16)()
+            ole32.CLSIDFromString(self.CLSID_VIRTUAL_DESKTOP_MANAGER, ctypes.byref(clsid))
+            ole32.CLSIDFromString(self.IID_IVIRTUAL_DESKTOP_MANAGER, ctypes.byref(iid))
+            pointer = ctypes.c_void_p()
+            ole32.CoCreateInstance(ctypes.byref(clsid), None, 0x1, ctypes.byref(iid),
+                                   ctypes.byref(pointer))  # CLSCTX_INPROC_SERVER
+            # vtable: QueryInterface, AddRef, Release, IsWindowOnCurrentVirtualDesktop, ...
+            vtable = ctypes.cast(ctypes.cast(pointer, ctypes.POINTER(ctypes.c_void_p))[0],
+                                 ctypes.POINTER(ctypes.c_void_p))
+            is_on_current = ctypes.WINFUNCTYPE(ctypes.HRESULT, ctypes.c_void_p, wintypes.HWND,
+                                               ctypes.POINTER(wintypes.BOOL))(vtable[3])
+            return {'pointer': pointer, 'is_on_current': is_on_current}
+        except Exception:
+            return None
+
+    def _frame_rect(self, hwnd):
+        """Visible frame bounds (GetWindowRect includes invisible resize borders)"""
+        bounds = wintypes.RECT()
+        if self._dwm_attribute(hwnd, self.DWMWA_EXTENDED_FRAME_BOUNDS, bounds):
+            return (bounds.left, bounds.top, bounds.right, bounds.bottom)
+        return tuple(win32gui.GetWindowRect(hwnd))
+
+    @staticmethod
+    def _subtract(rect, cut):
+        """rect minus cut as up to four non-overlapping rects"""
+        left, top, right, bottom = rect
+        c_left, c_top = max(left, cut[0]), max(top, cut[1])
+        c_right, c_bottom = min(right, cut[2]), min(bottom, cut[3])
+        if c_left >= c_right or c_top >= c_bottom:
+            return [rect]
+        pieces = [(left, top, right, c_top), (left, c_bottom, right, bottom),
+                  (left, c_top, c_left, c_bottom), (c_right, c_top, right, c_bottom)]
+        return [p for p in pieces if p[0] < p[2] and p[1] < p[3]]
+
+    def occluders(self, hwnd):
+        """Rects of visible top-level windows above hwnd in z-order (excluding our own overlays)"""
+        rects = []
+        above = win32gui.GetWindow(hwnd, self.GW_HWNDPREV)
+        while above and len(rects) < self.max_occluders:
+            try:
+                if (win32gui.IsWindowVisible(above) and not win32gui.IsIconic(above)
+                        and win32process.GetWindowThreadProcessId(above)[1] != self.own_pid
+                        and not self.is_cloaked(above)):
+                    rect = self._frame_rect(above)
+                    if rect[0] < rect[2] and rect[1] < rect[3]:
+                        rects.append(rect)
+            except Exception:
+                pass
+            above = win32gui.GetWindow(above, self.GW_HWNDPREV)
+        return rects
+
+    def exposed_fraction(self, hwnd, rect):
+        """Fraction of rect that is on a monitor and not covered by windows above hwnd"""
+        total = (rect[2] - rect[0]) * (rect[3] - rect[1])
+        if total <= 0:
+            return 0.0
+        if not self.geometry.monitors:
+            self.geometry.refresh_monitors()
+        exposed = []
+        for monitor in self.geometry.monitors:
+            m = monitor['rect']
+            clipped = (max(rect[0], m[0]), max(rect[1], m[1]), min(rect[2], m[2]), min(rect[3], m[3]))
+            if clipped[0] < clipped[2] and clipped[1] < clipped[3]:
+                exposed.append(clipped)
+        for cut in self.occluders(hwnd):
+            exposed = [piece for part in exposed for piece in self._subtract(part, cut)]
+            if not exposed:
+                break
+        area = sum((r[2] - r[0]) * (r[3] - r[1]) for r in exposed)
+        return area / total
+
+    def summary(self):
+        total = self.hits + self.misses
+        hit_rate = (self.hits / total * 100) if total else 0
+        last = self.last_report
+        last_text = f"{last.reason}, {last.exposed_fraction:.0%} exposed" if last else 'n/a'
+        return (f"Visibility: {last_text}\n"
+                f"Visibility cache: {self.hits} hits / {self.misses} misses ({hit_rate:.0f}%), "
+                f"{'event-driven' if self.events_live else 'TTL refresh'}, "
+                f"{self.ignored_events} unrelated window events ignored")
+
+class SuspensionController:
+    """Decides whether background loops run normally, slowed down, or not at all.
+
+    Only a locked/disconnected session or a switched-off display suspends them. A full-screen
+    app or low battery only slows them down, so WhatsApp next to a presentation stays covered,
+    and a full-screen WhatsApp doesn't slow anything. Event sources (Win32 session/power
+    notifications, battery and full-screen polling) call the on_* methods; tests can call them
+    directly to simulate the same events.
+    """
+
+    ACTIVE = 'active'
+    SLOW = 'slow'
+    SUSPENDED = 'suspended'
+
+    def __init__(self, low_battery_percent=20, slow_multiplier=3.0, battery_poll_interval=60.0):
+        self.low_battery_percent = low_battery_percent
+        self.slow_multiplier = slow_multiplier  # Interval multiplier in SLOW mode
+        self.battery_poll_interval = battery_poll_interval
+        self.session_locked = False
+        self.session_disconnected = False
+        self.display_off = False
+        self.fullscreen_app = False
+        self.on_battery = False
+        self.battery_percent = None
+        self.mode = self.ACTIVE
+        self.last_battery_poll = 0
+        self.listeners = []  # Called with (old_mode, new_mode)
+        self._resumed = threading.Event()
+        self._resumed.set()
+        self._lock = threading.Lock()
+
+    # --- Events -------------------------------------------------------------
+
+    def on_session_locked(self, locked):
+        self.session_locked = locked
+        self._update()
+
+    def on_session_connected(self, connected):
+        self.session_disconnected = not connected
+        self._update()
+
+    def on_display_state(self, on):
+        self.display_off = not on
+        self._update()
+
+    def on_fullscreen(self, fullscreen, foreground_is_whatsapp=False):
+        self.fullscreen_app = fullscreen and not foreground_is_whatsapp
+        self._update()
+
+    def on_power_status(self, on_battery, percent):
+        self.on_battery = on_battery
+        self.battery_percent = percent
+        self._update()
+
+    # --- Polled sources -----------------------------------------------------
+
+    def poll_battery(self, now):
+        """Refresh battery state through psutil (rate-limited)"""
+        if now - self.last_battery_poll < self.battery_poll_interval:
+            return
+        self.last_battery_poll = now
+        try:
+            battery = psutil.sensors_battery()
+        except Exception:
+            battery = None
+        if battery is None:
+            self.on_power_status(False, None)  # Desktop / no battery
+        else:
+            self.on_power_status(not battery.power_plugged, battery.percent)
+
+    def poll_fullscreen(self, foreground_is_whatsapp=False):
+        """Check whether a full-screen app or presentation other than WhatsApp is in front"""
+        try:
+            state = ctypes.c_int(0)
+            ctypes.windll.shell32.SHQueryUserNotificationState(ctypes.byref(state))
+            # QUNS_BUSY, QUNS_RUNNING_D3D_FULL_SCREEN, QUNS_PRESENTATION_MODE
+            self.on_fullscreen(state.value in (2, 3, 4), foreground_is_whatsapp)
+        except Exception:
+            pass
+
+    # --- State --------------------------------------------------------------
+
+    def _compute_mode(self):
+        if self.session_locked or self.session_disconnected or self.display_off:
+            return self.SUSPENDED
+        if self.fullscreen_app or (self.on_battery and self.battery_percent is not None and
+                                   self.battery_percent <= self.low_battery_percent):
+            return self.SLOW
+        return self.ACTIVE
+
+    def _update(self):
+        with self._lock:
+            old_mode, self.mode = self.mode, self._compute_mode()
+        if old_mode == self.mode:
+            return
+        if self.mode == self.SUSPENDED:
+            self._resumed.clear()
+        else:
+            self._resumed.set()
+        print(f"⏸️ Background work: {old_mode} → {self.mode} ({self.describe()})")
+        for listener in list(self.listeners):
+            try:
+                listener(old_mode, self.mode)
+            except Exception as e:
+                logger.error(f"Suspension listener failed: {e}")
+
+    @property
+    def is_suspended(self):
+        return self.mode == self.SUSPENDED
+
+    @property
+    def interval_multiplier(self):
+        return self.slow_multiplier if self.mode == self.SLOW else 1.0
+
+    def wait_for_resume(self, timeout=None):
+        """Block while suspended; returns True if no longer suspended"""
+        return self._resumed.wait(timeout)
+
+    def describe(self):
+        reasons = []
+        if self.session_locked:
+            reasons.append('session locked')
+        if self.session_disconnected:
+            reasons.append('session disconnected')
+        if self.display_off:
+            reasons.append('display off')
+        if self.fullscreen_app:
+            reasons.append('full-screen app')
+        if self.on_battery:
+            percent = f"{self.battery_percent:.0f}%" if self.battery_percent is not None else "?"
+            reasons.append(f'on battery ({percent})')
+        return ', '.join(reasons) or 'normal'
+
+class Win32SessionEventSource:
+    """Feeds session lock/connect and display power events into a SuspensionController,
+    display-layout / window-move events into a DesktopGeometry, and foreground / show / hide /
+    cloak events into a VisibilityOracle.
+
+    Runs a hidden window on its own thread, so nothing is polled.
+    """
+
+    WM_WTSSESSION_CHANGE = 0x02B1
+    WM_POWERBROADCAST = 0x0218
+    WTS_CONSOLE_CONNECT = 0x1
+    WTS_CONSOLE_DISCONNECT = 0x2
+    WTS_REMOTE_CONNECT = 0x3
+    WTS_REMOTE_DISCONNECT = 0x4
+    WTS_SESSION_LOCK = 0x7
+    WTS_SESSION_UNLOCK = 0x8
+    PBT_APMPOWERSTATUSCHANGE = 0x000A
+    PBT_POWERSETTINGCHANGE = 0x8013
+    GUID_CONSOLE_DISPLAY_STATE = '{6FE69556-704A-47A0-8F24-C28D936FDA47}'
+    WM_DISPLAYCHANGE = 0x007E
+    WM_SETTINGCHANGE = 0x001A
+    SPI_SETWORKAREA = 0x002F
+    WM_APP_WATCH_PROCESS = 0x8002  # WM_APP + 2: wparam = pid whose window moves to track
+    EVENT_OBJECT_LOCATIONCHANGE = 0x800B
+    EVENT_SYSTEM_MINIMIZESTART = 0x0016
+    EVENT_SYSTEM_MINIMIZEEND = 0x0017
+    WINEVENT_OUTOFCONTEXT = 0x0000
+    WINEVENT_SKIPOWNPROCESS = 0x0002
+    # Event ranges that change what's visible. Global LOCATIONCHANGE would fire on every cursor
+    # move, so other windows' moves are picked up at MOVESIZEEND instead.
+    VISIBILITY_EVENT_RANGES = (
+        (0x0003, 0x0003),  # EVENT_SYSTEM_FOREGROUND
+        (0x000B, 0x000B),  # EVENT_SYSTEM_MOVESIZEEND
+        (0x0016, 0x0017),  # EVENT_SYSTEM_MINIMIZESTART / MINIMIZEEND
+        (0x8002, 0x8003),  # EVENT_OBJECT_SHOW / HIDE
+        (0x8017, 0x8018),  # EVENT_OBJECT_CLOAKED / UNCLOAKED (includes virtual desktop switches)
+    )
+
+    def __init__(self, controller, geometry=None, oracle=None):
+        self.controller = controller
+        self.geometry = geometry
+        self.oracle = oracle
+        self.system_listeners = []  # Called on the event thread after display or system setting changes
+        self._visibility_hooks = []
+        self.hwnd = None
+        self.thread = None
+        self._power_notify = None
+        self._move_hook = None
+        self._watched_pid = None
+        self._move_proc = None  # Keep a reference to the ctypes callback while hooked
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name='session-events', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self.hwnd:
+            try:
+                win32gui.PostMessage(self.hwnd, win32con.WM_CLOSE, 0, 0)
+            except Exception:
+                pass
+
+    def watch_window_process(self, pid):
+        """Track location changes of windows owned by pid (e.g. WhatsApp)"""
+        if self.hwnd and pid and pid != self._watched_pid:
+            win32gui.PostMessage(self.hwnd, self.WM_APP_WATCH_PROCESS, pid, 0)
+
+    def _run(self):
+        try:
+            import win32ts
+
+            wc = win32gui.WNDCLASS()
+            wc.lpszClassName = 'WhatsAppBlurSessionEvents'
+            wc.lpfnWndProc = self._wnd_proc
+            wc.hInstance = win32api.GetModuleHandle(None)
+            win32gui.RegisterClass(wc)
+            # Hidden top-level window, never shown (message-only windows miss WM_DISPLAYCHANGE)
+            self.hwnd = win32gui.CreateWindow(wc.lpszClassName, 'WhatsApp Blur Session Events',
+                                              0, 0, 0, 0, 0, 0, 0, wc.hInstance, None)
+            win32ts.WTSRegisterSessionNotification(self.hwnd, win32ts.NOTIFY_FOR_THIS_SESSION)
+
+            self._register_display_notification()
+            if self.oracle:
+                self._hook_visibility_events()
+
+            win32gui.PumpMessages()
+        except Exception as e:
+            logger.error(f"Session event source failed: {e}")
+        finally:
+            try:
+                if self.hwnd:
+                    import win32ts
+                    win32ts.WTSUnRegisterSessionNotification(self.hwnd)
+                if self._power_notify:
+                    ctypes.windll.user32.UnregisterPowerSettingNotification(self._power_notify)
+                self._unhook_moves()
+                for hook in self._visibility_hooks:
+                    ctypes.windll.user32.UnhookWinEvent(hook)
+                self._visibility_hooks = []
+                if self.oracle:
+                    self.oracle.events_live = False
+            except Exception:
+                pass
+
+    def _set_win_event_hook(self, first, last, pid):
+        if self._move_proc is None:
+            win_event_proc = ctypes.WINFUNCTYPE(None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+                                                wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD)
+            self._move_proc = win_event_proc(self._on_win_event)
+        set_hook = ctypes.windll.user32.SetWinEventHook
+        set_hook.restype = wintypes.HANDLE
+        return set_hook(first, last, None, self._move_proc, pid, 0,
+                        self.WINEVENT_OUTOFCONTEXT | self.WINEVENT_SKIPOWNPROCESS)
+
+    def _hook_visibility_events(self):
+        """Install global hooks for events that change window visibility (runs on the event thread)"""
+        for first, last in self.VISIBILITY_EVENT_RANGES:
+            hook = self._set_win_event_hook(first, last, 0)
+            if hook:
+                self._visibility_hooks.append(hook)
+        self.oracle.events_live = len(self._visibility_hooks) == len(self.VISIBILITY_EVENT_RANGES)
+        self.oracle.invalidate()
+
+    def _hook_moves(self, pid):
+        """Install a location-change hook for pid's windows (runs on the event thread)"""
+        self._unhook_moves()
+        self._move_hook = self._set_win_event_hook(self.EVENT_OBJECT_LOCATIONCHANGE,
+                                                   self.EVENT_OBJECT_LOCATIONCHANGE, pid)
+        self._watched_pid = pid if self._move_hook else None
+        if self.geometry:
+            self.geometry.window_events_live = bool(self._move_hook)
+
+    def _unhook_moves(self):
+        if self._move_hook:
+            ctypes.windll.user32.UnhookWinEvent(self._move_hook)
+            self._move_hook = None
+            self._watched_pid = None
+            if self.geometry:
+                self.geometry.window_events_live = False
+                self.geometry.invalidate()
+
+    def _on_win_event(self, hook, event, hwnd, id_object, id_child, thread_id, timestamp):
+        note_wakeup()
+        # OBJID_WINDOW / CHILDID_SELF only: events about the window itself, not its parts
+        if id_object != 0 or id_child != 0 or not hwnd:
+            return
+        if event == self.EVENT_OBJECT_LOCATIONCHANGE:
+            if self.geometry and hwnd in self.geometry.windows:
+                self.geometry.on_window_moved(hwnd)
+        elif self.oracle:
+            # A minimized window drops to the bottom of the z-order, so where it is now says
+            # nothing about what it was covering
+            minimize = event in (self.EVENT_SYSTEM_MINIMIZESTART, self.EVENT_SYSTEM_MINIMIZEEND)
+            self.oracle.invalidate(None if minimize else hwnd)
+
+    def _register_display_notification(self):
+        """Subscribe to display on/off/dimmed notifications"""
+        guid = (ctypes.c_byte * 16)()
+        ctypes.oledll.ole32.CLSIDFromString(self.GUID_CONSOLE_DISPLAY_STATE, ctypes.byref(guid))
+        register = ctypes.windll.user32.RegisterPowerSettingNotification
+        register.restype = ctypes.c_void_p
+        register.argtypes = [ctypes.c_void_p, ctypes.c_void_p, wintypes.DWORD]
+        self._power_notify = register(self.hwnd, ctypes.byref(guid), 0)  # DEVICE_NOTIFY_WINDOW_HANDLE
+
+    def _wnd_proc(self, hwnd, msg, wparam, lparam):
+        note_wakeup()
+        if msg == self.WM_WTSSESSION_CHANGE:
+            if wparam == self.WTS_SESSION_LOCK:
+                self.controller.on_session_locked(True)
+            elif wparam == self.WTS_SESSION_UNLOCK:
+                self.controller.on_session_locked(False)
+            elif wparam in (self.WTS_CONSOLE_DISCONNECT, self.WTS_REMOTE_DISCONNECT):
+                self.controller.on_session_connected(False)
+            elif wparam in (self.WTS_CONSOLE_CONNECT, self.WTS_REMOTE_CONNECT):
+                self.controller.on_session_connected(True)
+            return 0
+        if msg == self.WM_POWERBROADCAST:
+            if wparam == self.PBT_APMPOWERSTATUSCHANGE:
+                # Re-read the battery on the next poll
+                self.controller.last_battery_poll = 0
+            elif wparam == self.PBT_POWERSETTINGCHANGE and lparam:
+                # POWERBROADCAST_SETTING: GUID (16) + DataLength (4) + Data; 0 = off, 1 = on, 2 = dimmed
+                state = ctypes.c_ulong.from_address(lparam + 20).value
+                self.controller.on_display_state(state != 0)
+            return 1
+        if msg in (self.WM_DISPLAYCHANGE, self.WM_SETTINGCHANGE):
+            if self.geometry and (msg == self.WM_DISPLAYCHANGE or wparam == self.SPI_SETWORKAREA):
+                self.geometry.refresh_monitors()
+            # Transparency effects, battery saver and display changes all arrive here
+            for listener in list(self.system_listeners):
+                try:
+                    listener()
+                except Exception as e:
+                    logger.error(f"System change listener failed: {e}")
+            return 0
+        if msg == self.WM_APP_WATCH_PROCESS:
+            self._hook_moves(wparam)
+            return 0
+        if msg == win32con.WM_CLOSE:
+            win32gui.DestroyWindow(hwnd)
+            return 0
+        if msg == win32con.WM_DESTROY:
+            win32gui.PostQuitMessage(0)
+            return 0
+        return win32gui.DefWindowProc(hwnd, msg, wparam, lparam)
+
+class BlurRequestArbiter:
+    """Latest-wins arbitration of blur on/off requests.
+
+    Requests only record the desired state, so bursts merge into one. The UI loop asks
+    next_action() what to do; shows are rate-limited (they capture and render), hides never are.
+    A request that arrives while another is in flight is applied once that one completes.
+    """
+
+    def __init__(self, min_render_interval=0.5):
+        self.min_render_interval = min_render_interval
+        self.desired = None  # True = blurred, False = not blurred, None = nothing pending
+        self.sequence = 0
+        self.in_flight = None  # (kind, token) being applied
+        self.last_render_start = 0
+        self.merged = 0  # Requests that replaced a still-pending one
+        self._lock = threading.Lock()
+
+    def request(self, blurred):
+        with self._lock:
+            self._set_desired(blurred)
+
+    def toggle(self, is_blurred):
+        """Flip the state the user will end up with (pending request included)"""
+        with self._lock:
+            current = self.desired if self.desired is not None else is_blurred
+            if self.in_flight and self.desired is None:
+                current = self.in_flight[0] == 'show'
+            self._set_desired(not current)
+            return self.desired
+
+    def _set_desired(self, blurred):
+        if self.desired is not None:
+            self.merged += 1
+        self.desired = blurred
+        self.sequence += 1
+
+    def next_action(self, is_blurred, now):
+        """Return ('show' | 'hide', token) to start now, or None"""
+        with self._lock:
+            if self.desired is None:
+                return None
+            if self.in_flight:
+                # Hiding is cheap and supersedes an in-flight show; everything else waits
+                if self.in_flight[0] == 'show' and self.desired is False:
+                    self.in_flight = ('hide', self.sequence)
+                    return self.in_flight
+                return None
+            if self.desired == is_blurred:
+                self.desired = None
+                return None
+            if self.desired and now - self.last_render_start < self.min_render_interval:
+                return None  # Rate-limit the render stage, keep the request
+
+            kind = 'show' if self.desired else 'hide'
+            if self.desired:
+                self.last_render_start = now
+            self.in_flight = (kind, self.sequence)
+            return self.in_flight
+
+    def complete(self, token):
+        """Mark the action started with `token` as finished (successfully or not)"""
+        with self._lock:
+            if not self.in_flight or self.in_flight[1] != token:
+                return  # Superseded
+            self.in_flight = None
+            if self.sequence == token:
+                self.desired = None  # Nothing newer arrived meanwhile
+
+    @property
+    def busy(self):
+        return self.in_flight is not None
+
+class GcPolicy:
+    """Garbage-collector policy: frozen startup heap, tuned thresholds, measured pauses.
+
+    Interactive paths never collect; collect() is for idle-time tasks and memory pressure.
+    """
+
+    def __init__(self, thresholds=(10000, 20, 50), history=50):
+        # Higher gen-0 threshold: Tk/PIL/NumPy churn creates many short-lived containers
+        self.thresholds = thresholds
+        self.pauses = collections.deque(maxlen=history)  # (generation, ms, collected)
+        self.total_pause_ms = 0.0
+        self.collections = 0
+        self.frozen = 0
+        self._started = None
+
+    def install(self):
+        gc.set_threshold(*self.thresholds)
+        if self._on_gc not in gc.callbacks:
+            gc.callbacks.append(self._on_gc)
+
+    def uninstall(self):
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+
+    def freeze_startup_objects(self):
+        """Move everything allocated during startup out of future collections (once)"""
+        gc.collect()
+        gc.freeze()
+        self.frozen = gc.get_freeze_count()
+        print(f"🧊 Froze {self.frozen} startup objects out of GC")
+
+    def _on_gc(self, phase, info):
+        if phase == 'start':
+            self._started = time.perf_counter()
+        elif phase == 'stop' and self._started is not None:
+            pause_ms = (time.perf_counter() - self._started) * 1000
+            self._started = None
+            self.pauses.append((info.get('generation'), pause_ms, info.get('collected', 0)))
+            self.total_pause_ms += pause_ms
+            self.collections += 1
 
-# Set up QUIET logging (only errors)
-logging.basicConfig(level=logging.ERROR, format='%(asctime)s - %(levelname)s - %(message)s')
-logger = logging.getLogger(__name__)
+    def collect(self, generation=2, reason=''):
+        """Explicit collection for idle or memory-pressure paths only"""
+        collected = gc.collect(generation)
+        if self.pauses:
+            _, pause_ms, _ = self.pauses[-1]
+            # Runs on every overlay teardown: too frequent for the console
+            logger.debug(f"GC gen {generation} ({reason}): {collected} objects in {pause_ms:.1f} ms")
+        return collected
 
-def create_rounded_rectangle_mask(width, height, radius):
-    """Create a rounded rectangle mask for applying rounded corners"""
-    mask = Image.new('L', (width, height), 0)
-    draw = ImageDraw.Draw(mask)
-    
-    # Draw rounded rectangle
-    draw.rounded_rectangle([(0, 0), (width-1, height-1)], radius=radius, fill=255)
-    
-    return mask
+    def summary(self):
+        if not self.pauses:
+            return f"GC: no pauses recorded ({self.frozen} objects frozen)"
+        max_ms = max(ms for _, ms, _ in self.pauses)
+        return (f"GC: {self.collections} pauses, {self.total_pause_ms:.0f} ms total, "
+                f"max {max_ms:.1f} ms (last {len(self.pauses)}), {self.frozen} objects frozen")
 
-def apply_rounded_corners_to_image(image, radius):
-    """Apply rounded corners to an image using PIL"""
-    if image.mode != 'RGBA':
-        image = image.convert('RGBA')
-    
-    width, height = image.size
-    mask = create_rounded_rectangle_mask(width, height, radius)
-    
-    # Create output image
-    output = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-    output.paste(image, (0, 0))
-    output.putalpha(mask)
-    
-    return output
+class MemoryManager:
+    """Samples memory into a ring buffer and evicts caches only when limits are crossed.
+
+    Evictors run in priority order (cheapest to rebuild first) above the soft limit,
+    one per check; above the hard limit every evictor runs, followed by hard_cleanup.
+    A full cleanup that leaves memory over the hard limit isn't repeated at once: the
+    next one waits, doubling up to max_hard_backoff while cleanups keep not helping.
+    """
+
+    def __init__(self, soft_limit_mb=150.0, hard_limit_mb=250.0, sample_interval=30.0, history=120,
+                 max_hard_backoff=1800.0):
+        self.soft_limit_mb = soft_limit_mb
+        self.hard_limit_mb = hard_limit_mb
+        self.sample_interval = sample_interval
+        self.max_hard_backoff = max_hard_backoff
+        self.hard_backoff = 0.0  # Wait after the last ineffective full cleanup
+        self.next_hard_cleanup = 0
+        self.samples = collections.deque(maxlen=history)  # (timestamp, rss_mb, heap_blocks)
+        self.evictors = []  # (priority, name, callable)
+        self.hard_cleanup = None  # Called after all evictors at the hard limit
+        self.evictions = collections.Counter()
+        self.last_sample = 0
+        self._next_evictor = 0
+        self._process = psutil.Process()
+
+    def add_evictor(self, priority, name, evict):
+        self.evictors.append((priority, name, evict))
+        self.evictors.sort(key=lambda entry: entry[0])
+
+    def sample(self, now):
+        rss_mb = self._process.memory_info().rss / 1024 / 1024
+        self.samples.append((now, rss_mb, sys.getallocatedblocks()))
+        self.last_sample = now
+        return rss_mb
+
+    def is_due(self, now):
+        return now - self.last_sample >= self.sample_interval
+
+    def check(self, now):
+        """Sample memory and evict if needed; returns 'ok', 'soft' or 'hard'"""
+        rss_mb = self.sample(now)
+        if rss_mb >= self.hard_limit_mb:
+            if now < self.next_hard_cleanup:
+                return 'hard'  # The last full cleanup didn't help; wait before the next one
+            print(f"🚨 Memory {rss_mb:.1f} MB over hard limit {self.hard_limit_mb:.0f} MB - full cleanup")
+            for _, name, evict in self.evictors:
+                self._evict(name, evict)
+            if self.hard_cleanup:
+                self.hard_cleanup()
+            self._next_evictor = 0
+            if self.sample(now) >= self.hard_limit_mb:
+                if not self.hard_backoff:
+                    print("⚠️ Full cleanup left memory over the hard limit - backing off further cleanups")
+                self.hard_backoff = min(max(self.hard_backoff * 2, self.sample_interval), self.max_hard_backoff)
+                self.next_hard_cleanup = now + self.hard_backoff
+            else:
+                self.hard_backoff = 0.0
+            return 'hard'
+        self.hard_backoff = 0.0
+        self.next_hard_cleanup = 0
+        if rss_mb >= self.soft_limit_mb:
+            # One more evictor per check until back under the soft limit
+            if self._next_evictor < len(self.evictors):
+                _, name, evict = self.evictors[self._next_evictor]
+                logger.debug(f"Memory {rss_mb:.1f} MB over soft limit {self.soft_limit_mb:.0f} MB - evicting {name}")
+                self._evict(name, evict)
+                self._next_evictor += 1
+            return 'soft'
+        self._next_evictor = 0
+        return 'ok'
+
+    def _evict(self, name, evict):
+        try:
+            evict()
+            self.evictions[name] += 1
+        except Exception as e:
+            logger.error(f"Evicting {name} failed: {e}")
+
+    def trend_mb_per_hour(self):
+        """Least-squares RSS slope over the ring buffer"""
+        if len(self.samples) < 2:
+            return None
+        times = [t for t, _, _ in self.samples]
+        values = [rss for _, rss, _ in self.samples]
+        mean_t = sum(times) / len(times)
+        mean_v = sum(values) / len(values)
+        var_t = sum((t - mean_t) ** 2 for t in times)
+        if not var_t:
+            return None
+        slope = sum((t - mean_t) * (v - mean_v) for t, v in zip(times, values)) / var_t
+        return slope * 3600
+
+    def summary(self):
+        if not self.samples:
+            return "Memory: not sampled yet"
+        _, rss_mb, blocks = self.samples[-1]
+        trend = self.trend_mb_per_hour()
+        trend_text = f"{trend:+.1f} MB/h" if trend is not None else "n/a"
+        low = min(rss for _, rss, _ in self.samples)
+        high = max(rss for _, rss, _ in self.samples)
+        evictions = ', '.join(f"{name} x{count}" for name, count in self.evictions.items()) or 'none'
+        return (f"Memory: RSS {rss_mb:.1f} MB (soft {self.soft_limit_mb:.0f} / hard {self.hard_limit_mb:.0f}), "
+                f"{blocks:,} heap blocks\n"
+                f"Trend: {trend_text} over {len(self.samples)} samples (range {low:.1f}-{high:.1f} MB)\n"
+                f"Evictions: {evictions}")
+
+class NotifyingQueue(queue.Queue):
+    """queue.Queue that calls on_put after every put, so the consumer can sleep until work arrives"""
+
+    def __init__(self, on_put=None):
+        super().__init__()
+        self.on_put = on_put
+
+    def put(self, item, block=True, timeout=None):
+        super().put(item, block, timeout)
+        if self.on_put:
+            self.on_put()
+
+class TkScheduler:
+    """Owns every periodic and delayed task of the app, on the Tk thread.
+
+    Tasks are named and kept in one deadline-ordered heap; a single root.after() is armed for
+    the earliest deadline, so with nothing due the Tk thread sleeps in its message wait. A task
+    returns the seconds until its next run, or None to stop. Other threads hand work over with
+    call_soon_threadsafe(); bursts coalesce into one wakeup.
+    """
+
+    def __init__(self, root, window=60.0):
+        self.root = root
+        self.window = window  # Seconds covered by wakeups_per_second()
+        self.wakeups = 0
+        self.runs = collections.Counter()
+        self._heap = []  # (deadline, seq, name)
+        self._tasks = {}  # name -> (deadline, seq, callback)
+        self._seq = 0
+        self._incoming = collections.deque()  # (name, delay, callback, keep_sooner) from other threads
+        self._wake_pending = False
+        self._after_id = None
+        self._armed_deadline = None
+        self._wakeup_times = collections.deque()
+        self._closed = False
+
+    def schedule(self, name, delay, callback):
+        """Run callback after delay seconds, replacing any pending task with the same name (Tk thread)"""
+        self._seq += 1
+        deadline = time.perf_counter() + max(0.0, delay)
+        self._tasks[name] = (deadline, self._seq, callback)
+        heapq.heappush(self._heap, (deadline, self._seq, name))
+        self._arm()
+
+    def cancel(self, name):
+        # The heap entry goes stale and is skipped when popped
+        if self._tasks.pop(name, None):
+            self._arm()
+
+    def schedule_by(self, name, delay, callback):
+        """Like schedule, but a pending task with the same name that's due sooner is kept (Tk thread)"""
+        pending = self._tasks.get(name)
+        if pending and pending[0] <= time.perf_counter() + delay:
+            return
+        self.schedule(name, delay, callback)
+
+    def is_scheduled(self, name):
+        return name in self._tasks
+
+    def call_soon_threadsafe(self, name, callback, delay=0.0, keep_sooner=False):
+        """Schedule from any thread; wakes the Tk thread once per burst.
+
+        keep_sooner: use schedule_by, so a burst of calls collapses into the first deadline.
+        """
+        self._incoming.append((name, delay, callback, keep_sooner))
+        if self._wake_pending or self._closed:
+            return
+        self._wake_pending = True
+        try:
+            # Threaded Tcl marshals this onto the Tk thread
+            self.root.after(0, self._on_wake)
+        except Exception:
+            # Main loop not running yet: the next timer (or run_due) drains the queue
+            self._wake_pending = False
+
+    def _drain_incoming(self):
+        self._wake_pending = False
+        while self._incoming:
+            name, delay, callback, keep_sooner = self._incoming.popleft()
+            if keep_sooner:
+                self.schedule_by(name, delay, callback)
+            else:
+                self.schedule(name, delay, callback)
+
+    def _record_wakeup(self, now):
+        note_wakeup()
+        self.wakeups += 1
+        self._wakeup_times.append(now)
+        while self._wakeup_times and now - self._wakeup_times[0] > self.window:
+            self._wakeup_times.popleft()
+
+    def _on_wake(self):
+        self._record_wakeup(time.perf_counter())
+        self.run_due()
+
+    def _on_timer(self):
+        self._after_id = None
+        self._armed_deadline = None
+        self._record_wakeup(time.perf_counter())
+        self.run_due()
+
+    def run_due(self):
+        """Run every task whose deadline has passed, then re-arm for the next one"""
+        self._drain_incoming()
+        now = time.perf_counter()
+        while self._heap and not self._closed:
+            deadline, seq, name = self._heap[0]
+            task = self._tasks.get(name)
+            if not task or task[1] != seq:
+                heapq.heappop(self._heap)  # Cancelled or rescheduled
+                continue
+            if deadline > now:
+                break
+            heapq.heappop(self._heap)
+            del self._tasks[name]
+            self.runs[name] += 1
+            try:
+                next_delay = task[2]()
+            except Exception as e:
+                logger.error(f"Scheduled task '{name}' failed: {e}")
+                next_delay = None
+            if next_delay is not None and name not in self._tasks:
+                self.schedule(name, next_delay, task[2])
+        self._arm()
+
+    def next_deadline(self):
+        while self._heap:
+            deadline, seq, name = self._heap[0]
+            task = self._tasks.get(name)
+            if task and task[1] == seq:
+                return deadline
+            heapq.heappop(self._heap)
+        return None
+
+    def _arm(self):
+        if self._closed:
+            return
+        deadline = self.next_deadline()
+        if deadline == self._armed_deadline:
+            return
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        self._armed_deadline = deadline
+        if deadline is not None:
+            delay_ms = max(0, int((deadline - time.perf_counter()) * 1000 + 0.5))
+            self._after_id = self.root.after(delay_ms, self._on_timer)
+
+    def wakeups_per_second(self):
+        now = time.perf_counter()
+        recent = sum(1 for stamp in self._wakeup_times if now - stamp <= self.window)
+        return recent / self.window
+
+    def shutdown(self):
+        self._closed = True
+        self._tasks.clear()
+        self._heap.clear()
+        self._incoming.clear()
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def summary(self):
+        pending = ', '.join(sorted(self._tasks)) or 'none'
+        return (f"Scheduler: {self.wakeups_per_second():.2f} wakeups/s (last {self.window:.0f}s), "
+                f"{self.wakeups} total; pending: {pending}")
+
+class ThreadCpuProfiler:
+    """Attributes CPU time and wakeups to the app's named threads over a sliding window.
+
+    Per-thread CPU comes from psutil.Process().threads(), matched to Python threads by native id;
+    wakeups from thread_wakeups. Samples are taken by the monitor pass (no extra wakeups) and
+    whenever a report is built.
+    """
+
+    SUBSYSTEMS = (('MainThread', 'Tk UI + scheduler'), ('render', 'Capture / render'),
+                  ('session-events', 'Session & window events'), ('hotkey', 'Hotkey'),
+                  ('tray', 'Tray icon'), ('config-watch', 'Settings watcher'),
+                  ('ipc', 'Control channel'))
+    NATIVE = 'native (Tcl, pystray, keyboard hook)'
+
+    def __init__(self, window=300.0, sample_interval=5.0):
+        self.window = window
+        self.sample_interval = sample_interval
+        self.samples = collections.deque()  # (timestamp, {tid: (name, cpu_seconds)}, wakeups, task_runs)
+        self.last_sample = 0
+        self._process = psutil.Process()
+
+    def is_due(self, now):
+        return now - self.last_sample >= self.sample_interval
+
+    @classmethod
+    def subsystem(cls, thread_name):
+        for prefix, subsystem in cls.SUBSYSTEMS:
+            if thread_name.startswith(prefix):
+                return subsystem
+        return cls.NATIVE if thread_name == cls.NATIVE else 'Other Python threads'
+
+    def sample(self, now, task_runs=None):
+        names = {thread.native_id: thread.name for thread in threading.enumerate()
+                 if getattr(thread, 'native_id', None)}
+        threads = {}
+        try:
+            for thread in self._process.threads():
+                threads[thread.id] = (names.get(thread.id, self.NATIVE), thread.user_time + thread.system_time)
+        except Exception as e:
+            logger.error(f"Thread CPU sample failed: {e}")
+            return
+        self.samples.append((now, threads, dict(thread_wakeups), dict(task_runs or {})))
+        self.last_sample = now
+        while len(self.samples) > 2 and now - self.samples[1][0] >= self.window:
+            self.samples.popleft()
+
+    def report(self, now, task_runs=None):
+        """CPU and wakeups per thread and subsystem between the oldest sample in the window and now"""
+        self.sample(now, task_runs)
+        if len(self.samples) < 2:
+            return {'window_seconds': 0, 'threads': [], 'subsystems': {}, 'scheduler_tasks': {}}
+        start_time, start_threads, start_wakeups, start_runs = self.samples[0]
+        end_time, end_threads, end_wakeups, end_runs = self.samples[-1]
+        span = max(end_time - start_time, 1e-6)
+
+        per_thread = {}
+        for tid, (name, cpu) in end_threads.items():
+            # Threads started inside the window count from zero; threads that exited are gone
+            delta = cpu - start_threads[tid][1] if tid in start_threads else cpu
+            entry = per_thread.setdefault(name, {'name': name, 'subsystem': self.subsystem(name),
+                                                 'os_threads': 0, 'cpu_seconds': 0.0})
+            entry['os_threads'] += 1
+            entry['cpu_seconds'] += max(0.0, delta)
+        for name in end_wakeups:
+            per_thread.setdefault(name, {'name': name, 'subsystem': self.subsystem(name),
+                                         'os_threads': 0, 'cpu_seconds': 0.0})
+
+        subsystems = {}
+        for entry in per_thread.values():
+            entry['cpu_seconds'] = round(entry['cpu_seconds'], 3)
+            entry['cpu_percent'] = round(entry['cpu_seconds'] / span * 100, 2)
+            entry['wakeups'] = end_wakeups.get(entry['name'], 0) - start_wakeups.get(entry['name'], 0)
+            entry['wakeups_per_second'] = round(entry['wakeups'] / span, 3)
+            total = subsystems.setdefault(entry['subsystem'], {'cpu_seconds': 0.0, 'wakeups': 0})
+            total['cpu_seconds'] = round(total['cpu_seconds'] + entry['cpu_seconds'], 3)
+            total['wakeups'] += entry['wakeups']
+        for total in subsystems.values():
+            total['cpu_percent'] = round(total['cpu_seconds'] / span * 100, 2)
+            total['wakeups_per_second'] = round(total['wakeups'] / span, 3)
+
+        return {
+            'window_seconds': round(span, 1),
+            'threads': sorted(per_thread.values(), key=lambda e: e['cpu_seconds'], reverse=True),
+            'subsystems': dict(sorted(subsystems.items(), key=lambda item: item[1]['cpu_seconds'], reverse=True)),
+            'scheduler_tasks': {task: runs - start_runs.get(task, 0) for task, runs in end_runs.items()
+                                if runs - start_runs.get(task, 0)},
+        }
+
+    @staticmethod
+    def format_report(report):
+        lines = [f"Window: last {report['window_seconds']:.0f}s (CPU % of one core)", "", "By subsystem:"]
+        for subsystem, total in report['subsystems'].items():
+            lines.append(f"  {subsystem:<30} {total['cpu_percent']:6.2f}%  {total['wakeups_per_second']:7.2f} wakeups/s")
+        lines += ["", "By thread:"]
+        for entry in report['threads']:
+            lines.append(f"  {entry['name']:<30} {entry['cpu_percent']:6.2f}%  {entry['wakeups']:6d} wakeups"
+                         f"  ({entry['os_threads']} OS thread{'s' if entry['os_threads'] != 1 else ''})")
+        if report['scheduler_tasks']:
+            lines += ["", "Scheduler task runs (Tk thread):"]
+            lines += [f"  {task:<30} {runs}" for task, runs in sorted(report['scheduler_tasks'].items())]
+        return "\n".join(lines)
+
+class ProfilerHooks:
+    """On-demand cProfile / tracemalloc captures for a bounded duration.
+
+    Nothing is imported or hooked until a capture starts. The CPU profile covers the Tk thread
+    (scheduler tasks, UI) plus render jobs submitted while it runs (wrap()); profiles are merged
+    and written as a timestamped .prof file. The memory trace writes a tracemalloc snapshot and
+    reports growth since the capture started.
+    """
+
+    def __init__(self, output_dir=None, top_n=25, trace_frames=10):
+        self.output_dir = output_dir  # Defaults to app_data_dir()
+        self.top_n = top_n
+        self.trace_frames = trace_frames
+        self.kind = None  # 'cpu', 'memory' or None
+        self.started_at = None
+        self._profile = None
+        self._worker_profiles = []
+        self._baseline = None
+        self._lock = threading.Lock()
+
+    @property
+    def active(self):
+        return self.kind is not None
+
+    def _path(self, prefix, extension):
+        directory = self.output_dir or app_data_dir()
+        return os.path.join(directory, time.strftime(f'{prefix}_%Y%m%d_%H%M%S{extension}'))
+
+    def start(self, kind):
+        """Start a 'cpu' or 'memory' capture on the calling thread (the Tk thread)"""
+        if self.active:
+            return False
+        if kind == 'cpu':
+            import cProfile
+            self._worker_profiles = []
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        elif kind == 'memory':
+            import tracemalloc
+            tracemalloc.start(self.trace_frames)
+            self._baseline = tracemalloc.take_snapshot()
+        else:
+            raise ValueError(f"Unknown profiler kind: {kind}")
+        self.kind = kind
+        self.started_at = time.time()
+        print(f"🔬 {kind.upper()} capture started")
+        return True
+
+    def wrap(self, function):
+        """function itself while inactive; while a CPU capture runs, a version profiled on its own thread"""
+        if self.kind != 'cpu':
+            return function
+        import cProfile
+
+        def profiled(*args, **kwargs):
+            profile = cProfile.Profile()
+            try:
+                return profile.runcall(function, *args, **kwargs)
+            finally:
+                with self._lock:
+                    self._worker_profiles.append(profile)
+        return profiled
+
+    def stop(self):
+        """Finish the capture; returns (path, summary text) or None if nothing was running"""
+        kind, self.kind = self.kind, None
+        if kind == 'cpu':
+            return self._stop_cpu()
+        if kind == 'memory':
+            return self._stop_memory()
+        return None
+
+    def _stop_cpu(self):
+        import io
+        import pstats
+        self._profile.disable()
+        stream = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=stream)
+        with self._lock:
+            for profile in self._worker_profiles:
+                stats.add(profile)
+            self._worker_profiles = []
+        self._profile = None
+        path = self._path('profile', '.prof')
+        stats.dump_stats(path)
+        stats.sort_stats('cumulative').print_stats(self.top_n)
+        duration = time.time() - self.started_at
+        return path, f"CPU profile, {duration:.0f}s, top {self.top_n} by cumulative time\n{stream.getvalue()}"
+
+    def _stop_memory(self):
+        import tracemalloc
+        own_frames = (tracemalloc.Filter(False, tracemalloc.__file__),)
+        snapshot = tracemalloc.take_snapshot().filter_traces(own_frames)
+        baseline, self._baseline = self._baseline.filter_traces(own_frames), None
+        tracemalloc.stop()
+        path = self._path('memory', '.snapshot')
+        snapshot.dump(path)
+        duration = time.time() - self.started_at
+        lines = [f"Memory trace, {duration:.0f}s, top {self.top_n} by growth since start", ""]
+        lines += [str(stat) for stat in snapshot.compare_to(baseline, 'lineno')[:self.top_n]]
+        lines += ["", f"Top {self.top_n} by current size:", ""]
+        lines += [str(stat) for stat in snapshot.statistics('lineno')[:self.top_n]]
+        return path, "\n".join(lines)
+
+# Named tuning profiles; the settings file can override any value or add profiles
+PERFORMANCE_PROFILES = {
+    'low-latency': {
+        'monitor_interval': 0.5, 'monitor_idle_interval': 10.0, 'monitor_debounce_delay': 0.2,
+        'window_cache_ttl': 2.0, 'min_render_interval': 0.2, 'hover_poll_interval': 0.05,
+        'ui_queue_busy_interval': 0.02, 'ui_queue_retry_interval': 0.05,
+        'memory_sample_interval': 30.0, 'memory_soft_limit_mb': 150.0, 'memory_hard_limit_mb': 250.0,
+        'blur_radius': 1.5, 'render_budget_ms': 200.0,
+    },
+    'balanced': {
+        'monitor_interval': 1.5, 'monitor_idle_interval': 30.0, 'monitor_debounce_delay': 0.5,
+        'window_cache_ttl': 8.0, 'min_render_interval': 0.5, 'hover_poll_interval': 0.1,
+        'ui_queue_busy_interval': 0.05, 'ui_queue_retry_interval': 0.1,
+        'memory_sample_interval': 30.0, 'memory_soft_limit_mb': 150.0, 'memory_hard_limit_mb': 250.0,
+        'blur_radius': 1.5, 'render_budget_ms': 120.0,
+    },
+    'battery-saver': {
+        'monitor_interval': 3.0, 'monitor_idle_interval': 60.0, 'monitor_debounce_delay': 1.0,
+        'window_cache_ttl': 15.0, 'min_render_interval': 1.0, 'hover_poll_interval': 0.2,
+        'ui_queue_busy_interval': 0.1, 'ui_queue_retry_interval': 0.25,
+        'memory_sample_interval': 60.0, 'memory_soft_limit_mb': 120.0, 'memory_hard_limit_mb': 200.0,
+        'blur_radius': 1.0, 'render_budget_ms': 60.0,
+    },
+}
+DEFAULT_PERFORMANCE_PROFILE = 'balanced'
+
+class PerformanceConfig:
+    """Named performance profiles from a JSON settings file, reloadable at runtime.
+
+    File layout: {"profile": "<name>", "overlay_style": "auto" | "<style>",
+    "overlay_backend": "auto" | "<backend>", "profiles": {"<name>": {"<key>": <number>, ...}}}.
+    Profiles from the file are merged over PERFORMANCE_PROFILES key by key (new names inherit
+    from 'balanced'); unknown keys and non-positive values are ignored. A broken file keeps the
+    last good settings.
+    """
+
+    def __init__(self, path=None):
+        self.path = path  # None: built-in profiles only, nothing read or written
+        self.profiles = {name: dict(values) for name, values in PERFORMANCE_PROFILES.items()}
+        self.profile = DEFAULT_PERFORMANCE_PROFILE
+        self.overlay_style = 'auto'
+        self.overlay_backend = 'auto'
+        self.loaded_mtime = None
+        self.reloads = 0
+
+    @property
+    def values(self):
+        return self.profiles.get(self.profile, self.profiles[DEFAULT_PERFORMANCE_PROFILE])
+
+    @property
+    def profile_names(self):
+        return list(self.profiles)
+
+    def _mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def is_stale(self):
+        return bool(self.path) and self._mtime() != self.loaded_mtime
+
+    def load(self):
+        """(Re)read the settings file, creating it with the defaults if missing; True if read"""
+        if not self.path:
+            return False
+        if not os.path.exists(self.path):
+            self.save()
+            return True
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.error(f"Settings file {self.path} unreadable, keeping previous settings: {e}")
+            self.loaded_mtime = self._mtime()
+            return False
+
+        base = PERFORMANCE_PROFILES[DEFAULT_PERFORMANCE_PROFILE]
+        profiles = {name: dict(values) for name, values in PERFORMANCE_PROFILES.items()}
+        for name, overrides in (data.get('profiles') or {}).items():
+            profile = profiles.setdefault(name, dict(base))
+            for key, value in (overrides or {}).items():
+                if key not in base:
+                    logger.error(f"Settings: unknown key '{key}' in profile '{name}'")
+                elif isinstance(value, (int, float)) and not isinstance(value, bool) and value > 0:
+                    profile[key] = float(value)
+                else:
+                    logger.error(f"Settings: invalid value {value!r} for '{key}' in profile '{name}'")
+        self.profiles = profiles
+        selected = data.get('profile', DEFAULT_PERFORMANCE_PROFILE)
+        if selected not in profiles:
+            logger.error(f"Settings: unknown profile '{selected}', using '{DEFAULT_PERFORMANCE_PROFILE}'")
+            selected = DEFAULT_PERFORMANCE_PROFILE
+        self.profile = selected
+        overlay_style = data.get('overlay_style', 'auto')
+        if overlay_style != 'auto' and overlay_style not in OVERLAY_STYLES:
+            logger.error(f"Settings: unknown overlay style '{overlay_style}', using 'auto'")
+            overlay_style = 'auto'
+        self.overlay_style = overlay_style
+        overlay_backend = data.get('overlay_backend', 'auto')
+        if overlay_backend != 'auto' and overlay_backend not in OVERLAY_BACKENDS:
+            logger.error(f"Settings: unknown overlay backend '{overlay_backend}', using 'auto'")
+            overlay_backend = 'auto'
+        self.overlay_backend = overlay_backend
+        self.loaded_mtime = self._mtime()
+        self.reloads += 1
+        return True
+
+    def select(self, name):
+        if name not in self.profiles:
+            raise ValueError(f"Unknown profile: {name}")
+        self.profile = name
+        self.save()
+
+    def select_overlay_style(self, name):
+        if name != 'auto' and name not in OVERLAY_STYLES:
+            raise ValueError(f"Unknown overlay style: {name}")
+        self.overlay_style = name
+        self.save()
+
+    def select_overlay_backend(self, name):
+        if name != 'auto' and name not in OVERLAY_BACKENDS:
+            raise ValueError(f"Unknown overlay backend: {name}")
+        self.overlay_backend = name
+        self.save()
+
+    def save(self):
+        """Write the selection and any non-default profile values atomically"""
+        if not self.path:
+            return
+        profiles = {}
+        for name, values in self.profiles.items():
+            defaults = PERFORMANCE_PROFILES.get(name, PERFORMANCE_PROFILES[DEFAULT_PERFORMANCE_PROFILE])
+            changed = {key: value for key, value in values.items() if defaults.get(key) != value}
+            if changed or name not in PERFORMANCE_PROFILES:
+                profiles[name] = changed
+        data = {'profile': self.profile, 'overlay_style': self.overlay_style,
+                'overlay_backend': self.overlay_backend, 'profiles': profiles,
+                'available_keys': sorted(PERFORMANCE_PROFILES[DEFAULT_PERFORMANCE_PROFILE])}
+        try:
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2)
+            os.replace(temp_path, self.path)
+            self.loaded_mtime = self._mtime()
+        except Exception as e:
+            logger.error(f"Could not save settings: {e}")
+
+class FileChangeWatcher:
+    """Calls on_change when a file in a directory is written (FindFirstChangeNotification).
+
+    Blocks in WaitForMultipleObjects on its own thread, so it never wakes on a timer.
+    """
+
+    def __init__(self, directory, on_change, name='config-watch'):
+        self.directory = directory
+        self.on_change = on_change
+        self.name = name
+        self.thread = None
+        self._stop_event = None
+
+    def start(self):
+        import win32event
+        self._stop_event = win32event.CreateEvent(None, True, False, None)
+        self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        if self._stop_event:
+            import win32event
+            win32event.SetEvent(self._stop_event)
+
+    def _run(self):
+        try:
+            import win32event
+            import win32file
+            change = win32file.FindFirstChangeNotification(
+                self.directory, False, win32con.FILE_NOTIFY_CHANGE_LAST_WRITE)
+            try:
+                while True:
+                    result = win32event.WaitForMultipleObjects(
+                        [self._stop_event, change], False, win32event.INFINITE)
+                    if result == win32event.WAIT_OBJECT_0:
+                        break
+                    note_wakeup()
+                    try:
+                        self.on_change()
+                    except Exception as e:
+                        logger.error(f"File change handler failed: {e}")
+                    win32file.FindNextChangeNotification(change)
+            finally:
+                win32file.FindCloseChangeNotification(change)
+        except Exception as e:
+            logger.error(f"File watcher for {self.directory} failed: {e}")
 
 class WhatsAppBlurFinal:
-    def __init__(self):
+    def __init__(self, start_background=True, boot=None):
+        """start_background=False skips the hotkey, tray and scheduled monitoring,
+        so a harness can drive _monitor_tick() and process_ui_queue() itself.
+        boot is the BootStartup of a --boot launch, which already holds the hotkey."""
         # Fix DPI awareness FIRST
         self.fix_dpi_awareness()
 
+        # GC thresholds and pause tracking; startup objects get frozen once init is done
+        self.gc_policy = GcPolicy()
+        self.gc_policy.install()
+
         # Core state
         self.whatsapp_hwnd = None
         self.blur_window = None
+        self.blur_window_native = False  # The shown overlay's look comes from the compositor
+        self.blur_canvas = None
+        self.blur_canvas_item = None
         self.is_blurred = False
         self.is_enabled = True
         self.hover_remove_blur = True
@@ -68,32 +3149,91 @@ class WhatsAppBlurFinal:
         self.require_foreground = True
         # Hover state
         self._is_hovering = False
-        self._hover_watch_thread = None
-        self._hover_watch_stop = threading.Event()
-        self.toggle_key = 'ctrl+alt+q'  # Single hand shortcut - easy to press with left hand
+        self.toggle_key = DEFAULT_TOGGLE_KEY
+        self.hotkey_backend = None
+        self.boot = boot
 
-        # Safety: prevent rapid blur attempts that could freeze WhatsApp
-        self.last_blur_attempt = 0
-        self.min_blur_interval = 2.0  # Minimum 2 seconds between blur attempts
+        # Latest-wins blur requests; only the capture/render stage is rate-limited
+        # (rapid captures could freeze WhatsApp), never the user's intent
+        self.arbiter = BlurRequestArbiter(min_render_interval=0.5)
         self.capturing_screenshot = False  # Prevent screenshot interference
+        self.capture_backend_name = 'bitblt'  # 'bitblt', 'printwindow' or 'fake'
+        self.capture_engine = None
 
         # Main tkinter root (hidden)
         self.root = tk.Tk()
         self.root.withdraw()
         self.root.title("WhatsApp Blur")
 
+        # Every periodic and delayed task runs from this one timer queue on the Tk thread
+        self.scheduler = TkScheduler(self.root)
+
         # System tray icon
         self.tray_icon = None
 
-        # Threading events and queue
+        # Shared snapshot of monitors and window rects
+        self.geometry = DesktopGeometry()
+        # Cloaking / virtual desktop / occlusion aware visibility, cached per event generation
+        self.visibility = VisibilityOracle(self.geometry)
+
+        # Pauses or slows background loops on lock, display off, full screen or low battery
+        self.suspension = SuspensionController()
+        self.session_events = None
+
+        # Capture and rendering run off the Tk thread; only finished textures come back
+        self.render_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='render')
+        self._render_future = None
+        self._refresh_future = None
+        self._render_generation = 0  # Bumped by every show/hide; stale results are dropped
+
+        # Threading events and queue; a put from any thread wakes the UI queue task
         self.shutdown_event = threading.Event()
-        self.monitoring_thread = None
-        self.ui_queue = queue.Queue()
+        self._monitor_state = {'last_whatsapp_state': None, 'state_change_time': 0}
+        # Tuning values below are defaults; apply_performance_profile() sets them from the profile
+        self.monitor_interval = 1.5
+        self.monitor_debounce_delay = 0.5
+        # With visibility events flowing, the monitor pass only runs on change plus this safety net
+        self.monitor_idle_interval = 30.0
+        self.hover_poll_interval = 0.1
+        self.ui_queue_busy_interval = 0.05
+        self.ui_queue_retry_interval = 0.1
+        self.blur_radius_scale = 1.0
+        self.ui_queue = NotifyingQueue(on_put=self.wake_ui)
 
         # Screenshot and blur cache
         self.blur_cache = None
         self.whatsapp_rect = None
         self.dpi_scale = self.get_dpi_scale()
+
+        # Overlay look: 'auto' picks from OVERLAY_STYLES by measured cost, or a fixed style name
+        self.blur_style = 'auto'
+        self.overlay_styles = {name: style() for name, style in OVERLAY_STYLES.items()}
+        self.style_costs = StyleCostModel(self.overlay_styles)
+        self.texture_style = None  # Style blur_cache was rendered in
+        # Who draws the overlay: the compositor's native blur where available, else the texture
+        self.overlay_backend_preference = 'auto'
+        self.overlay_backends = {name: backend() for name, backend in OVERLAY_BACKENDS.items()}
+        self.overlay_backend = self.overlay_backends['texture']
+
+        # Live refresh of content blur (off by default; samples via PrintWindow so the overlay isn't captured)
+        self.live_refresh_enabled = False
+        self.live_refresh = LiveRefreshController()
+        self.live_refresh_engine = None
+
+        # Render quality governor (CPU budget per render)
+        self.governor = CpuBudgetGovernor()
+        self.texture_tier = None  # Tier name blur_cache was rendered at
+
+        # Tk images for the overlay texture, kept across hide/show
+        self.photo_cache = PhotoImageCache()
+
+        # Last duration of each render stage in milliseconds
+        self.stage_metrics = {}
+        # CPU and wakeups per named thread over the last 5 minutes
+        self.thread_profiler = ThreadCpuProfiler(window=300.0, sample_interval=5.0)
+        # On-demand cProfile / tracemalloc captures from the tray
+        self.profiler = ProfilerHooks()
+        self.profile_duration = 30.0
         
         # State tracking for logging throttling
         self.last_log_state = None
@@ -105,9 +3245,9 @@ class WhatsAppBlurFinal:
         self.last_window_search = 0
         self.window_cache_ttl = 8.0  # CPU OPTIMIZED: Extended from 1s to 8s (87% fewer searches)
         
-        # Long-term stability - memory management (CPU OPTIMIZED)
-        self.last_cleanup_time = time.time()
-        self.cleanup_interval = 300  # Cleanup every 5 minutes
+        # Long-term stability - memory management: caches are evicted only above the
+        # soft RSS limit (cheapest to rebuild first), everything at the hard limit
+        self.memory_manager = MemoryManager(soft_limit_mb=150.0, hard_limit_mb=250.0, sample_interval=30.0)
         
         # Resource tracking for cleanup
         self.created_widgets = set()
@@ -115,15 +3255,43 @@ class WhatsAppBlurFinal:
         
         # Process name cache for CPU optimization
         self.process_name_cache = {}  # Cache process names to avoid repeated psutil.Process() calls
+        self.register_memory_evictors()
+        
+        # Named performance profiles; the settings file is only used by the real app, not harnesses
+        settings_path = os.path.join(app_data_dir(), 'settings.json') if start_background else None
+        self.perf_config = PerformanceConfig(settings_path)
+        if start_background:
+            self.style_costs.path = os.path.join(app_data_dir(), 'style_costs.json')
+        self.config_watcher = None
+        self._restart_on_exit = False
+        
+        # Single-instance lock and control channel, handed over by main()
+        self.instance_lock = None
+        self.control_server = None
+        self.started_at = time.time()
+        self.perf_config.load()
+        self.apply_performance_profile()
 
         print(f"🔐 WhatsApp Blur - Starting silently (DPI: {self.dpi_scale * 100:.0f}%)")
         self.check_system_requirements()
 
         # Initialize the application
-        self.setup_keyboard_shortcut()
-        self.create_tray_icon()
-        self.start_monitoring()
-        self.process_ui_queue()
+        if start_background:
+            self.setup_keyboard_shortcut()
+            if self.boot:
+                # Staggered: the hotkey works as soon as monitoring runs; the tray follows
+                self.start_monitoring()
+                self.scheduler.schedule('boot_tray', self.boot.tray_delay, self._boot_tray_task)
+            else:
+                self.create_tray_icon()
+                self.start_monitoring()
+
+        # Style costs are measured once per machine, after startup has settled
+        if start_background and not self.style_costs.load():
+            self.scheduler.schedule('style_calibration', 10.0, self._calibrate_styles_task)
+
+        # Everything Tk, PIL, pystray and NumPy allocated so far lives for the whole run
+        self.gc_policy.freeze_startup_objects()
     
     def fix_dpi_awareness(self):
         """Fix DPI awareness for proper coordinate calculation"""
@@ -148,67 +3316,43 @@ class WhatsAppBlurFinal:
     def check_system_requirements(self):
         """Quick system check"""
         try:
-            test_img = ImageGrab.grab(bbox=(0, 0, 100, 100))
-            print("✅ Screenshot capability working")
+            self.capture_test_image((0, 0, 100, 100))
+            print(f"✅ Screenshot capability working ({self.capture_engine.backend.name})")
         except Exception:
             print("❌ Screenshot test failed - check Windows Privacy Settings")
     
     def is_whatsapp_currently_visible(self, hwnd):
-        """Check if WhatsApp is actually visible and in the foreground RIGHT NOW"""
+        """Check if WhatsApp is actually visible (and in the foreground if required) RIGHT NOW"""
+        report = self.visibility.check(hwnd, self.require_foreground)
+        if report.visible:
+            # Update the rect to current position
+            self.whatsapp_rect = report.rect
+        return report.visible
+
+    def _blur_window_hwnd(self):
+        """The overlay's top-level HWND (Tk's wrapper frame): styles, z-order and accent all go here"""
         try:
-            if not hwnd or not win32gui.IsWindowVisible(hwnd):
-                return False
-            
-            # Check if minimized
-            if win32gui.IsIconic(hwnd):
-                return False
-            
-            # Get current window rect
-            try:
-                current_rect = win32gui.GetWindowRect(hwnd)
-                x, y, x2, y2 = current_rect
-                width = x2 - x
-                height = y2 - y
-                
-                # Check if window is actually on screen
-                if width < 100 or height < 100:
-                    return False
-                
-                # Check if window is mostly on screen
-                screen_width = win32api.GetSystemMetrics(0)
-                screen_height = win32api.GetSystemMetrics(1)
-                
-                if x2 < 0 or y2 < 0 or x > screen_width or y > screen_height:
-                    return False
-                
-                # If required, ensure WhatsApp is the foreground window
-                if self.require_foreground:
-                    try:
-                        fg_hwnd = win32gui.GetForegroundWindow()
-                        if fg_hwnd != hwnd:
-                            return False
-                    except Exception:
-                        return False
-                # Update the rect to current position
-                self.whatsapp_rect = current_rect
-                return True
-                
-            except Exception:
-                return False
-                
+            return int(self.blur_window.wm_frame(), 16)
         except Exception:
-            return False
+            return self.blur_window.winfo_id()
 
     def _set_blur_window_visibility(self, alpha: float, clickthrough: bool):
         """Set blur window alpha and clickthrough without destroying it"""
         if not self.blur_window:
             return
         try:
-            self.blur_window.attributes('-alpha', max(0.0, min(1.0, alpha)))
-            hwnd = self.blur_window.winfo_id()
+            alpha = max(0.0, min(1.0, alpha))
+            # A layered window hides the compositor's blur, so the native overlay is only
+            # layered while faded out for hover
+            native_opaque = self.blur_window_native and alpha >= 1.0
+            if not native_opaque or float(self.blur_window.attributes('-alpha')) < 1.0:
+                self.blur_window.attributes('-alpha', alpha)
+            hwnd = self._blur_window_hwnd()
             style = win32gui.GetWindowLong(hwnd, win32con.GWL_EXSTYLE)
-            # Ensure layered for alpha
-            style |= win32con.WS_EX_LAYERED
+            if native_opaque:
+                style &= ~win32con.WS_EX_LAYERED
+            else:
+                style |= win32con.WS_EX_LAYERED
             # Toggle clickthrough
             if clickthrough:
                 style |= win32con.WS_EX_TRANSPARENT
@@ -219,6 +3363,12 @@ class WhatsAppBlurFinal:
             print(f"⚠️ Error adjusting window visibility: {e}")
             raise
 
+    def _record_stage(self, stage, started):
+        """Record how long a render stage took since `started` (a perf_counter value)"""
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.stage_metrics[stage] = elapsed_ms
+        return elapsed_ms
+
     def throttled_log(self, message):
         """Log message only if it's different from last or haven't exceeded repeat limit"""
         if message != self.last_log_state:
@@ -236,44 +3386,49 @@ class WhatsAppBlurFinal:
         return rx1 <= x <= rx2 and ry1 <= y <= ry2
 
     def _start_hover_watcher(self):
-        if self._hover_watch_thread and self._hover_watch_thread.is_alive():
-            return
-        self._hover_watch_stop.clear()
-
-        def watcher():
-            while not self._hover_watch_stop.is_set():
-                try:
-                    # Only restore if we're actually hovering and should be watching
-                    if not self._is_hovering:
-                        break
-                        
-                    # If WhatsApp moved, refresh rect
-                    if self.whatsapp_hwnd and win32gui.IsWindow(self.whatsapp_hwnd):
-                        self.whatsapp_rect = win32gui.GetWindowRect(self.whatsapp_hwnd)
-                    
-                    # Get cursor position
-                    pt = win32gui.GetCursorPos()
-                    
-                    # If cursor left WhatsApp rect, restore blur
-                    if self.whatsapp_rect and not self._point_in_rect(pt, self.whatsapp_rect):
-                        self._is_hovering = False
-                        # Restore immediately if app still enabled and WA visible/foreground
-                        if self.is_enabled and self.whatsapp_hwnd and self.is_whatsapp_currently_visible(self.whatsapp_hwnd):
-                            # Restore alpha and interactivity
-                            self._set_blur_window_visibility(1.0, clickthrough=False)
-                        self._hover_watch_stop.set()
-                        break
-                except Exception:
-                    pass
-                time.sleep(0.1)  # Reduced frequency to 10Hz for better stability
+        if not self.scheduler.is_scheduled('hover'):
+            self.scheduler.schedule('hover', self.hover_poll_interval, self._hover_tick)
 
-        self._hover_watch_thread = threading.Thread(target=watcher, daemon=True)
-        self._hover_watch_thread.start()
+    def _hover_tick(self):
+        """Restore the overlay once the cursor leaves WhatsApp; returns the next delay or None"""
+        # Only restore if we're actually hovering and should be watching
+        if not self._is_hovering:
+            return None
+        
+        # Nothing to track while the session is locked or the display is off (resumed by listener)
+        if self.suspension.is_suspended:
+            return None
+        
+        try:
+            # If WhatsApp moved, refresh rect (snapshot; updated on move events)
+            if self.whatsapp_hwnd:
+                self.whatsapp_rect = self.geometry.window_rect(self.whatsapp_hwnd) or self.whatsapp_rect
+            
+            # Get cursor position
+            pt = win32gui.GetCursorPos()
+            
+            # If cursor left WhatsApp rect, restore blur
+            if self.whatsapp_rect and not self._point_in_rect(pt, self.whatsapp_rect):
+                self._is_hovering = False
+                # Restore immediately if app still enabled and WA visible/foreground
+                if self.is_enabled and self.whatsapp_hwnd and self.is_whatsapp_currently_visible(self.whatsapp_hwnd):
+                    # Restore alpha and interactivity
+                    self._set_blur_window_visibility(1.0, clickthrough=False)
+                return None
+        except Exception:
+            pass
+        # 10Hz while hovering by default, slower on low battery
+        return self.hover_poll_interval * self.suspension.interval_multiplier
     
     def find_whatsapp_window(self):
         """Find WhatsApp window with caching for performance"""
         current_time = time.time()
         
+        # A cached "not found" is stale once a window was shown, hidden or refocused
+        if (self.window_cache.get('hwnd') is None and self.visibility.events_live and
+                self.window_cache.get('generation') != self.visibility.generation):
+            self.window_cache.clear()
+        
         # Use cached result if recent enough
         if (current_time - self.last_window_search < self.window_cache_ttl and 
             'hwnd' in self.window_cache):
@@ -340,6 +3495,7 @@ class WhatsAppBlurFinal:
                     
                     if is_whatsapp and priority > 0:
                         rect = win32gui.GetWindowRect(hwnd)
+                        self.geometry.record_window(hwnd, rect)
                         width = rect[2] - rect[0]
                         height = rect[3] - rect[1]
                         
@@ -366,6 +3522,13 @@ class WhatsAppBlurFinal:
                         if not self.whatsapp_hwnd or self.whatsapp_hwnd != hwnd:
                             print(f"🎯 WhatsApp found and VISIBLE: '{window_data[1]}' (process: {window_data[4]})")
                             print(f"📍 Current WhatsApp rect: {self.whatsapp_rect}")
+                            # Keep its rect current from move events instead of polling
+                            if self.session_events:
+                                try:
+                                    _, pid = win32process.GetWindowThreadProcessId(hwnd)
+                                    self.session_events.watch_window_process(pid)
+                                except Exception:
+                                    pass
                         
                         # Cache the result
                         self.window_cache = {'hwnd': hwnd, 'time': current_time}
@@ -376,13 +3539,15 @@ class WhatsAppBlurFinal:
                 self.throttled_log("⚠️ WhatsApp windows found but none are currently visible")
                 self.whatsapp_rect = None
                 # Cache negative result
-                self.window_cache = {'hwnd': None, 'time': current_time}
+                self.window_cache = {'hwnd': None, 'time': current_time,
+                                     'generation': self.visibility.generation}
                 self.last_window_search = current_time
                 return None
             else:
                 self.whatsapp_rect = None
                 # Cache negative result
-                self.window_cache = {'hwnd': None, 'time': current_time}
+                self.window_cache = {'hwnd': None, 'time': current_time,
+                                     'generation': self.visibility.generation}
                 self.last_window_search = current_time
                 return None
         except Exception as e:
@@ -393,154 +3558,164 @@ class WhatsAppBlurFinal:
     def get_window_rect_dpi_aware(self, hwnd):
         """Get window rect with DPI scaling compensation"""
         try:
-            return win32gui.GetWindowRect(hwnd)
+            return self.geometry.window_rect(hwnd)
         except Exception as e:
             logger.error(f"Error getting window rect: {e}")
             return None
     
-    def capture_whatsapp_screenshot(self):
-        """Capture screenshot with DPI scaling fixes - SAFE VERSION"""
-        if not self.whatsapp_hwnd:
-            return None
+    def get_capture_engine(self):
+        """Create the capture engine on first use; None if the backend can't be set up"""
+        if self.capture_engine is None and self.capture_backend_name:
+            try:
+                backend = CAPTURE_BACKENDS[self.capture_backend_name]()
+                self.capture_engine = CaptureEngine(backend)
+            except Exception as e:
+                logger.error(f"Capture backend '{self.capture_backend_name}' unavailable: {e}")
+                self.capture_backend_name = None
+        return self.capture_engine
+
+    def capture_test_image(self, rect):
+        """Capture rect through the capture engine the blur uses; raises if that fails"""
+        engine = self.get_capture_engine()
+        if engine is None:
+            raise RuntimeError("no capture backend available")
+        image = engine.capture_image(rect)
+        if image is None:
+            raise RuntimeError(f"{engine.backend.name} capture returned nothing")
+        return image
+
+    def capture_whatsapp_screenshot(self, hwnd, rect):
+        """Capture WhatsApp's window `hwnd` at `rect` - SAFE VERSION.
+
+        Runs on the render worker with the hwnd and rect the Tk thread saw when it asked, so
+        nothing here reads state the Tk thread changes. Returns (screenshot, rect), or (None, None).
+        """
+        if not hwnd:
+            return None, None
         
         # Prevent concurrent screenshots that cause white flash
         if self.capturing_screenshot:
             print("⚠️ Screenshot already in progress, skipping")
-            return None
+            return None, None
         
         self.capturing_screenshot = True
         
         try:
             # Check if WhatsApp is responsive before capturing
             try:
-                window_text = win32gui.GetWindowText(self.whatsapp_hwnd)
+                window_text = win32gui.GetWindowText(hwnd)
                 if not window_text:
                     print("⚠️ WhatsApp window has no title, may be loading")
-                    return None
+                    return None, None
                     
                 # Check if window is actually responsive
-                if not win32gui.IsWindowVisible(self.whatsapp_hwnd):
+                if not win32gui.IsWindowVisible(hwnd):
                     print("⚠️ WhatsApp window not visible")
-                    return None
+                    return None, None
                     
             except Exception as e:
                 print(f"⚠️ WhatsApp window check failed: {e}")
-                return None
-            
-            # Add small delay to avoid interfering with WhatsApp rendering
-            time.sleep(0.1)
+                return None, None
             
-            rect = self.get_window_rect_dpi_aware(self.whatsapp_hwnd)
             if not rect:
-                return None
+                return None, None
             
             x, y, x2, y2 = rect
             width = x2 - x
             height = y2 - y
             
-            # Store for blur window positioning
-            self.whatsapp_rect = rect
-            
             # Validate coordinates
             if x < -10000 or y < -10000 or width <= 0 or height <= 0:
                 print(f"⚠️ Invalid coordinates: {rect}")
-                return None
+                return None, None
             
             # Check if window is too small (might be minimized or loading)
             if width < 200 or height < 200:
                 print(f"⚠️ WhatsApp window too small: {width}x{height}")
-                return None
+                return None, None
             
             try:
-                # Use gentle screenshot method
-                screenshot = ImageGrab.grab(bbox=(x, y, x2, y2))
+                # Reuse the persistent DC/DIB; fall back to ImageGrab if it isn't available
+                screenshot = None
+                engine = self.get_capture_engine()
+                if engine:
+                    try:
+                        screenshot = engine.capture_image(rect, hwnd)
+                    except Exception as e:
+                        print(f"⚠️ Capture engine failed, using ImageGrab: {e}")
+                if screenshot is None:
+                    screenshot = ImageGrab.grab(bbox=(x, y, x2, y2))
                 
                 # Validate screenshot quality
                 if screenshot.size[0] < 100 or screenshot.size[1] < 100:
-                    print("⚠️ Screenshot too small, WhatsApp may not be ready")
-                    return None
-                
-                return screenshot
-            except Exception as e:
-                print(f"⚠️ Screenshot capture failed: {e}")
-                # Don't try fallback methods that might interfere
-                return None
-                
-        except Exception as e:
-            logger.error(f"Error in capture_whatsapp_screenshot: {e}")
-            return None
-        finally:
-            # Always reset the capturing flag
-            self.capturing_screenshot = False
-    
-    def create_blurred_image(self, image):
-        """Create TRUE transparent glass overlay with memory optimization"""
-        if not image:
-            return None
-        
-        try:
-            # Convert to RGBA for consistency
-            if image.mode != 'RGBA':
-                base_image = image.convert('RGBA')
-            else:
-                base_image = image
-            
-            width, height = base_image.size
-            
-            try:
-                import numpy as np
-                
-                # Create solid glass effect overlay (no alpha in PIL) with memory-efficient processing
-                glass_array = np.zeros((height, width, 3), dtype=np.uint8)  # RGB only
-                
-                # Glass color - subtle blue-white tint
-                base_r, base_g, base_b = 245, 248, 255  # Light blue-white
-                
-                # Add subtle texture for glass effect
-                np.random.seed(42)  # Consistent pattern
-                noise = np.random.normal(0, 2, (height, width))
-                
-                glass_r = np.clip(base_r + noise, 0, 255).astype(np.uint8)
-                glass_g = np.clip(base_g + noise, 0, 255).astype(np.uint8) 
-                glass_b = np.clip(base_b + noise, 0, 255).astype(np.uint8)
-                
-                # Combine channels (RGB only - no alpha)
-                glass_array[:, :, 0] = glass_r
-                glass_array[:, :, 1] = glass_g
-                glass_array[:, :, 2] = glass_b
-                
-                # Convert to PIL RGB image (tkinter will handle transparency)
-                glass_overlay = Image.fromarray(glass_array.astype('uint8'), mode='RGB')
-                
-                # Apply subtle blur for frosted glass texture
-                glass_overlay = glass_overlay.filter(ImageFilter.GaussianBlur(radius=1.5))
-                
-                # Explicit memory cleanup for long-term stability
-                del glass_array, noise, glass_r, glass_g, glass_b
-                
-                return glass_overlay
-                
-            except ImportError:
-                # Fallback without numpy
-                print("⚠️ NumPy not available, using simple glass overlay")
-                
-                # Create simple solid glass overlay (RGB only)
-                glass_color = (245, 248, 255)  # Light blue-white
-                glass_overlay = Image.new('RGB', base_image.size, glass_color)
+                    print("⚠️ Screenshot too small, WhatsApp may not be ready")
+                    return None, None
                 
-                # Apply subtle blur
-                glass_overlay = glass_overlay.filter(ImageFilter.GaussianBlur(radius=1.5))
+                return screenshot, rect
+            except Exception as e:
+                print(f"⚠️ Screenshot capture failed: {e}")
+                # Don't try fallback methods that might interfere
+                return None, None
                 
-                return glass_overlay
-            
         except Exception as e:
-            logger.error(f"Error creating glass effect: {e}")
-            # Simple fallback
-            try:
-                return Image.new('RGB', image.size, (250, 252, 255))  # Light glass color
-            except:
-                return None
+            logger.error(f"Error in capture_whatsapp_screenshot: {e}")
+            return None, None
+        finally:
+            # Always reset the capturing flag
+            self.capturing_screenshot = False
+    
+    def choose_overlay_backend(self):
+        """Pick the overlay backend for the next show; the system's state is re-checked each time"""
+        backend, reasons = select_overlay_backend(self.overlay_backend_preference, self.overlay_backends.values())
+        if backend is not self.overlay_backend:
+            details = ', '.join(f"{name}: {reason}" for name, reason in reasons.items())
+            print(f"🪟 Overlay backend: {self.overlay_backend.name} → {backend.name} ({details})")
+            self.overlay_backend = backend
+        return backend
+    
+    def describe_overlay_backends(self):
+        return ', '.join(f"{name}: {backend.availability()[1]}" for name, backend in self.overlay_backends.items())
+    
+    def select_overlay_style(self, size, tier, content=True):
+        """The configured style, or in 'auto' the best-looking one that fits the render budget.
+
+        content is False when the capture is synthetic, so 'auto' keeps to glass/solid.
+        """
+        if self.blur_style in self.overlay_styles:
+            return self.overlay_styles[self.blur_style]
+        style, predicted_ms = self.style_costs.choose(size, tier, self.governor.budget_ms, content)
+        if style.name != self.texture_style:
+            print(f"🎨 Overlay style: {style.name} ({predicted_ms:.0f} ms predicted for "
+                  f"{size[0]}x{size[1]} at {tier['name']}, budget {self.governor.budget_ms:.0f} ms)")
+        return style
     
+    def render_texture(self, image, style, tier):
+        """Render the overlay texture in `style` at `tier`; solid tint if it fails.
+
+        Returns (texture, elapsed ms). Runs on the render worker: the caller hands the time to
+        the governor on the Tk thread via _apply_render_stats.
+        """
+        render_start = time.perf_counter()
+        try:
+            texture = style.render(image, tier, self.blur_radius_scale)
+        except Exception as e:
+            logger.error(f"Overlay style '{style.name}' failed: {e}")
+            texture = self.overlay_styles['solid'].render(image, tier)
+        elapsed_ms = (time.perf_counter() - render_start) * 1000
+        self.style_costs.observe(style.name, tier['name'], image.size[0] * image.size[1], elapsed_ms)
+        return texture, elapsed_ms
+    
+    def _apply_render_stats(self, stages, render_ms):
+        """Tk thread: record stage timings and render times measured on the worker"""
+        self.stage_metrics.update(stages)
+        for elapsed_ms in render_ms:
+            self.governor.record_render(elapsed_ms)
+    
+    def _calibrate_styles_task(self):
+        """Measure style costs on the render worker once per machine (scheduled after startup)"""
+        self.render_pool.submit(self.style_costs.calibrate, self.blur_radius_scale)
+        return None
+
     def apply_rounded_corners(self, image, radius=12):
         """Apply rounded corners to match WhatsApp Desktop's design"""
         try:
@@ -592,8 +3767,11 @@ class WhatsAppBlurFinal:
             return
         
         try:
-            # Get CURRENT WhatsApp coordinates (not cached)
-            current_rect = win32gui.GetWindowRect(self.whatsapp_hwnd)
+            # Get CURRENT WhatsApp coordinates (geometry snapshot is kept current by move events)
+            current_rect = self.geometry.window_rect(self.whatsapp_hwnd)
+            if not current_rect:
+                print("❌ WhatsApp window is gone - cannot create blur window")
+                return
             x, y, x2, y2 = current_rect
             width = x2 - x
             height = y2 - y
@@ -608,13 +3786,15 @@ class WhatsAppBlurFinal:
                 self.blur_window.destroy()
             
             # Create blur window
+            native = self.blur_window_native = self.overlay_backend.native
             self.blur_window = tk.Toplevel(self.root)
             self.blur_window.title("WhatsApp Blur")
             
             # Set window properties FIRST
             self.blur_window.overrideredirect(True)  # Remove title bar
             self.blur_window.attributes('-topmost', True)  # Always on top
-            self.blur_window.attributes('-alpha', 1.0)  # Full opacity
+            if not native:
+                self.blur_window.attributes('-alpha', 1.0)  # Full opacity (-alpha would make it layered)
             
             # Set geometry AFTER properties
             self.blur_window.geometry(f"{width}x{height}+{x}+{y}")
@@ -624,8 +3804,8 @@ class WhatsAppBlurFinal:
             self.blur_window.update()
             
             # Use Win32 API to ensure window is above WhatsApp
+            hwnd = self._blur_window_hwnd()
             try:
-                hwnd = self.blur_window.winfo_id()
                 # Set window to be topmost using Windows API
                 win32gui.SetWindowPos(hwnd, win32con.HWND_TOPMOST, x, y, width, height, 
                                     win32con.SWP_SHOWWINDOW | win32con.SWP_NOACTIVATE)
@@ -636,10 +3816,11 @@ class WhatsAppBlurFinal:
             canvas = tk.Canvas(self.blur_window, width=width, height=height, 
                              highlightthickness=0, bg='#F5F8FF')  # Light glass color background
             canvas.pack()
+            self.blur_canvas = canvas
+            self.blur_canvas_item = None
             
             # Apply Windows 11 rounded corners to the window itself
             try:
-                hwnd = self.blur_window.winfo_id()
                 # Use Windows 11 DWM API for native rounded corners
                 DWM_WINDOW_CORNER_PREFERENCE = 33
                 DWMWCP_ROUND = 2  # Round corners if appropriate
@@ -652,20 +3833,36 @@ class WhatsAppBlurFinal:
             except Exception as e:
                 print(f"⚠️ Native rounded corners failed: {e}")
             
-            # Set window transparency for glass effect (30% transparent)
-            self.blur_window.attributes('-alpha', 0.7)
+            if native:
+                # Black client pixels have zero alpha, so the compositor's blur shows through
+                canvas.configure(bg='#000000')
+                if not self.overlay_backend.apply(hwnd):
+                    # No texture was rendered for this show: drop the window, show_blur renders one
+                    print(f"⚠️ Native blur unavailable ({self.overlay_backend.failed}) - using the texture from now on")
+                    self.overlay_backend = self.overlay_backends['texture']
+                    self.blur_window.destroy()
+                    self.blur_window = None
+                    self.blur_canvas = None
+                    return
+                print(f"✅ Native {self.overlay_backend.name} blur applied")
+            else:
+                # Set window transparency for glass effect (30% transparent)
+                self.blur_window.attributes('-alpha', 0.7)
             
-            # Add glass texture overlay image if available
-            if self.blur_cache:
+            # Add glass texture overlay image if available (the native blur needs none)
+            if native:
+                print("✨ Overlay drawn by the compositor - no texture")
+            elif self.blur_cache:
                 try:
-                    # Resize if needed
-                    if self.blur_cache.size != (width, height):
-                        resized = self.blur_cache.resize((width, height), Image.Resampling.LANCZOS)
+                    # Reuse the Tk image when the texture and size are unchanged
+                    convert_start = time.perf_counter()
+                    photo, converted = self.photo_cache.get(self.blur_cache, width, height)
+                    elapsed_ms = self._record_stage('photo_convert', convert_start)
+                    if converted:
+                        print(f"🖼️ Texture converted for Tk in {elapsed_ms:.1f} ms")
                     else:
-                        resized = self.blur_cache
-                    
-                    photo = ImageTk.PhotoImage(resized)
-                    canvas.create_image(0, 0, anchor=tk.NW, image=photo)
+                        print(f"♻️ Reused cached Tk image ({elapsed_ms:.1f} ms)")
+                    self.blur_canvas_item = canvas.create_image(0, 0, anchor=tk.NW, image=photo)
                     canvas.image = photo  # Keep reference
                     
                 except Exception as e:
@@ -687,11 +3884,13 @@ class WhatsAppBlurFinal:
             canvas.bind('<Leave>', self.on_hover_leave)
             print("✅ Hover events bound")
             
-            # Ensure layered style for alpha control; not click-through by default
+            # Layered for alpha control (the native blur must stay unlayered); not click-through by default
             try:
-                hwnd = self.blur_window.winfo_id()
                 style = win32gui.GetWindowLong(hwnd, win32con.GWL_EXSTYLE)
-                style |= win32con.WS_EX_LAYERED
+                if native:
+                    style &= ~win32con.WS_EX_LAYERED
+                else:
+                    style |= win32con.WS_EX_LAYERED
                 style &= ~win32con.WS_EX_TRANSPARENT
                 win32gui.SetWindowLong(hwnd, win32con.GWL_EXSTYLE, style)
             except Exception:
@@ -722,34 +3921,42 @@ class WhatsAppBlurFinal:
     def on_hover_leave(self, event):
         """Handle hover leave: let watcher handle restoration for better timing"""
         if self.hover_remove_blur and self.is_blurred and self.blur_window:
-            # Don't immediately restore - let the watcher thread handle it
+            # Don't immediately restore - let the hover task handle it
             # This prevents the overlay from flickering back and forth
             pass
     
     def show_blur_if_enabled(self):
         """Show blur if conditions are met"""
         if not self.is_blurred and self.is_enabled:
-            self.show_blur()
+            self.arbiter.request(True)
+            self.wake_ui()
     
-    def show_blur(self):
-        """Show blur overlay - ONLY when WhatsApp is actually visible"""
-        print("🔍 show_blur() called")
-        
-        # Safety check: prevent rapid blur attempts
-        current_time = time.time()
-        if current_time - self.last_blur_attempt < self.min_blur_interval:
-            print(f"⚠️ Too soon since last blur attempt ({current_time - self.last_blur_attempt:.1f}s < {self.min_blur_interval}s)")
+    def apply_blur_request(self):
+        """Start the latest requested blur state if nothing blocks it (Tk thread)"""
+        action = self.arbiter.next_action(self.is_blurred, time.time())
+        if not action:
             return
-        
-        self.last_blur_attempt = current_time
+        kind, token = action
+        if kind == 'hide':
+            self.hide_blur()
+            self.arbiter.complete(token)
+        elif not self.show_blur(token):
+            self.arbiter.complete(token)
+    
+    def show_blur(self, token=None):
+        """Show blur overlay - ONLY when WhatsApp is actually visible.
+
+        Returns True if a render was submitted; finish_blur completes `token` with the arbiter.
+        """
+        print("🔍 show_blur() called")
         
         if not self.is_enabled:
             print("❌ App is disabled - enable in tray menu first")
-            return
+            return False
         
         if self.is_blurred:
             print("⚠️ Blur already active")
-            return
+            return False
         
         print("🔍 Looking for WhatsApp window...")
         
@@ -757,38 +3964,123 @@ class WhatsAppBlurFinal:
         self.whatsapp_hwnd = self.find_whatsapp_window()
         if not self.whatsapp_hwnd:
             print("❌ WhatsApp not found or not currently visible - no blur shown")
-            return
+            return False
         
         # Double-check that it's really visible before proceeding
         if not self.is_whatsapp_currently_visible(self.whatsapp_hwnd):
             print("❌ WhatsApp visibility double-check failed")
             self.whatsapp_hwnd = None
-            return
+            return False
         
-        print("📸 Capturing screenshot (safely)...")
+        generation = self._next_render_generation()
+        if self.choose_overlay_backend().native:
+            # The compositor blurs whatever is behind the overlay: nothing to capture or render
+            self._open_blur_window()
+            if self.blur_window or self.overlay_backend.native:
+                return False  # Finished here; the arbiter completes the token
+            # The compositor refused the accent: render the real texture instead
         
+        # Capture and render on the worker pool; finish_blur shows the result on the Tk thread
+        print("📸 Capturing and rendering in background...")
+        tier = self.governor.choose_tier()
+        # The worker gets a snapshot: the Tk thread may clear whatsapp_hwnd while it runs
+        rect = self.get_window_rect_dpi_aware(self.whatsapp_hwnd)
+        future = self.render_pool.submit(self.profiler.wrap(self._render_blur_texture), generation,
+                                         self.whatsapp_hwnd, rect, tier,
+                                         self.blur_cache, self.texture_tier, self.texture_style)
+        self._render_future = future
+        future.add_done_callback(
+            lambda done: self.ui_queue.put(('finish_blur', (generation, token, done))))
+        return True
+    
+    def _next_render_generation(self):
+        """Start a new render generation, cancelling the in-flight one if it hasn't started"""
+        self._render_generation += 1
+        if self._render_future and not self._render_future.done():
+            if self._render_future.cancel():
+                print("🚫 Cancelled stale blur render")
+        self._render_future = None
+        return self._render_generation
+    
+    def _is_stale(self, generation):
+        return generation != self._render_generation or self.shutdown_event.is_set()
+    
+    def _render_blur_texture(self, generation, hwnd, rect, tier, previous_texture, previous_tier, previous_style):
+        """Worker: capture WhatsApp (`hwnd` at `rect`) and render the texture at `tier`.
+
+        Returns a BlurRender for finish_blur to apply, or None if failed or superseded. Shared
+        state (rect, stage timings, governor) is left to the Tk thread.
+        """
+        note_wakeup()
         # Capture screenshot with safety checks
-        screenshot = self.capture_whatsapp_screenshot()
+        capture_start = time.perf_counter()
+        screenshot, rect = self.capture_whatsapp_screenshot(hwnd, rect)
+        stages = {'capture': (time.perf_counter() - capture_start) * 1000}
         if not screenshot:
             print("❌ Screenshot capture failed - WhatsApp may be loading")
-            return
+            return None
+        if self._is_stale(generation):
+            return None
         
-        print("🌀 Creating blur effect...")
+        # Content-independent textures only depend on size, so keep the existing one
+        # (and its cached Tk image) when WhatsApp hasn't been resized
+        engine = self.capture_engine
+        style = self.select_overlay_style(screenshot.size, tier, not engine or engine.backend.real_content)
+        if (not style.needs_content and previous_texture
+                and previous_texture.size == screenshot.size
+                and previous_tier == tier['name'] and previous_style == style.name):
+            print(f"♻️ Reusing {style.name} texture")
+            return BlurRender(previous_texture, tier['name'], style.name, rect, stages, [])
         
-        # Create blur
-        self.blur_cache = self.create_blurred_image(screenshot)
-        if not self.blur_cache:
+        print(f"🌀 Creating blur effect ({style.name})...")
+        render_start = time.perf_counter()
+        texture, render_ms = self.render_texture(screenshot, style, tier)
+        stages['render'] = (time.perf_counter() - render_start) * 1000
+        if not texture:
             print("❌ Blur creation failed")
+            return None
+        return BlurRender(texture, tier['name'], style.name, rect, stages, [render_ms])
+    
+    def finish_blur(self, payload):
+        """Tk thread: show the texture produced by _render_blur_texture if still wanted"""
+        generation, token, future = payload
+        # Whatever happens below, the arbiter may start the next request
+        self.arbiter.complete(token)
+        if generation != self._render_generation or future.cancelled():
+            return
+        self._render_future = None
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.error(f"Blur render failed: {e}")
+            return
+        if not result:
+            return
+        self._apply_render_stats(result.stages, result.render_ms)
+        if not self.is_enabled or self.is_blurred or not self.whatsapp_hwnd:
+            print("⚠️ Blur no longer wanted, discarding render")
             return
         
+        # Store for blur window positioning
+        self.whatsapp_rect = result.rect
+        self.blur_cache, self.texture_tier, self.texture_style = result.texture, result.tier, result.style
+        self._open_blur_window()
+    
+    def _open_blur_window(self):
+        """Tk thread: create the overlay window and mark the blur active"""
         print("🪟 Creating blur window...")
         
         # Create window
+        window_start = time.perf_counter()
         self.create_blur_window()
+        self._record_stage('window', window_start)
         
         # Check if creation was successful
         if self.blur_window:
             self.is_blurred = True
+            # New baseline for live refresh: the next sample only records a fingerprint
+            self.live_refresh.reset()
+            self.live_refresh.last_sample = time.time()
             # Ensure visible and non-clickthrough after creation
             self._set_blur_window_visibility(alpha=1.0, clickthrough=False)
             print("✅ Blur successfully activated!")
@@ -796,37 +4088,51 @@ class WhatsAppBlurFinal:
             print("❌ Blur window creation failed")
     
     def hide_blur(self):
-        """Hide blur overlay and clean up state with improved memory management"""
+        """Hide blur overlay at once; window teardown and memory cleanup run at idle time"""
         print("🙈 hide_blur() called")
+        hide_start = time.perf_counter()
         
-        if self.blur_window:
-            print("🗂️ Destroying blur window...")
+        # A pending show is now stale
+        self._next_render_generation()
+        
+        window = self.blur_window
+        self.blur_window = None
+        self.blur_canvas = None
+        self.blur_canvas_item = None
+        self.is_blurred = False
+        
+        if window:
             try:
-                # Proper cleanup sequence to prevent memory leaks
-                self.blur_window.withdraw()  # Hide first
-                self.blur_window.update_idletasks()  # Process pending events
-                self.blur_window.destroy()  # Then destroy
-                self.blur_window = None
-                print("✅ Blur window destroyed")
+                # Visible part only: transparent + withdrawn, no event processing here
+                window.attributes('-alpha', 0.0)
+                window.withdraw()
             except Exception as e:
-                logger.error(f"Error destroying blur window: {e}")
-                self.blur_window = None
+                logger.error(f"Error hiding blur window: {e}")
+            
+            # Destroy (and collect) once Tk is idle
+            callback_id = self.root.after_idle(lambda: self._teardown_blur_window(window, callback_id))
+            self.active_callbacks.add(callback_id)
         
-        if self.is_blurred:
-            self.is_blurred = False
-            print("✅ Blur state cleared")
+        # Keep blur_cache and photo_cache so re-showing skips the render and Tk conversion;
+        # the memory manager releases them under memory pressure
         
-        # Clear blur cache to save memory
-        if self.blur_cache:
-            self.blur_cache = None
-            print("🧹 Blur cache cleared")
+        elapsed_ms = self._record_stage('hide_visible', hide_start)
+        print(f"✅ Blur hidden in {elapsed_ms:.1f} ms (teardown deferred)")
+    
+    def _teardown_blur_window(self, window, callback_id=None):
+        """Idle-time part of hide_blur: destroy the overlay and release memory"""
+        self.active_callbacks.discard(callback_id)
+        teardown_start = time.perf_counter()
+        try:
+            window.destroy()
+        except Exception as e:
+            logger.error(f"Error destroying blur window: {e}")
         
-        # Force garbage collection for better memory management
-        import gc
-        gc.collect()
-        print("🗑️ Memory cleanup completed")
+        # Young generations only; this runs at idle time, never on the hide itself
+        self.gc_policy.collect(1, 'overlay teardown')
         
-        print("✅ Blur completely hidden and cleaned up")
+        elapsed_ms = self._record_stage('hide_teardown', teardown_start)
+        print(f"🗑️ Blur window torn down in {elapsed_ms:.1f} ms")
     
     def update_blur_position(self):
         """Update blur window position to follow WhatsApp window"""
@@ -835,74 +4141,205 @@ class WhatsAppBlurFinal:
         
         try:
             # Get current WhatsApp window position
-            current_rect = win32gui.GetWindowRect(self.whatsapp_hwnd)
+            current_rect = self.geometry.window_rect(self.whatsapp_hwnd)
             
             # Check if position changed
-            if current_rect != self.whatsapp_rect:
+            if current_rect and current_rect != self.whatsapp_rect:
                 self.whatsapp_rect = current_rect
                 x, y, x2, y2 = current_rect
                 
                 # Update blur window position and size
                 self.blur_window.geometry(f"{x2-x}x{y2-y}+{x}+{y}")
                 
-                # Optionally refresh the blur image for new position
-                # (Commented out for performance - only position tracking)
-                # screenshot = self.capture_whatsapp_screenshot()
-                # if screenshot:
-                #     self.blur_cache = self.create_blurred_image(screenshot)
-                #     # Update the image in the window...
+                # Content is refreshed separately by refresh_blur_content when live refresh is on
                 
         except Exception as e:
             # Window might be closed/minimized
             pass
     
+    def texture_follows_content(self):
+        """True if the shown texture is rendered from WhatsApp's content (live refresh applies)"""
+        style = self.overlay_styles.get(self.texture_style)
+        return bool(style and style.needs_content) and not self.overlay_backend.native
+    
+    def get_live_refresh_engine(self):
+        """PrintWindow capture for live refresh, so the overlay on top isn't sampled"""
+        if self.live_refresh_engine is None:
+            self.live_refresh_engine = CaptureEngine(PrintWindowCaptureBackend())
+        return self.live_refresh_engine
+    
+    def refresh_blur_content(self):
+        """Re-sample WhatsApp on the worker pool; changed bands come back via apply_content_bands"""
+        if (not self.live_refresh_enabled or not self.texture_follows_content() or
+                not self.is_blurred or not self.blur_window or not self.whatsapp_hwnd):
+            return
+        if self._refresh_future and not self._refresh_future.done():
+            return  # Previous sample still running
+        
+        generation = self._render_generation
+        hwnd = self.whatsapp_hwnd
+        rect = self.whatsapp_rect or self.geometry.window_rect(hwnd)
+        texture_size = self.blur_cache.size if self.blur_cache else None
+        future = self.render_pool.submit(self.profiler.wrap(self._render_content_bands),
+                                         generation, hwnd, rect, texture_size, self.governor.tier,
+                                         self.texture_style, self.live_refresh.fingerprint)
+        self._refresh_future = future
+        future.add_done_callback(
+            lambda done: self.ui_queue.put(('apply_content_bands', (generation, done))))
+    
+    def _render_content_bands(self, generation, hwnd, rect, texture_size, tier, style_name, baseline, pad=16):
+        """Worker: fingerprint `hwnd` at `rect` against baseline and render the changed bands.
+
+        Everything it needs comes in as arguments; returns a ContentRefresh for
+        apply_content_bands.
+        """
+        note_wakeup()
+        refresh_start = time.perf_counter()
+        render_ms = []
+        result = None
+        fingerprint = None
+        try:
+            frame = self.get_live_refresh_engine().capture(rect, hwnd)
+            if frame is not None:
+                fingerprint, bands = self.live_refresh.detect_changes(baseline, frame)
+                if bands and not self._is_stale(generation):
+                    print(f"🔄 Live refresh: {len(bands)} changed band(s)")
+                    result = self._render_bands(frame, bands, texture_size, tier, style_name, pad, render_ms)
+        except Exception as e:
+            logger.error(f"Live refresh failed: {e}")
+        elapsed_ms = (time.perf_counter() - refresh_start) * 1000
+        return ContentRefresh(result, fingerprint, tier['name'], style_name,
+                              {'live_refresh': elapsed_ms}, render_ms)
+    
+    def _render_bands(self, frame, bands, texture_size, tier, style_name, pad, render_ms):
+        """Worker: render the changed bands of `frame`, appending each render time to render_ms"""
+        height, width = frame.shape[:2]
+        style = self.overlay_styles[style_name]
+        if texture_size != (width, height) or not style.band_safe:
+            # Size changed, or the style can't be patched band by band - render the whole texture
+            texture, elapsed_ms = self.render_texture(
+                Image.frombuffer('RGB', (width, height), frame, 'raw', 'BGRX', 0, 1), style, tier)
+            render_ms.append(elapsed_ms)
+            return 'full', texture
+        
+        rendered_bands = []
+        for y0, y1 in bands:
+            # Render with some margin so the blur doesn't show seams at band edges
+            p0, p1 = max(0, y0 - pad), min(height, y1 + pad)
+            band_image = Image.frombuffer('RGB', (width, p1 - p0), frame[p0:p1], 'raw', 'BGRX', 0, 1)
+            rendered, elapsed_ms = self.render_texture(band_image, style, tier)
+            render_ms.append(elapsed_ms)
+            rendered_bands.append((y0, rendered.crop((0, y0 - p0, width, y1 - p0))))
+        return 'bands', rendered_bands
+    
+    def apply_content_bands(self, payload):
+        """Tk thread: paste re-rendered bands into blur_cache and the shown Tk image"""
+        generation, future = payload
+        if future.cancelled():
+            return
+        try:
+            refresh = future.result()
+        except Exception as e:
+            logger.error(f"Live refresh failed: {e}")
+            return
+        self._apply_render_stats(refresh.stages, refresh.render_ms)
+        self.live_refresh.record_cost(refresh.stages['live_refresh'], time.time())
+        if generation != self._render_generation or not self.is_blurred or not self.blur_cache:
+            return  # A new show has its own baseline
+        if refresh.fingerprint is not None:
+            self.live_refresh.reset(refresh.fingerprint)
+        if not refresh.result:
+            return
+        
+        kind, data = refresh.result
+        if kind == 'full':
+            # Swap the canvas image for the new full texture, rendered at the current tier
+            self.blur_cache = data
+            self.texture_tier, self.texture_style = refresh.tier, refresh.style
+            width, height = data.size
+            photo, _ = self.photo_cache.get(self.blur_cache, width, height)
+            if self.blur_canvas and self.blur_canvas_item:
+                self.blur_canvas.itemconfigure(self.blur_canvas_item, image=photo)
+                self.blur_canvas.image = photo
+            return
+        
+        width, height = self.blur_cache.size
+        photo = self.photo_cache.lookup(self.blur_cache, width, height)
+        for y0, rendered in data:
+            self.blur_cache.paste(rendered, (0, y0))
+            
+            # Copy just this band into the Tk image that's on screen
+            if photo:
+                band_photo = ImageTk.PhotoImage(rendered)
+                self.root.tk.call(str(photo), 'copy', str(band_photo), '-to', 0, y0)
+    
     def toggle_blur(self):
         """Toggle blur on/off - FIXED to actually work"""
         print(f"\n🎯 HOTKEY PRESSED! Current blur: {'ON' if self.is_blurred else 'OFF'}")
         
-        if self.is_blurred:
-            # Hide current blur
-            self.ui_queue.put(('hide_blur', None))
-            print("❌ Blur turned OFF")
-        else:
-            # Show blur if WhatsApp is visible
-            self.ui_queue.put(('show_blur', None))
+        # Latest press wins; a quick double press just cancels out
+        if self.arbiter.toggle(self.is_blurred):
             print("🔍 Attempting to show blur...")
+        else:
+            print("❌ Blur turned OFF")
+        self.wake_ui()
         
         self.update_tray_menu()
     
-    def setup_keyboard_shortcut(self):
-        """Setup keyboard shortcut"""
-        try:
-            keyboard.add_hotkey(self.toggle_key, self.toggle_blur)
-            print(f"✅ Keyboard shortcut: {self.toggle_key}")
-        except Exception as e:
-            logger.error(f"Failed to setup keyboard shortcut: {e}")
+    def setup_keyboard_shortcut(self, backends=None):
+        """Setup keyboard shortcut: OS-registered hotkey first, `keyboard` hook as fallback"""
+        if backends is None:
+            backends = [Win32HotkeyBackend(), KeyboardHookBackend()]
+        # A boot launch registered the default chord before the heavy imports
+        if self.boot and self.toggle_key == DEFAULT_TOGGLE_KEY:
+            self.hotkey_backend = self.boot.adopt_hotkey(self.toggle_blur)
+        if not self.hotkey_backend:
+            self.hotkey_backend = register_hotkey(self.toggle_key, self.toggle_blur, backends)
+        if self.hotkey_backend:
+            print(f"✅ Keyboard shortcut: {self.toggle_key} ({self.hotkey_backend.name})")
+        else:
+            logger.error(f"Failed to setup keyboard shortcut: {self.toggle_key}")
     
     def create_tray_icon(self):
         """Create system tray icon"""
         try:
             image = Image.new('RGB', (64, 64), color='darkblue')
+            self.tray_icon = pystray.Icon("WhatsApp Blur", image, menu=self._tray_menu('Toggle Blur'))
             
-            menu = pystray.Menu(
-                item('Toggle Blur', self.toggle_blur),
-                item('Test Screenshot', self.test_screenshot),
-                item('Show System Info', self.show_system_info),
-                item('Exit', self.quit_application)
-            )
-            
-            self.tray_icon = pystray.Icon("WhatsApp Blur", image, menu=menu)
-            
-            tray_thread = threading.Thread(target=self.tray_icon.run, daemon=True)
+            tray_thread = threading.Thread(target=self.tray_icon.run, name='tray', daemon=True)
             tray_thread.start()
             print("✅ System tray icon created")
         except Exception as e:
             logger.error(f"Error creating tray icon: {e}")
     
+    def _tray_menu(self, toggle_label):
+        """The tray menu; items run on the pystray thread, so anything touching Tk is handed over"""
+        return pystray.Menu(
+            item(toggle_label, self.toggle_blur),
+            item('Test Screenshot', self.request_test_screenshot),
+            item('Show System Info', self.request_system_info),
+            item('Performance Profile', self._performance_profile_menu()),
+            item('Overlay Style', self._overlay_style_menu()),
+            item('Overlay Backend', self._overlay_backend_menu()),
+            item('Thread CPU Report', self.request_thread_report),
+            item(f'Profile CPU ({self.profile_duration:.0f}s)', self.request_cpu_profile),
+            item(f'Trace Memory ({self.profile_duration:.0f}s)', self.request_memory_trace),
+            item('Stop Profiling Now', self.request_profile_stop),
+            item('Exit', self.request_quit)
+        )
+    
+    def _boot_tray_task(self):
+        """Last stage of a boot launch: tray icon, then normal priority and the boot record"""
+        self.create_tray_icon()
+        self.boot.mark('tray_created')
+        self.boot.finish()
+        print(f"⏱️ Boot phases (s from {self.boot.logon_source}): {self.boot.phases} ({self.boot.defer_reason})")
+        return None
+    
     def test_screenshot(self):
         """Test screenshot functionality"""
         try:
-            test_img = ImageGrab.grab(bbox=(0, 0, 400, 300))
+            test_img = self.capture_test_image((0, 0, 400, 300))
             test_path = "test_screenshot.png"
             test_img.save(test_path)
             
@@ -910,6 +4347,7 @@ class WhatsAppBlurFinal:
                               f"✅ Screenshot test successful!\n"
                               f"Saved: {test_path}\n"
                               f"Size: {test_img.size}\n"
+                              f"Capture backend: {self.capture_engine.backend.name}\n"
                               f"DPI Scale: {self.dpi_scale}")
         except Exception as e:
             messagebox.showerror("Screenshot Test", 
@@ -933,6 +4371,20 @@ Blur Active: {'Yes' if self.is_blurred else 'No'}
 DPI Scale: {self.dpi_scale * 100:.0f}%
 WhatsApp Found: {'Yes' if self.whatsapp_hwnd else 'No'}
 
+Render Stages (last, ms):
+{self.format_stage_metrics()}
+{self.governor.summary()}
+Overlay Backend: {self.overlay_backend.name} (setting: {self.overlay_backend_preference}; {self.describe_overlay_backends()})
+Overlay Style: {self.blur_style} (showing {self.texture_style or 'none'})
+{self.style_costs.summary()}
+{self.gc_policy.summary()}
+{self.memory_manager.summary()}
+{self.geometry.summary()}
+{self.visibility.summary()}
+{self.scheduler.summary()}
+Background Work: {self.suspension.mode} ({self.suspension.describe()})
+Tk Image Cache: {len(self.photo_cache)} cached, {self.photo_cache.hits} hits, {self.photo_cache.misses} misses
+
 Keyboard Shortcut: {self.toggle_key}
 ✅ Safe shortcut - no conflicts with WhatsApp
 
@@ -969,137 +4421,463 @@ Current keyboard shortcuts that DON'T conflict:
         except Exception as e:
             logger.error(f"Error showing system info: {e}")
     
+    def request_thread_report(self):
+        """Tray callback: open the thread CPU report on the Tk thread"""
+        self.ui_queue.put(('show_thread_report', None))
+    
+    def show_thread_report(self):
+        """Show CPU and wakeups per thread/subsystem, with JSON export"""
+        try:
+            report_window = tk.Toplevel(self.root)
+            report_window.title("WhatsApp Blur - Thread CPU Report")
+            report_window.geometry("620x420")
+            report_window.attributes('-topmost', True)
+            
+            text_widget = tk.Text(report_window, wrap=tk.NONE, font=('Consolas', 9))
+            text_widget.pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
+            state = {'report': None}
+            
+            def refresh():
+                state['report'] = self.thread_profiler.report(time.time(), self.scheduler.runs)
+                text_widget.config(state=tk.NORMAL)
+                text_widget.delete('1.0', tk.END)
+                text_widget.insert('1.0', ThreadCpuProfiler.format_report(state['report']))
+                text_widget.config(state=tk.DISABLED)
+            
+            def export():
+                try:
+                    path = os.path.join(app_data_dir(), time.strftime('thread_cpu_%Y%m%d_%H%M%S.json'))
+                    with open(path, 'w', encoding='utf-8') as f:
+                        json.dump(state['report'], f, indent=2)
+                    print(f"💾 Thread CPU report exported: {path}")
+                    text_widget.config(state=tk.NORMAL)
+                    text_widget.insert(tk.END, f"\n\nExported to {path}")
+                    text_widget.config(state=tk.DISABLED)
+                except Exception as e:
+                    logger.error(f"Thread report export failed: {e}")
+            
+            refresh()
+            buttons = tk.Frame(report_window)
+            buttons.pack(pady=10)
+            tk.Button(buttons, text="Refresh", command=refresh).pack(side=tk.LEFT, padx=5)
+            tk.Button(buttons, text="Export JSON", command=export).pack(side=tk.LEFT, padx=5)
+            tk.Button(buttons, text="Close", command=report_window.destroy).pack(side=tk.LEFT, padx=5)
+        except Exception as e:
+            logger.error(f"Error showing thread report: {e}")
+    
+    def request_test_screenshot(self):
+        """Tray callback: run the screenshot test (and its message box) on the Tk thread"""
+        self.scheduler.call_soon_threadsafe('test_screenshot', self.test_screenshot)
+    
+    def request_system_info(self):
+        """Tray callback: open the system info window on the Tk thread"""
+        self.scheduler.call_soon_threadsafe('show_system_info', self.show_system_info)
+    
+    def request_quit(self):
+        """Tray callback: shut down on the Tk thread, which owns the windows and the scheduler"""
+        self.scheduler.call_soon_threadsafe('quit', self.quit_application)
+    
+    def request_cpu_profile(self):
+        self.ui_queue.put(('start_profile', 'cpu'))
+    
+    def request_memory_trace(self):
+        self.ui_queue.put(('start_profile', 'memory'))
+    
+    def request_profile_stop(self):
+        self.ui_queue.put(('stop_profile', None))
+    
+    def start_profile(self, kind):
+        """Start a bounded capture on the Tk thread; it stops itself after profile_duration"""
+        try:
+            if not self.profiler.start(kind):
+                print(f"⚠️ A {self.profiler.kind} capture is already running")
+                return
+            self.scheduler.schedule('profile_stop', self.profile_duration, self.stop_profile)
+        except Exception as e:
+            logger.error(f"Could not start {kind} capture: {e}")
+    
+    def stop_profile(self):
+        """Finish the running capture, write it to the data directory and show the top entries"""
+        self.scheduler.cancel('profile_stop')
+        try:
+            result = self.profiler.stop()
+        except Exception as e:
+            logger.error(f"Profiler capture failed: {e}")
+            return None
+        if not result:
+            return None
+        path, summary = result
+        print(f"💾 Capture written: {path}")
+        try:
+            profile_window = tk.Toplevel(self.root)
+            profile_window.title(f"WhatsApp Blur - {os.path.basename(path)}")
+            profile_window.geometry("900x500")
+            profile_window.attributes('-topmost', True)
+            
+            text_widget = tk.Text(profile_window, wrap=tk.NONE, font=('Consolas', 9))
+            text_widget.insert('1.0', f"Saved to {path}\n\n{summary}")
+            text_widget.config(state=tk.DISABLED)
+            text_widget.pack(pady=10, padx=10, fill=tk.BOTH, expand=True)
+            
+            tk.Button(profile_window, text="Close",
+                     command=profile_window.destroy).pack(pady=10)
+        except Exception as e:
+            logger.error(f"Error showing capture summary: {e}")
+        return None
+    
+    def format_stage_metrics(self):
+        """Format stage metrics for the system info window"""
+        if not self.stage_metrics:
+            return "  (no renders yet)"
+        return "\n".join(f"  {stage}: {ms:.1f}" for stage, ms in self.stage_metrics.items())
+
     def update_tray_menu(self):
         """Update tray menu"""
         if self.tray_icon:
             status = "ON" if self.is_enabled else "OFF"
-            menu = pystray.Menu(
-                item(f'Blur: {status}', self.toggle_blur),
-                item('Test Screenshot', self.test_screenshot),
-                item('Show System Info', self.show_system_info),
-                item('Exit', self.quit_application)
-            )
-            self.tray_icon.menu = menu
+            self.tray_icon.menu = self._tray_menu(f'Blur: {status}')
     
     def start_monitoring(self):
-        """Start monitoring thread"""
-        self.monitoring_thread = threading.Thread(target=self._monitor_whatsapp, daemon=True)
-        self.monitoring_thread.start()
-    
-    def periodic_cleanup(self):
-        """Perform periodic memory cleanup to prevent long-term degradation - CPU OPTIMIZED"""
-        current_time = time.time()
+        """Start event sources and the scheduled monitor pass"""
+        try:
+            self.session_events = Win32SessionEventSource(self.suspension, self.geometry, self.visibility)
+            # The system may accept the native blur again: re-checked on the next show
+            self.session_events.system_listeners.append(self.overlay_backends['compositor'].reset)
+            self.session_events.start()
+        except Exception as e:
+            logger.error(f"Session notifications unavailable: {e}")
         
-        # Time-based cleanup check (CPU optimized)
-        if current_time - self.last_cleanup_time > self.cleanup_interval:
-            
-            print("🧹 Performing periodic memory cleanup...")
-            
+        # Event threads only hand work to the scheduler; all checks run on the Tk thread
+        self.suspension.listeners.append(self._on_suspension_change)
+        # A burst of window events brings the next monitor pass forward once, after the debounce delay
+        self.visibility.listeners.append(
+            lambda: self.scheduler.call_soon_threadsafe('monitor', self._monitor_task,
+                                                        self.monitor_debounce_delay, keep_sooner=True))
+        self.geometry.listeners.append(
+            lambda: self.scheduler.call_soon_threadsafe('position', self._position_task))
+        self.scheduler.schedule('monitor', 0, self._monitor_task)
+        
+        # Reload settings when the file is edited; restart when the updater asks to
+        if self.perf_config.path:
+            self._take_restart_request()  # Left over from an update while we weren't running
             try:
-                # Clear window and image caches
-                self.window_cache.clear()
-                # Clear process name cache periodically
-                if len(self.process_name_cache) > 50:
-                    self.process_name_cache.clear()
-                    print("🧹 Cleared process name cache to free memory")
-                if hasattr(self, 'cached_image'):
-                    self.cached_image = None
-                if hasattr(self, 'blur_cache'):
-                    self.blur_cache = None
-                
-                # Cancel any old after() callbacks to prevent accumulation (research finding)
-                old_callbacks = len(self.active_callbacks)
-                if old_callbacks > 50:  # If too many callbacks accumulated
-                    print(f"🧹 Cleaning up {old_callbacks} accumulated callbacks...")
-                    for callback_id in list(self.active_callbacks)[:old_callbacks//2]:
-                        try:
-                            self.root.after_cancel(callback_id)
-                            self.active_callbacks.discard(callback_id)
-                        except:
-                            pass
-                
-                # Clear any created widgets that may have accumulated
-                widgets_cleaned = 0
-                for widget in list(self.created_widgets):
+                self.config_watcher = FileChangeWatcher(
+                    os.path.dirname(self.perf_config.path),
+                    lambda: self.scheduler.call_soon_threadsafe(
+                        'data_dir_change', self.on_data_dir_change, delay=0.2))
+                self.config_watcher.start()
+            except Exception as e:
+                logger.error(f"Settings watcher unavailable: {e}")
+    
+    def on_data_dir_change(self):
+        """A file in the data directory was written (Tk thread)"""
+        self.reload_performance_config()
+        self.check_restart_request()
+        return None
+    
+    def _take_restart_request(self):
+        """Consume a pending restart request; returns its contents or None"""
+        path = os.path.join(os.path.dirname(self.perf_config.path), RESTART_REQUEST_FILE)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding='utf-8') as f:
+                request = json.load(f)
+        except Exception:
+            request = {}
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.error(f"Could not remove restart request: {e}")
+        return request
+    
+    def check_restart_request(self):
+        """Restart gracefully if auto_update.py installed a new version"""
+        if not self.perf_config.path:
+            return
+        request = self._take_restart_request()
+        if request is not None:
+            print(f"🔄 Update installed ({request.get('reason', 'update')}) - restarting...")
+            self.restart_application()
+    
+    def apply_performance_profile(self):
+        """Push the selected profile's values into the components that use them"""
+        values = self.perf_config.values
+        self.monitor_interval = values['monitor_interval']
+        self.monitor_idle_interval = values['monitor_idle_interval']
+        self.monitor_debounce_delay = values['monitor_debounce_delay']
+        self.window_cache_ttl = values['window_cache_ttl']
+        self.arbiter.min_render_interval = values['min_render_interval']
+        self.hover_poll_interval = values['hover_poll_interval']
+        self.ui_queue_busy_interval = values['ui_queue_busy_interval']
+        self.ui_queue_retry_interval = values['ui_queue_retry_interval']
+        self.memory_manager.sample_interval = values['memory_sample_interval']
+        self.memory_manager.soft_limit_mb = values['memory_soft_limit_mb']
+        self.memory_manager.hard_limit_mb = max(values['memory_hard_limit_mb'], values['memory_soft_limit_mb'])
+        self.governor.budget_ms = values['render_budget_ms']
+        
+        blur_radius_scale = values['blur_radius'] / QUALITY_TIERS[0]['blur_radius']
+        if blur_radius_scale != self.blur_radius_scale:
+            # Textures rendered at the old radius are stale
+            self.blur_radius_scale = blur_radius_scale
+            if not self.is_blurred:
+                self.blur_cache = None
+                self.texture_tier = None
+        
+        if self.perf_config.overlay_backend != self.overlay_backend_preference:
+            self.overlay_backend_preference = self.perf_config.overlay_backend
+            self.overlay_backends['compositor'].reset()  # Give a refused compositor another try
+        
+        if self.perf_config.overlay_style != self.blur_style:
+            self.blur_style = self.perf_config.overlay_style
+            if not self.is_blurred:
+                self.blur_cache = None  # Next show renders in the new style
+        
+        # Next monitor pass on the new schedule
+        if self.scheduler.is_scheduled('monitor'):
+            self.scheduler.schedule('monitor', 0, self._monitor_task)
+    
+    def reload_performance_config(self):
+        """Re-read the settings file and apply it (Tk thread)"""
+        if not self.perf_config.is_stale():
+            return None
+        previous = self.perf_config.profile
+        if self.perf_config.load():
+            self.apply_performance_profile()
+            if previous != self.perf_config.profile:
+                print(f"⚙️ Performance profile: {previous} → {self.perf_config.profile}")
+            else:
+                print(f"⚙️ Settings reloaded ({self.perf_config.profile})")
+            self.update_tray_menu()
+        return None
+    
+    def request_performance_profile(self, name):
+        """Tray callback factory: select a profile on the Tk thread"""
+        return lambda icon=None, menu_item=None: self.ui_queue.put(('select_performance_profile', name))
+    
+    def select_performance_profile(self, name):
+        try:
+            self.perf_config.select(name)
+            self.apply_performance_profile()
+            print(f"⚙️ Performance profile: {name}")
+            self.update_tray_menu()
+        except Exception as e:
+            logger.error(f"Could not select profile '{name}': {e}")
+    
+    def request_overlay_style(self, name):
+        """Tray callback factory: select an overlay style on the Tk thread"""
+        return lambda icon=None, menu_item=None: self.ui_queue.put(('select_overlay_style', name))
+    
+    def select_overlay_style_setting(self, name):
+        try:
+            self.perf_config.select_overlay_style(name)
+            self.apply_performance_profile()
+            print(f"🎨 Overlay style setting: {name}")
+            self.update_tray_menu()
+        except Exception as e:
+            logger.error(f"Could not select overlay style '{name}': {e}")
+    
+    def _overlay_style_menu(self):
+        return pystray.Menu(*[
+            item(name.capitalize(), self.request_overlay_style(name),
+                 checked=lambda menu_item, name=name: self.blur_style == name, radio=True)
+            for name in ['auto'] + list(OVERLAY_STYLES)
+        ])
+    
+    def request_overlay_backend(self, name):
+        """Tray callback factory: select an overlay backend on the Tk thread"""
+        return lambda icon=None, menu_item=None: self.ui_queue.put(('select_overlay_backend', name))
+    
+    def select_overlay_backend_setting(self, name):
+        try:
+            self.perf_config.select_overlay_backend(name)
+            self.apply_performance_profile()
+            print(f"🪟 Overlay backend setting: {name}")
+            self.update_tray_menu()
+        except Exception as e:
+            logger.error(f"Could not select overlay backend '{name}': {e}")
+    
+    def _overlay_backend_menu(self):
+        return pystray.Menu(*[
+            item(name.capitalize(), self.request_overlay_backend(name),
+                 checked=lambda menu_item, name=name: self.overlay_backend_preference == name, radio=True)
+            for name in ['auto'] + list(OVERLAY_BACKENDS)
+        ])
+    
+    def _performance_profile_menu(self):
+        return pystray.Menu(*[
+            item(name, self.request_performance_profile(name),
+                 checked=lambda menu_item, name=name: self.perf_config.profile == name, radio=True)
+            for name in self.perf_config.profile_names
+        ])
+    
+    def wake_ui(self):
+        """Run the UI queue task as soon as possible (any thread)"""
+        self.scheduler.call_soon_threadsafe('ui_queue', self.process_ui_queue)
+    
+    def _on_suspension_change(self, old_mode, new_mode):
+        # Background tasks stop themselves while suspended; restart them on resume
+        if new_mode != SuspensionController.SUSPENDED:
+            self.scheduler.call_soon_threadsafe('monitor', self._monitor_task)
+            if self._is_hovering:
+                self.scheduler.call_soon_threadsafe('hover', self._hover_tick)
+    
+    def _position_task(self):
+        self.update_blur_position()
+        return None
+    
+    def register_memory_evictors(self):
+        """Cache evictors for the memory manager, cheapest to rebuild first"""
+        def evict_process_names():
+            self.process_name_cache.clear()
+        
+        def evict_window_cache():
+            self.window_cache.clear()
+        
+        def evict_tk_images():
+            # The canvas keeps its own reference to the image on screen
+            self.photo_cache.clear()
+        
+        def evict_capture_buffers():
+            for engine in (self.capture_engine, self.live_refresh_engine):
+                if engine:
+                    engine.release()
+        
+        def evict_blur_texture():
+            if not self.is_blurred:
+                self.blur_cache = None
+                self.texture_tier = None
+        
+        self.memory_manager.add_evictor(10, 'process names', evict_process_names)
+        self.memory_manager.add_evictor(20, 'window cache', evict_window_cache)
+        self.memory_manager.add_evictor(30, 'Tk images', evict_tk_images)
+        self.memory_manager.add_evictor(40, 'capture buffers', evict_capture_buffers)
+        self.memory_manager.add_evictor(50, 'blur texture', evict_blur_texture)
+        self.memory_manager.hard_cleanup = self.hard_memory_cleanup
+    
+    def check_memory(self):
+        """Sample memory and evict caches if over a limit (Tk thread, since evictors touch Tk images)"""
+        try:
+            self.memory_manager.check(time.time())
+        except Exception as e:
+            logger.error(f"Memory check error: {e}")
+    
+    def hard_memory_cleanup(self):
+        """Last resort at the hard memory limit, after every cache has been evicted"""
+        try:
+            # Cancel any old after() callbacks to prevent accumulation (research finding)
+            old_callbacks = len(self.active_callbacks)
+            if old_callbacks > 50:  # If too many callbacks accumulated
+                print(f"🧹 Cleaning up {old_callbacks} accumulated callbacks...")
+                for callback_id in list(self.active_callbacks)[:old_callbacks//2]:
                     try:
-                        if hasattr(widget, 'destroy'):
-                            widget.destroy()
-                        self.created_widgets.discard(widget)
-                        widgets_cleaned += 1
+                        self.root.after_cancel(callback_id)
+                        self.active_callbacks.discard(callback_id)
                     except:
                         pass
-                
-                if widgets_cleaned > 0:
-                    print(f"🧹 Cleaned up {widgets_cleaned} old widgets")
-                
-                # Force garbage collection
-                import gc
-                collected = gc.collect()
-                print(f"🗑️ Garbage collected: {collected} objects")
-                
-                # Reset cleanup timer
-                self.last_cleanup_time = current_time
-                
-                # Log memory usage for monitoring
-                import psutil
-                process = psutil.Process()
-                memory_mb = process.memory_info().rss / 1024 / 1024
-                print(f"📊 Memory usage after cleanup: {memory_mb:.1f} MB")
-                
-            except Exception as e:
-                logger.error(f"Cleanup error: {e}")
+            
+            # Clear any created widgets that may have accumulated
+            widgets_cleaned = 0
+            for widget in list(self.created_widgets):
+                try:
+                    if hasattr(widget, 'destroy'):
+                        widget.destroy()
+                    self.created_widgets.discard(widget)
+                    widgets_cleaned += 1
+                except:
+                    pass
+            
+            if widgets_cleaned > 0:
+                print(f"🧹 Cleaned up {widgets_cleaned} old widgets")
+            
+            # Full collection only under memory pressure, never from the UI
+            self.gc_policy.collect(2, 'hard memory limit')
+            
+        except Exception as e:
+            logger.error(f"Cleanup error: {e}")
+    
+    def _monitor_task(self):
+        """Scheduled monitor pass; returns the next delay, or None to wait for a resume event"""
+        if self.shutdown_event.is_set():
+            return None
+        return self._monitor_tick()
     
-    def _monitor_whatsapp(self):
-        """Monitor WhatsApp window - CPU OPTIMIZED VERSION"""
-        last_whatsapp_state = None
-        state_change_time = 0
-        debounce_delay = 0.5
-        last_cleanup_check = time.time()
+    def _monitor_tick(self):
+        """One monitor pass; returns seconds until the next one, or None while suspended"""
+        state = self._monitor_state
+        current_time = time.time()
         
-        while not self.shutdown_event.is_set():
-            try:
-                current_time = time.time()
-                
-                # Time-based cleanup check (CPU optimized - no operation counting)
-                if current_time - last_cleanup_check > 60:  # Check every minute
-                    if current_time - self.last_cleanup_time > self.cleanup_interval:
-                        self.periodic_cleanup()
-                    last_cleanup_check = current_time
-                
-                if self.is_enabled:
-                    current_hwnd = self.find_whatsapp_window()
-                    current_state = bool(current_hwnd and self.is_whatsapp_currently_visible(current_hwnd))
-                    
-                    # Debounce state changes to prevent rapid toggling
-                    if current_state != last_whatsapp_state:
-                        if current_time - state_change_time > debounce_delay:
-                            if current_state:
-                                print("📱 WhatsApp became visible")
-                            else:
-                                print("📱 WhatsApp no longer visible")
-                            last_whatsapp_state = current_state
-                            state_change_time = current_time
-                            
-                            # Queue UI updates with debouncing
-                            if current_state and current_hwnd != self.whatsapp_hwnd:
-                                self.whatsapp_hwnd = current_hwnd
-                                if not self.is_blurred and not self._is_hovering:
-                                    self.ui_queue.put(('show_blur', None))
-                            elif not current_state and self.is_blurred:
-                                self.ui_queue.put(('hide_blur', None))
-                                self.whatsapp_hwnd = None
+        # Pause while locked/disconnected/display off (resumed by the session listener)
+        self.suspension.poll_battery(current_time)
+        if self.suspension.is_suspended:
+            return None
+        
+        # Settings edited or an update installed while the file watcher is unavailable
+        if self.perf_config.is_stale():
+            self.reload_performance_config()
+        if not self.config_watcher:
+            self.check_restart_request()
+        
+        # Per-thread CPU sample, piggybacked on this pass so it costs no wakeups of its own
+        if self.thread_profiler.is_due(current_time):
+            self.thread_profiler.sample(current_time, self.scheduler.runs)
+        
+        # Memory watermark check; any eviction runs on the Tk thread
+        if self.memory_manager.is_due(current_time):
+            self.memory_manager.last_sample = current_time
+            self.ui_queue.put(('check_memory', None))
+        
+        if self.is_enabled:
+            # Keep CPU load samples fresh for the quality governor
+            self.governor.sample()
+            self.live_refresh.interval = self.governor.tier['refresh_interval']
+            
+            current_hwnd = self.find_whatsapp_window()
+            # Another full-screen app only slows the expensive work; this visibility check keeps running
+            self.suspension.poll_fullscreen(
+                foreground_is_whatsapp=bool(current_hwnd) and win32gui.GetForegroundWindow() == current_hwnd)
+            current_state = bool(current_hwnd and self.is_whatsapp_currently_visible(current_hwnd))
+            
+            # Debounce state changes to prevent rapid toggling
+            if current_state != state['last_whatsapp_state']:
+                if current_time - state['state_change_time'] > self.monitor_debounce_delay:
+                    if current_state:
+                        print("📱 WhatsApp became visible")
+                    else:
+                        print("📱 WhatsApp no longer visible")
+                    state['last_whatsapp_state'] = current_state
+                    state['state_change_time'] = current_time
                     
-                    # Update position less frequently to reduce load
-                    if self.is_blurred and current_hwnd and current_time % 2 < 0.3:
-                        self.ui_queue.put(('update_blur_position', None))
-                
-                time.sleep(1.5)  # CPU OPTIMIZED: Reduced from 0.3s to 1.5s (75% fewer cycles)
-            except Exception as e:
-                logger.error(f"Monitor error: {e}")
-                time.sleep(5)
+                    # Queue UI updates with debouncing
+                    if current_state and current_hwnd != self.whatsapp_hwnd:
+                        self.whatsapp_hwnd = current_hwnd
+                        if not self.is_blurred and not self._is_hovering:
+                            self.ui_queue.put(('show_blur', None))
+                    elif not current_state and self.is_blurred:
+                        self.ui_queue.put(('hide_blur', None))
+                        self.whatsapp_hwnd = None
+            
+            # Without move events, follow WhatsApp on each pass
+            if self.is_blurred and current_hwnd and not self.geometry.window_events_live:
+                self.ui_queue.put(('update_blur_position', None))
+            
+            # Live refresh samples a cheap fingerprint at a low rate, within its budget
+            if (self.live_refresh_enabled and self.texture_follows_content() and
+                    self.suspension.mode == SuspensionController.ACTIVE and
+                    self.is_blurred and not self._is_hovering and
+                    self.live_refresh.is_due(current_time)):
+                self.live_refresh.last_sample = current_time
+                self.ui_queue.put(('refresh_blur_content', None))
+        
+        # CPU OPTIMIZED: Reduced from 0.3s to 1.5s (75% fewer cycles); slower on low battery.
+        # With visibility events the pass runs on change, so only a slow safety net remains
+        interval = self.monitor_idle_interval if self.visibility.events_live else self.monitor_interval
+        if self.live_refresh_enabled and self.texture_follows_content() and self.is_blurred:
+            interval = min(interval, self.live_refresh.interval)
+        return interval * self.suspension.interval_multiplier
     
     def process_ui_queue(self):
-        """Process UI operations with throttling - CPU OPTIMIZED"""
+        """Process UI operations with throttling; returns the next delay, or None when idle"""
         try:
             operations_processed = 0
             max_operations_per_cycle = 3  # Limit operations per cycle
@@ -1109,40 +4887,152 @@ Current keyboard shortcuts that DON'T conflict:
                 
                 try:
                     if operation == 'show_blur':
-                        self.show_blur()
+                        self.arbiter.request(True)
                     elif operation == 'hide_blur':
-                        self.hide_blur()
+                        self.arbiter.request(False)
                     elif operation == 'show_blur_if_enabled':
                         self.show_blur_if_enabled()
                     elif operation == 'update_blur_position':
                         self.update_blur_position()
+                    elif operation == 'refresh_blur_content':
+                        self.refresh_blur_content()
+                    elif operation == 'check_memory':
+                        self.check_memory()
+                    elif operation == 'finish_blur':
+                        self.finish_blur(data)
+                    elif operation == 'apply_content_bands':
+                        self.apply_content_bands(data)
+                    elif operation == 'show_thread_report':
+                        self.show_thread_report()
+                    elif operation == 'start_profile':
+                        self.start_profile(data)
+                    elif operation == 'stop_profile':
+                        self.stop_profile()
+                    elif operation == 'select_performance_profile':
+                        self.select_performance_profile(data)
+                    elif operation == 'select_overlay_style':
+                        self.select_overlay_style_setting(data)
+                    elif operation == 'select_overlay_backend':
+                        self.select_overlay_backend_setting(data)
                     
                     operations_processed += 1
                     
                 except Exception as e:
                     logger.error(f"UI operation '{operation}' failed: {e}")
-                    
-            # Schedule next processing with callback tracking for cleanup
-            next_interval = 100 if self.ui_queue.empty() else 50
-            callback_id = self.root.after(next_interval, self.process_ui_queue)
-            self.active_callbacks.add(callback_id)
+            
+            # Apply the latest show/hide request once any in-flight one has finished
+            try:
+                self.apply_blur_request()
+            except Exception as e:
+                logger.error(f"Blur request failed: {e}")
+            
+            # More queued work, or a rate-limited request waiting for its slot; otherwise
+            # sleep until the next put (in-flight renders report back through the queue)
+            if not self.ui_queue.empty():
+                return self.ui_queue_busy_interval
+            if self.arbiter.desired is not None and not self.arbiter.busy:
+                return self.ui_queue_retry_interval
+            return None
             
         except Exception as e:
             logger.error(f"Error processing UI queue: {e}")
-            # Reschedule even on error
-            callback_id = self.root.after(200, self.process_ui_queue)
-            self.active_callbacks.add(callback_id)
+            return 0.2
+    
+    def attach_single_instance(self, lock, server):
+        """Keep the instance lock and answer control commands from later launches"""
+        self.instance_lock = lock
+        self.control_server = server
+        if server:
+            server.set_handler(self.handle_control_command)
+    
+    def handle_control_command(self, command, timeout=3.0):
+        """Run a control command on the Tk thread (called on the control server thread)"""
+        done = threading.Event()
+        outcome = {}
+        
+        def run():
+            try:
+                outcome['result'] = self.run_control_command(command)
+            except Exception as e:
+                outcome['result'] = {'error': str(e)}
+            done.set()
+            return None
+        
+        self.scheduler.call_soon_threadsafe(f'control_{command}', run)
+        if not done.wait(timeout):
+            return {'error': 'timed out waiting for the UI thread'}
+        return outcome['result']
+    
+    def run_control_command(self, command):
+        if command == 'toggle':
+            self.toggle_blur()
+            return {'blur_requested': self.arbiter.desired if self.arbiter.desired is not None else self.is_blurred}
+        if command == 'reload':
+            self.perf_config.loaded_mtime = None  # Force a re-read
+            self.reload_performance_config()
+            return {'profile': self.perf_config.profile, 'reloads': self.perf_config.reloads}
+        if command == 'quit':
+            # Answer first, then shut down
+            self.scheduler.schedule('quit', 0.2, self.quit_application)
+            return {'quitting': True}
+        return {
+            'pid': os.getpid(),
+            'uptime_seconds': round(time.time() - self.started_at),
+            'enabled': self.is_enabled,
+            'blurred': self.is_blurred,
+            'whatsapp_found': bool(self.whatsapp_hwnd),
+            'profile': self.perf_config.profile,
+            'background_work': self.suspension.mode,
+            'overlay_backend': self.overlay_backend.name,
+            'boot': self.boot.summary() if self.boot else None,
+        }
+    
+    def _release_single_instance(self):
+        if self.control_server:
+            self.control_server.stop()
+            self.control_server = None
+        if self.instance_lock:
+            self.instance_lock.release()
+            self.instance_lock = None
+    
+    def restart_application(self):
+        """Shut down cleanly, then start a fresh process running the (updated) script"""
+        self._restart_on_exit = True
+        self.quit_application()
+    
+    def _spawn_replacement(self):
+        try:
+            # Detached, so the new instance outlives this one
+            flags = getattr(subprocess, 'DETACHED_PROCESS', 0) | getattr(subprocess, 'CREATE_NEW_PROCESS_GROUP', 0)
+            # --replace: the new instance waits for our lock instead of forwarding to us
+            subprocess.Popen(relaunch_command('--replace'), close_fds=True, creationflags=flags)
+            print("🚀 Replacement instance started")
+        except Exception as e:
+            logger.error(f"Could not start replacement instance: {e}")
     
     def quit_application(self):
-        """Quit application with comprehensive cleanup"""
+        """Quit application with comprehensive cleanup (Tk thread; other threads use request_quit)"""
         print("🛑 Quitting WhatsApp Blur with memory cleanup...")
         self.shutdown_event.set()
         
         try:
             # Clean up blur window
             self.hide_blur()
+            self.photo_cache.clear()
+            self.blur_cache = None
+            
+            # Release the capture DC and DIB section
+            if self.capture_engine:
+                self.capture_engine.release()
+            if self.live_refresh_engine:
+                self.live_refresh_engine.release()
             
-            # Cancel all pending after() callbacks
+            # Stop scheduled tasks and cancel all pending after() callbacks
+            self.scheduler.shutdown()
+            if self.profiler.active:
+                self.profiler.stop()
+            if self.config_watcher:
+                self.config_watcher.stop()
             for callback_id in list(self.active_callbacks):
                 try:
                     self.root.after_cancel(callback_id)
@@ -1159,26 +5049,35 @@ Current keyboard shortcuts that DON'T conflict:
                     pass
             self.created_widgets.clear()
             
+            # Drop queued renders; a running one finishes on its own and is ignored
+            self.render_pool.shutdown(wait=False, cancel_futures=True)
+            
+            # Stop session/power notifications
+            if self.session_events:
+                self.session_events.stop()
+            
             # Stop tray icon
             if self.tray_icon:
                 self.tray_icon.stop()
             
-            # Unhook keyboard
+            # Unregister the hotkey
             try:
-                keyboard.unhook_all()
+                if self.hotkey_backend:
+                    self.hotkey_backend.unregister_all()
             except:
                 pass
             
-            # Final garbage collection
-            import gc
-            collected = gc.collect()
-            print(f"🗑️ Final cleanup: {collected} objects collected")
+            # No final collection: the process is exiting anyway
+            self.gc_policy.uninstall()
             
         except Exception as e:
             logger.error(f"Cleanup during quit: {e}")
         finally:
             self.root.quit()
             self.root.destroy()
+            self._release_single_instance()
+            if self._restart_on_exit:
+                self._spawn_replacement()
             sys.exit(0)
 
 def main():
@@ -1188,7 +5087,10 @@ def main():
         return
     
     try:
-        app = WhatsAppBlurFinal()
+        app = WhatsAppBlurFinal(boot=_boot)
+        app.attach_single_instance(*_single_instance)
+        if _boot:
+            _boot.mark('app_initialized')
         
         # Show simplified startup message
         print(f"\n🎉 WhatsApp Blur started successfully!")